@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from utils.Autosave import AutosaveWriter, DocumentJournal, findRecoveryJournals
+from utils.DocumentBlocks import DocumentBlocks
+
+DOCUMENT_MB = 10
+TICKS = 50
+EDITS_PER_TICK = 20
+PARAGRAPH = "<p>" + "lorem ipsum dolor sit amet " * 3 + "</p>"
+
+
+def run():
+    blocks = [PARAGRAPH] * (DOCUMENT_MB * 1024 * 1024 // len(PARAGRAPH))
+    with tempfile.TemporaryDirectory() as directory:
+        writer = AutosaveWriter(directory, maxJournalBytes=1024 * 1024)
+        document = DocumentBlocks(blocks)
+        journal = DocumentJournal(document, writer)
+
+        start = time.perf_counter()
+        journal.tick("note.ntp")
+        firstTickMs = (time.perf_counter() - start) * 1000
+        writer.flush()
+
+        journal.markDirty()
+        tickTimes = []
+        for tick in range(TICKS):
+            for edit in range(EDITS_PER_TICK):
+                index = (tick * EDITS_PER_TICK + edit) * 37 % len(document)
+                document.splice(index, 1, [f"<p>edit {tick} {edit}</p>"])
+            start = time.perf_counter()
+            journal.tick("note.ntp")
+            tickTimes.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        writer.flush()
+        drainMs = (time.perf_counter() - start) * 1000
+
+        journalBytes = os.path.getsize(writer.journalPath(journal.journalId))
+        recovered = findRecoveryJournals(directory)[0]
+        writer.shutdown()
+
+    tickTimes.sort()
+    print(f"document:            {DOCUMENT_MB} MB, {len(blocks)} blocks")
+    print(f"first tick (mirror): {firstTickMs:.3f} ms")
+    print(f"tick median:         {tickTimes[len(tickTimes) // 2]:.3f} ms")
+    print(f"tick max:            {tickTimes[-1]:.3f} ms")
+    print(f"writer drain:        {drainMs:.1f} ms (off the GUI thread)")
+    print(f"journal size:        {journalBytes / 1024:.1f} kB")
+    print(f"recovered intact:    {recovered['blocks'] == list(document.blocks)}")
+
+
+if __name__ == "__main__":
+    run()
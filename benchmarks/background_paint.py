@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WIDTH = 350
+HEIGHT = 700
+REPAINTS = 200
+NAV_STOPS = ((0, (255, 200, 225, 100)), (1, (255, 175, 200, 159)))
+
+
+def buildPanel(QWidget, QVBoxLayout, QLabel, QProgressBar):
+    #*Same shape as the nav side bar: a few labels over a background and a progress bar that updates while typing
+    panel = QWidget()
+    panel.resize(WIDTH, HEIGHT)
+    layout = QVBoxLayout(panel)
+    for i in range(8):
+        layout.addWidget(QLabel(f"Recent file {i}"))
+    progressBar = QProgressBar()
+    progressBar.setRange(0, 100)
+    layout.addWidget(progressBar)
+    return panel, progressBar
+
+
+def timedRepaints(app, widget, progressBar):
+    samples = []
+    for i in range(REPAINTS):
+        progressBar.setValue(i % 100)
+        start = time.perf_counter()
+        widget.repaint()
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"median_ms": samples[len(samples) // 2], "p95_ms": samples[int(len(samples) * 0.95)]}
+
+
+def measureChild():
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from PySide6.QtGui import QBrush, QColor, QLinearGradient, QPalette
+    from PySide6.QtWidgets import QApplication, QGraphicsBlurEffect, QLabel, QProgressBar, QVBoxLayout, QWidget
+    from utils.Backgrounds import BackgroundPainter, clearBackgrounds
+
+    app = QApplication(sys.argv)
+    results = {}
+
+    #*What setNavBackground used to do: a gradient palette under a live 200px blur of the whole subtree
+    live, progressBar = buildPanel(QWidget, QVBoxLayout, QLabel, QProgressBar)
+    gradient = QLinearGradient(0, HEIGHT + 200, 0, 400)
+    for position, color in NAV_STOPS:
+        gradient.setColorAt(position, QColor(*color))
+    palette = live.palette()
+    palette.setBrush(QPalette.Window, QBrush(gradient))
+    live.setPalette(palette)
+    live.setAutoFillBackground(True)
+    blurEffect = QGraphicsBlurEffect()
+    blurEffect.setBlurRadius(200)
+    live.setGraphicsEffect(blurEffect)
+    live.show()
+    app.processEvents()
+    results["live_blur"] = timedRepaints(app, live, progressBar)
+    live.close()
+
+    clearBackgrounds()
+    cached, progressBar = buildPanel(QWidget, QVBoxLayout, QLabel, QProgressBar)
+    background = BackgroundPainter(cached, "benchmark", NAV_STOPS, blurRadius=200, gradientLine=lambda width, height: (0, height + 200, 0, 400))
+    cached.show()
+    start = time.perf_counter()
+    background.render()
+    results["cache_miss_render_ms"] = (time.perf_counter() - start) * 1000
+    app.processEvents()
+    results["cached_pixmap"] = timedRepaints(app, cached, progressBar)
+    print(json.dumps(results))
+
+
+def run():
+    if "--child" in sys.argv:
+        measureChild()
+        return
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        print((completed.stderr.strip().splitlines() or ["no output"])[-1], file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(json.loads(lines[-1]), indent=4))
+
+
+if __name__ == "__main__":
+    run()
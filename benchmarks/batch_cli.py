@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from utils.HtmlBlocks import splitBlocks
+from utils.NtpFormat import encodeNtp
+
+NOTES = 10_000
+PARAGRAPHS = 40
+HEAD = '<head><script src="qrc:///qtwebchannel/qwebchannel.js"></script></head>'
+PARAGRAPH = '<p><span style="font-size: 12pt;">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>\n'
+COMMANDS = [
+    ["stat"],
+    ["export", "--to", "text", "--no-sync"],
+    ["export", "--to", "markdown", "--no-sync"],
+    ["convert", "--no-sync"],
+]
+
+#*Converted notes are flagged as normalized, so these runs skip the HTML parser for reading
+CONVERTED_COMMANDS = [
+    ["stat"],
+    ["export", "--to", "text", "--no-sync"],
+    ["export", "--to", "html", "--no-sync"],
+]
+
+
+def buildNotes(directory):
+    for i in range(NOTES):
+        html = HEAD + '<body contenteditable="true">' + "".join(PARAGRAPH.format(i * PARAGRAPHS + j) for j in range(PARAGRAPHS)) + "</body>"
+        folder = os.path.join(directory, f"{i // 1000:02d}")
+        os.makedirs(folder, exist_ok=True)
+        #*Half legacy HTML, half .ntp v2 containers, like a notes folder that has been partly re-saved
+        if i % 2:
+            with open(os.path.join(folder, f"note{i}.ntp"), "wb") as file:
+                file.write(encodeNtp(splitBlocks(html)))
+        else:
+            with open(os.path.join(folder, f"note{i}.ntp"), "w", encoding="utf-8") as file:
+                file.write(html)
+
+
+def readAll(directory):
+    #*Baseline: one process reading every byte, the page cache is warm after buildNotes
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            with open(os.path.join(root, name), "rb") as file:
+                total += len(file.read())
+    return total
+
+
+def run():
+    with tempfile.TemporaryDirectory() as directory:
+        notes = os.path.join(directory, "notes")
+        buildNotes(notes)
+        start = time.perf_counter()
+        total = readAll(notes)
+        readSeconds = time.perf_counter() - start
+        print(f"{NOTES} notes, {total / 1024 / 1024:.1f} MB, raw read {readSeconds:.2f} s ({total / 1024 / 1024 / readSeconds:.0f} MB/s)")
+
+        converted = os.path.join(directory, "out-convert")
+        for source, commands in ((notes, COMMANDS), (converted, CONVERTED_COMMANDS)):
+            for command in commands:
+                output = os.path.join(directory, "out-" + "-".join(part for part in command if not part.startswith("--")) + ("-converted" if source == converted else ""))
+                args = [sys.executable, "main.py", *command, source] + (["--output", output] if command[0] != "stat" else [])
+                start = time.perf_counter()
+                completed = subprocess.run(args, capture_output=True, text=True)
+                seconds = time.perf_counter() - start
+                status = "ok" if completed.returncode == 0 else "failed: " + completed.stderr.strip().splitlines()[-1]
+                label = " ".join(command) + (" (converted)" if source == converted else "")
+                print(f"{label:<48} {seconds:>7.2f} s {total / 1024 / 1024 / seconds:>7.1f} MB/s  {status}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,77 @@
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from utils.BlobStore import BlobStore, blobDirectory, extractBlobs
+from utils.HtmlNormalizer import normalizeBlock, normalizeBlocks
+from utils.NtpFormat import decodeNtp, encodeNtp
+
+PARAGRAPHS = 10_000
+IMAGES = 20
+COPIES = 2
+IMAGE_KB = 300
+PARAGRAPH = '<p><span style="font-size: 12pt;">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>'
+
+
+def buildBlocks():
+    #*Random bytes stand in for PNG/JPEG data, which is compressed already and does not shrink in the container either
+    images = [base64.b64encode(b"\x89PNG" + os.urandom(IMAGE_KB * 1024)).decode("ascii") for _ in range(IMAGES)]
+    blocks = [PARAGRAPH.format(i) for i in range(PARAGRAPHS)]
+    step = PARAGRAPHS // (IMAGES * COPIES)
+    for i in range(IMAGES * COPIES):
+        blocks[i * step] = f'<p>Screenshot {i}<img src="data:image/png;base64,{images[i % IMAGES]}" alt="shot {i}"></p>'
+    return blocks
+
+
+def directorySize(directory):
+    total = 0
+    for root, _, files in os.walk(directory):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def timed(function):
+    normalizeBlock.cache_clear()
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run():
+    blocks = buildBlocks()
+    imageBlock = next(block for block in blocks if "data:" in block)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "note.ntp")
+        store = BlobStore(blobDirectory(path))
+
+        inline, inlineSaveMs = timed(lambda: encodeNtp(normalizeBlocks(blocks), normalized=True))
+        changes = []
+        extracted, firstSaveMs = timed(lambda: encodeNtp(normalizeBlocks(extractBlobs(blocks, store, changes)), normalized=True))
+        written = store.written
+        saved = [new for _, _, new in changes]
+        reopened = decodeNtp(extracted)
+        _, againSaveMs = timed(lambda: encodeNtp(normalizeBlocks(extractBlobs(reopened, store)), normalized=True))
+        storeBytes = directorySize(store.directory)
+
+        inlineBlocks, inlineOpenMs = timed(lambda: decodeNtp(inline))
+        storeBlocks, storeOpenMs = timed(lambda: decodeNtp(extracted))
+        savedBlock = next(block for block in saved if "alt=\"shot 0\"" in block)
+
+    print(f"{PARAGRAPHS} paragraphs, {IMAGES} images of {IMAGE_KB} kB pasted {COPIES} times each")
+    print(f"{'':<24} {'inline base64':>16} {'blob store':>16}")
+    print(f"{'.ntp file':<24} {len(inline) / 1024:>13.1f} kB {len(extracted) / 1024:>13.1f} kB")
+    print(f"{'sidecar images':<24} {'':>16} {storeBytes / 1024:>13.1f} kB  ({written} files for {IMAGES * COPIES} images)")
+    print(f"{'first save':<24} {inlineSaveMs:>13.1f} ms {firstSaveMs:>13.1f} ms")
+    print(f"{'later saves':<24} {inlineSaveMs:>13.1f} ms {againSaveMs:>13.1f} ms")
+    print(f"{'open (decode blocks)':<24} {inlineOpenMs:>13.1f} ms {storeOpenMs:>13.1f} ms")
+    print(f"{'model in memory':<24} {sum(map(len, inlineBlocks)) / 1024:>13.1f} kB {sum(map(len, storeBlocks)) / 1024:>13.1f} kB")
+    print(f"{'bridge op, image line':<24} {len(json.dumps(imageBlock)) / 1024:>13.1f} kB {len(json.dumps(savedBlock)) / 1024:>13.1f} kB")
+
+
+if __name__ == "__main__":
+    run()
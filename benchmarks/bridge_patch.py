@@ -0,0 +1,69 @@
+import json
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from utils.DocumentBlocks import DocumentBlocks
+
+SIZES_KB = [1, 10, 100, 1024, 4096]
+KEYSTROKES = 200
+PARAGRAPH = "<p>" + "lorem ipsum dolor sit amet " * 3 + "</p>"
+
+
+def buildBlocks(sizeKb):
+    count = max(1, sizeKb * 1024 // len(PARAGRAPH))
+    return [PARAGRAPH] * count
+
+
+def legacyKeystroke(blocks, index, content):
+    #*Old protocol: whole body innerHTML goes over the channel on every input event
+    blocks[index] = blocks[index][:-4] + "x</p>"
+    html = "".join(blocks)
+    payload = json.dumps(html)
+    content = json.loads(payload)
+    return content, len(payload)
+
+
+def deltaKeystroke(document, index):
+    block = document.blocks[index][:-4] + "x</p>"
+    payload = json.dumps({"ops": [{"start": index, "deleteCount": 1, "blocks": [block]}]})
+    document.applyPatch(payload)
+    return len(payload)
+
+
+def run():
+    results = []
+    for sizeKb in SIZES_KB:
+        blocks = buildBlocks(sizeKb)
+        index = len(blocks) // 2
+
+        legacyBlocks = list(blocks)
+        content = ""
+        start = time.perf_counter()
+        for _ in range(KEYSTROKES):
+            content, legacyBytes = legacyKeystroke(legacyBlocks, index, content)
+        legacyUs = (time.perf_counter() - start) / KEYSTROKES * 1e6
+
+        document = DocumentBlocks(blocks)
+        start = time.perf_counter()
+        for _ in range(KEYSTROKES):
+            deltaBytes = deltaKeystroke(document, index)
+        deltaUs = (time.perf_counter() - start) / KEYSTROKES * 1e6
+
+        results.append({
+            "size_kb": sizeKb,
+            "legacy_us": round(legacyUs, 2),
+            "legacy_bytes": legacyBytes,
+            "delta_us": round(deltaUs, 2),
+            "delta_bytes": deltaBytes,
+        })
+
+    print(f"{'size kB':>10} {'legacy us':>12} {'legacy B':>12} {'delta us':>10} {'delta B':>9}")
+    for row in results:
+        print(f"{row['size_kb']:>10} {row['legacy_us']:>12} {row['legacy_bytes']:>12} {row['delta_us']:>10} {row['delta_bytes']:>9}")
+    return results
+
+
+if __name__ == "__main__":
+    run()
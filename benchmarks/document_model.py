@@ -0,0 +1,119 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from utils.Rope import BlockRope
+
+SIZES_KB = [1, 100, 1024, 10240, 102400]
+LINE = "Meeting notes {0}: agreed to ship the release on friday, {0} items left.\n"
+BUDGET_S = 0.2
+MAX_REPEATS = 1000
+
+
+def buildLines(sizeKb):
+    lines = []
+    size = 0
+    i = 0
+    while size < sizeKb * 1024:
+        line = LINE.format(i)
+        lines.append(line)
+        size += len(line)
+        i += 1
+    return lines
+
+
+def perCall(function):
+    #*Repeats until the time budget is used, so the 1 kB numbers are not just timer noise
+    samples = []
+    spent = 0.0
+    while spent < BUDGET_S and len(samples) < MAX_REPEATS:
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        spent += elapsed
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+class NaiveText:
+    #*One str for the whole document, what currentContent used to be
+    def __init__(self, lines):
+        self.text = "".join(lines)
+
+    def typeAt(self, offset, character):
+        self.text = self.text[:offset] + character + self.text[offset:]
+
+    def deleteAt(self, offset):
+        self.text = self.text[:offset] + self.text[offset + 1:]
+
+    def lineOfOffset(self, offset):
+        return self.text.count("\n", 0, offset)
+
+    def offsetOfLine(self, line):
+        position = -1
+        for _ in range(line):
+            position = self.text.index("\n", position + 1)
+        return position + 1
+
+    def writeTo(self, file):
+        file.write(self.text)
+
+
+class RopeText:
+    def __init__(self, lines):
+        self.rope = BlockRope(lines)
+
+    def typeAt(self, offset, character):
+        index, local = self.rope.blockAtOffset(offset)
+        block = self.rope[index]
+        self.rope = self.rope.splice(index, 1, [block[:local] + character + block[local:]])
+
+    def deleteAt(self, offset):
+        index, local = self.rope.blockAtOffset(offset)
+        block = self.rope[index]
+        self.rope = self.rope.splice(index, 1, [block[:local] + block[local + 1:]])
+
+    def lineOfOffset(self, offset):
+        return self.rope.lineOfOffset(offset)
+
+    def offsetOfLine(self, line):
+        return self.rope.offsetOfLine(line)
+
+    def writeTo(self, file):
+        self.rope.writeTo(file)
+
+
+def measure(model, lines, chars):
+    random.seed(0)
+    middle = chars // 2
+    results = {}
+    start = time.perf_counter()
+    document = model(lines)
+    results["build_ms"] = (time.perf_counter() - start) * 1000
+    results["insert_ms"] = perCall(lambda: document.typeAt(middle, "x"))
+    results["delete_ms"] = perCall(lambda: document.deleteAt(middle))
+    results["offset_to_line_ms"] = perCall(lambda: document.lineOfOffset(random.randrange(chars)))
+    results["line_to_offset_ms"] = perCall(lambda: document.offsetOfLine(random.randrange(len(lines))))
+    with open(os.devnull, "w", encoding="utf-8") as file:
+        results["serialize_ms"] = perCall(lambda: document.writeTo(file))
+    return results
+
+
+def run():
+    models = (("str", NaiveText), ("rope", RopeText))
+    metrics = ["build_ms", "insert_ms", "delete_ms", "offset_to_line_ms", "line_to_offset_ms", "serialize_ms"]
+    print(f"{'size':>9} {'model':<6}" + "".join(f" {metric:>18}" for metric in metrics))
+    for sizeKb in SIZES_KB:
+        lines = buildLines(sizeKb)
+        chars = sum(map(len, lines))
+        for name, model in models:
+            results = measure(model, lines, chars)
+            print(f"{sizeKb:>7}kB {name:<6}" + "".join(f" {results[metric]:>18.4f}" for metric in metrics))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, ".")
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt, QCoreApplication, QEventLoop
+
+from components.BodyArea import ComponentBodyArea
+
+SIZES_KB = [1, 100, 1024]
+ROUNDS = 5
+PARAGRAPH = "<p>" + "lorem ipsum dolor sit amet " * 3 + "</p>"
+
+
+def buildBlocks(sizeKb):
+    return [PARAGRAPH] * max(1, sizeKb * 1024 // len(PARAGRAPH))
+
+
+def waitUntil(app, predicate, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("editor did not respond")
+        app.processEvents(QEventLoop.AllEvents, 5)
+
+
+def timeSwap(app, bodyArea, blocks):
+    done = []
+    start = time.perf_counter()
+    bodyArea.setDocument(blocks, rich=True)
+    #*Reading offsetHeight forces the layout of the swapped body before we stop the clock
+    bodyArea.editor.webView.page().runJavaScript("document.body.offsetHeight", 0, done.append)
+    waitUntil(app, lambda: done)
+    return (time.perf_counter() - start) * 1000
+
+
+def timeNavigation(app, bodyArea, blocks):
+    done = []
+    page = bodyArea.editor.webView.page()
+    page.loadFinished.connect(done.append)
+    start = time.perf_counter()
+    bodyArea.editor.webView.setHtml('<html><body contenteditable="true">' + "".join(blocks) + "</body></html>")
+    waitUntil(app, lambda: done)
+    page.loadFinished.disconnect(done.append)
+    return (time.perf_counter() - start) * 1000
+
+
+def run():
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication.instance() or QApplication(sys.argv)
+    bodyArea = ComponentBodyArea()
+    bodyArea.resize(1000, 700)
+    bodyArea.show()
+    bodyArea.setDocument(buildBlocks(1), rich=True)
+    waitUntil(app, lambda: bodyArea.editor.editorIsReady)
+
+    print(f"{'size kB':>10} {'swap ms':>10}")
+    for sizeKb in SIZES_KB:
+        blocks = buildBlocks(sizeKb)
+        samples = [timeSwap(app, bodyArea, blocks if i % 2 == 0 else blocks[:1]) for i in range(ROUNDS * 2)]
+        print(f"{sizeKb:>10} {min(samples[::2]):>10.2f}")
+
+    #*setHtml is limited to 2 MB, so the reload comparison stops below that
+    bodyArea.editor.editorIsReady = False
+    print(f"{'size kB':>10} {'setHtml ms':>12}")
+    for sizeKb in SIZES_KB:
+        if sizeKb >= 2048:
+            continue
+        samples = [timeNavigation(app, bodyArea, buildBlocks(sizeKb)) for _ in range(ROUNDS)]
+        print(f"{sizeKb:>10} {min(samples):>12.2f}")
+
+
+if __name__ == "__main__":
+    run()
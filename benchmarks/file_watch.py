@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.BlockDiff import diffNormalizedBlocks
+from utils.HtmlNormalizer import normalizeBlocks
+
+WATCHED_FILES = 5000
+DIRECTORIES = 50
+CHANGED_FILES = 20
+IDLE_SECONDS = 3
+TIMEOUT_S = 10
+DOCUMENT_BLOCKS = 100_000
+PARAGRAPH = '<p><span style="font-size: 12pt;">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>\n'
+
+
+def measureDiff():
+    #*What an external edit costs to apply: the editor's Chromium serialized blocks against the normalized file
+    random.seed(0)
+    old = [PARAGRAPH.format(i) for i in range(DOCUMENT_BLOCKS)]
+    for edits in (1, 10, 100):
+        #*The save that wrote the file normalized the same blocks, which leaves them in the normalizer cache
+        new = normalizeBlocks(old)
+        for position in sorted(random.sample(range(DOCUMENT_BLOCKS), edits), reverse=True):
+            new[position:position + 1] = ["<p>changed elsewhere</p>", "<p>and a new line</p>"]
+        start = time.perf_counter()
+        ops = diffNormalizedBlocks(old, new, newNormalized=True)
+        seconds = time.perf_counter() - start
+        sentBlocks = sum(len(op["blocks"]) for op in ops)
+        patched = list(old)
+        for op in reversed(ops):
+            patched[op["start"]:op["start"] + op["deleteCount"]] = op["blocks"]
+        print(f"{edits:>4} edits in {DOCUMENT_BLOCKS} blocks: diff {seconds * 1000:8.1f} ms, {len(ops):>4} ops, "
+              f"{sentBlocks:>6} blocks sent instead of {len(new)}, applied {'ok' if normalizeBlocks(patched) == new else 'WRONG'}")
+
+
+def waitFor(app, condition, QEventLoop):
+    deadline = time.perf_counter() + TIMEOUT_S
+    while not condition() and time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 5)
+    return condition()
+
+
+def measureChild(directory):
+    from PySide6.QtCore import QCoreApplication, QEventLoop
+    from utils.FileWatcher import FileWatcher
+
+    app = QCoreApplication(sys.argv)
+    paths = []
+    for i in range(WATCHED_FILES):
+        folder = os.path.join(directory, f"{i % DIRECTORIES:02d}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"note{i}.txt")
+        with open(path, "w") as file:
+            file.write(f"note {i}\n" * 20)
+        paths.append(path)
+
+    changed = []
+    watcher = FileWatcher()
+    watcher.changed.connect(changed.append)
+    start = time.perf_counter()
+    for path in paths:
+        watcher.watch(path)
+    results = {"watch_ms": (time.perf_counter() - start) * 1000}
+    waitFor(app, lambda: all(value is not None for value in watcher.known.values()), QEventLoop)
+    results["baseline_ms"] = (time.perf_counter() - start) * 1000
+    results["inotify_watches"] = len(watcher.watcher.files()) + len(watcher.watcher.directories())
+
+    #*No polling: an idle watcher should cost next to no CPU
+    cpuStart = time.process_time()
+    idleEnd = time.perf_counter() + IDLE_SECONDS
+    while time.perf_counter() < idleEnd:
+        app.processEvents(QEventLoop.AllEvents, 50)
+    results["idle_cpu_percent"] = (time.process_time() - cpuStart) / IDLE_SECONDS * 100
+
+    latencies = []
+    for path in random.sample(paths, CHANGED_FILES):
+        changed.clear()
+        start = time.perf_counter()
+        with open(path, "a") as file:
+            file.write("changed by another program\n")
+        if waitFor(app, lambda: changed, QEventLoop):
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    results["detected"] = f"{len(latencies)}/{CHANGED_FILES}"
+    results["latency_median_ms"] = latencies[len(latencies) // 2] if latencies else None
+
+    #*A touch changes mtime only, the content hash filters it out
+    changed.clear()
+    for path in paths[:100]:
+        os.utime(path)
+    settle = time.perf_counter() + 1
+    while time.perf_counter() < settle:
+        app.processEvents(QEventLoop.AllEvents, 20)
+    results["false_positives_on_touch"] = len(changed)
+
+    #*Editors that save through a rename replace the inode, the directory watch picks that up
+    changed.clear()
+    target = paths[1]
+    with open(target + ".tmp", "w") as file:
+        file.write("replaced through rename\n")
+    os.replace(target + ".tmp", target)
+    results["atomic_rename_detected"] = waitFor(app, lambda: changed, QEventLoop)
+
+    watcher.shutdown()
+    print(json.dumps(results))
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Watch latency, idle cost and diff-based reload of open files")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        measureChild(args.child)
+        return
+
+    measureDiff()
+    with tempfile.TemporaryDirectory() as directory:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", directory],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        print("watcher: " + (completed.stderr.strip().splitlines() or ["no output"])[-1], file=sys.stderr)
+        sys.exit(1)
+    print(f"{WATCHED_FILES} watched files in {DIRECTORIES} directories")
+    for metric, value in json.loads(lines[-1]).items():
+        print(f"    {metric:<26} {value:>10.1f}" if isinstance(value, float) else f"    {metric:<26} {value!s:>10}")
+
+
+if __name__ == "__main__":
+    run()
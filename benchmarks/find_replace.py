@@ -0,0 +1,69 @@
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from utils.DocumentBlocks import DocumentBlocks
+from utils.FindReplace import FindSession
+
+DOCUMENT_MB = 20
+MATCHES = 100_000
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "tempor"]
+TARGET_REPLACE_S = 1.0
+
+
+def buildBlocks(rng):
+    blocks = []
+    size = 0
+    while size < DOCUMENT_MB * 1024 * 1024:
+        words = rng.choices(WORDS, k=60)
+        block = "<p>" + " ".join(words[:20]) + " <b>" + " ".join(words[20:30]) + "</b> " + " ".join(words[30:]) + " &amp; more</p>"
+        blocks.append(block)
+        size += len(block)
+    #*Plant the needle so the match count is fixed whatever the random text looks like
+    for i in range(MATCHES):
+        index = i * len(blocks) // MATCHES
+        blocks[index] = blocks[index].replace("<p>", "<p>needle ", 1)
+    return blocks
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run():
+    blocks = buildBlocks(random.Random(3))
+    document = DocumentBlocks(blocks)
+    session = FindSession()
+    print(f"document: {document.byteSize / 1024 / 1024:.1f} MB in {len(document)} blocks")
+
+    _, indexMs = timed(lambda: session.updateIndex(list(document.blocks), document.version, True))
+    print(f"text index:        {indexMs:>8.1f} ms")
+    for typed in range(1, len("needle") + 1):
+        matches, findMs = timed(lambda: session.find("needle"[:typed]))
+        print(f"find {'needle'[:typed]!r:>10}: {findMs:>8.1f} ms, {len(matches)} matches")
+    matches, regexMs = timed(lambda: session.find(r"needle\s+\w+", regex=True))
+    print(f"regex find:        {regexMs:>8.1f} ms, {len(matches)} matches")
+
+    session.find("needle")
+    (ops, count), replaceMs = timed(lambda: session.replaceAll("pin"))
+
+    def apply():
+        for op in reversed(ops):
+            document.splice(op["start"], op["deleteCount"], op["blocks"])
+    _, applyMs = timed(apply)
+    _, reindexMs = timed(lambda: session.updateIndex(list(document.blocks), document.version, True))
+    print(f"replace all:       {replaceMs:>8.1f} ms, {count} matches in {len(ops)} splices")
+    print(f"apply to model:    {applyMs:>8.1f} ms")
+    print(f"reindex after:     {reindexMs:>8.1f} ms")
+    print(f"left after:        {len(session.find('needle'))} matches")
+
+    total = (replaceMs + applyMs) / 1000
+    print(f"replace total: {total:.2f} s (target {TARGET_REPLACE_S:.1f} s)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from utils.HtmlBlocks import splitBlocks
+from utils.HtmlNormalizer import normalizeBlocks
+from utils.NtpFormat import NtpReader, encodeNtp
+
+SIZES_KB = [100, 1024, 10240]
+HEAD = '<head><meta charset="utf-8"><script src="qrc:///qtwebchannel/qwebchannel.js"></script><script>' + "var bridge = 1;\n" * 200 + "</script></head>"
+#*What files saved from innerHTML look like after a few open/save round trips
+PARAGRAPH = (
+    '    <div contenteditable="true"><p>  <span><span style="font-size:12pt ;"><span style="font-size: 12pt">Meeting notes {0}:</span>'
+    '<span style="font-size: 12pt;"> agreed to ship the release on friday,</span></span></span>'
+    '<span style="font-size: 12pt;">  {0}   items left.</span><b></b><span></span></p></div>\n'
+)
+
+
+def buildHtml(sizeKb):
+    parts = ['<html contenteditable="true">', HEAD, '<body contenteditable="true">\n  <div contenteditable="true">\n']
+    size = 0
+    i = 0
+    while size < sizeKb * 1024:
+        paragraph = PARAGRAPH.format(i)
+        parts.append(paragraph)
+        size += len(paragraph)
+        i += 1
+    parts.append("  </div>\n</body></html>")
+    return "".join(parts)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def openContainer(path):
+    with NtpReader(path) as reader:
+        return reader.readAll()
+
+
+def run():
+    print(f"{'size kB':>8} {'stage':>11} {'html kB':>9} {'disk kB':>9} {'save ms':>9} {'open ms':>9} {'blocks':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for sizeKb in SIZES_KB:
+            html = buildHtml(sizeKb)
+            for stage, convert in (("split", splitBlocks), ("normalized", normalizeBlocks)):
+                path = os.path.join(directory, f"{stage}{sizeKb}.ntp")
+                saveMs, blocks = timed(lambda: encodeNtp(convert(html)))
+                with open(path, "wb") as file:
+                    file.write(blocks)
+                openMs, loaded = timed(lambda: openContainer(path))
+                #*html kB is what the editor has to parse and lay out on every open
+                htmlKb = sum(len(block) for block in loaded) / 1024
+                print(f"{sizeKb:>8} {stage:>11} {htmlKb:>9.1f} {os.path.getsize(path) / 1024:>9.1f} {saveMs:>9.2f} {openMs:>9.2f} {len(loaded):>8}")
+
+
+if __name__ == "__main__":
+    run()
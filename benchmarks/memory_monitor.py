@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from utils.PreloadCache import PreloadCache
+from utils.ProcessMemory import descendantPids, hasProc, readMemoryKb, sampleMemory
+
+SHARED_MB = 200
+CHILD_COUNTS = [0, 4, 16]
+SAMPLES = 200
+PARAGRAPH = '<p><span style="font-size: 12pt;">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>\n'
+CACHE_FILES = 20
+CACHE_BLOCKS = 20_000
+
+
+def forkChildren(count):
+    #*Forked children share the parent's pages like the web engine zygote shares them with its renderers
+    pids = []
+    for _ in range(count):
+        pid = os.fork()
+        if pid == 0:
+            time.sleep(3600)
+            os._exit(0)
+        pids.append(pid)
+    return pids
+
+
+def stopChildren(pids):
+    for pid in pids:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+
+
+def measureSampling(children):
+    pids = forkChildren(children)
+    try:
+        time.sleep(0.2)
+        start = time.perf_counter()
+        for _ in range(SAMPLES):
+            sample = sampleMemory()
+        perSample = (time.perf_counter() - start) / SAMPLES * 1000
+        rssSum = readMemoryKb(os.getpid())[0] + sum(readMemoryKb(pid)[0] for pid in descendantPids(os.getpid()))
+        print(f"{children:>3} children: {perSample:7.3f} ms per sample, "
+              f"PSS total {sample['total_pss_kb'] / 1024:8.1f} MB, RSS summed {rssSum / 1024:8.1f} MB")
+    finally:
+        stopChildren(pids)
+
+
+def measureTrim():
+    cache = PreloadCache()
+    for i in range(CACHE_FILES):
+        cache.put(f"/notes/{i}.ntp", (i, 0), [PARAGRAPH.format(f"{i}.{j}") for j in range(CACHE_BLOCKS)])
+    before = sampleMemory()["app_pss_kb"]
+    cached = cache.stats()["bytes"]
+    start = time.perf_counter()
+    cache.trim(0)
+    seconds = time.perf_counter() - start
+    after = sampleMemory()["app_pss_kb"]
+    print(f"preload cache trim: {cached / 1048576:.1f} MB of entries dropped in {seconds * 1000:.2f} ms, "
+          f"app PSS {before / 1024:.1f} -> {after / 1024:.1f} MB")
+
+
+def run():
+    if not hasProc():
+        print("no /proc on this system", file=sys.stderr)
+        sys.exit(1)
+    shared = bytearray(os.urandom(1024)) * (SHARED_MB * 1024)
+    print(f"{SHARED_MB} MB allocated before forking, {SAMPLES} samples each")
+    for children in CHILD_COUNTS:
+        measureSampling(children)
+    del shared
+    measureTrim()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from utils.HtmlBlocks import BlockSplitter, splitBlocks
+from utils.NtpFormat import NtpReader, encodeNtp
+
+SIZES_KB = [100, 1024, 10240]
+HEAD = '<head><script src="qrc:///qtwebchannel/qwebchannel.js"></script><script>' + "var bridge = 1;\n" * 200 + "</script></head>"
+PARAGRAPH = '<p><span style="font-size: 12pt;">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>\n'
+
+
+def buildHtml(sizeKb):
+    parts = [HEAD, '<body contenteditable="true">']
+    size = 0
+    i = 0
+    while size < sizeKb * 1024:
+        paragraph = PARAGRAPH.format(i)
+        parts.append(paragraph)
+        size += len(paragraph)
+        i += 1
+    parts.append("</body>")
+    return "".join(parts)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def openPlain(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return splitBlocks(file.read())
+
+
+def firstPaintPlain(path):
+    splitter = BlockSplitter()
+    with open(path, "r", encoding="utf-8") as file:
+        return splitter.feed(file.read(64 * 1024))
+
+
+def openContainer(path):
+    with NtpReader(path) as reader:
+        return reader.readAll()
+
+
+def firstPaintContainer(path):
+    with NtpReader(path) as reader:
+        return reader.readChunk(0)
+
+
+def run():
+    print(f"{'size kB':>8} {'format':>7} {'disk kB':>9} {'open ms':>9} {'first paint ms':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for sizeKb in SIZES_KB:
+            html = buildHtml(sizeKb)
+            plainPath = os.path.join(directory, f"plain{sizeKb}.ntp")
+            with open(plainPath, "w", encoding="utf-8") as file:
+                file.write(html)
+            openMs, blocks = timed(lambda: openPlain(plainPath))
+            paintMs, _ = timed(lambda: firstPaintPlain(plainPath))
+            print(f"{sizeKb:>8} {'plain':>7} {os.path.getsize(plainPath) / 1024:>9.1f} {openMs:>9.2f} {paintMs:>15.2f}")
+
+            for codec in ("zlib", "lzma"):
+                path = os.path.join(directory, f"{codec}{sizeKb}.ntp")
+                with open(path, "wb") as file:
+                    file.write(encodeNtp(blocks, codec))
+                openMs, loaded = timed(lambda: openContainer(path))
+                paintMs, _ = timed(lambda: firstPaintContainer(path))
+                assert loaded == blocks
+                print(f"{sizeKb:>8} {codec:>7} {os.path.getsize(path) / 1024:>9.1f} {openMs:>9.2f} {paintMs:>15.2f}")
+
+
+if __name__ == "__main__":
+    run()
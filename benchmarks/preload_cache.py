@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from utils.HtmlBlocks import splitBlocks
+from utils.NtpFormat import encodeNtp
+from utils.PreloadCache import PreloadCache, readBlocks
+
+SIZES_KB = [100, 1024, 10240]
+PARAGRAPH = '<p><span style="font-size: 12pt">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>\n'
+
+
+def buildHtml(sizeKb):
+    parts = []
+    size = 0
+    i = 0
+    while size < sizeKb * 1024:
+        paragraph = PARAGRAPH.format(i)
+        parts.append(paragraph)
+        size += len(paragraph)
+        i += 1
+    return "".join(parts)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def run():
+    cache = PreloadCache()
+    #*Warm opens not touching the file and invalidation are asserted in tests/test_preload_cache.py
+    print(f"{'size kB':>8} {'format':>7} {'cold ms':>9} {'warm ms':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for sizeKb in SIZES_KB:
+            html = buildHtml(sizeKb)
+            for name, data in (("plain", html.encode("utf-8")), ("zlib", encodeNtp(splitBlocks(html)))):
+                path = os.path.join(directory, f"{name}{sizeKb}.ntp")
+                with open(path, "wb") as file:
+                    file.write(data)
+
+                coldMs, _ = timed(lambda: readBlocks(path))
+                cache.prefetch(path)
+                warmMs, _ = timed(lambda: cache.get(path))
+                print(f"{sizeKb:>8} {name:>7} {coldMs:>9.2f} {warmMs:>9.3f}")
+
+    stats = cache.stats()
+    print(f"entries {stats['entries']}, {stats['bytes'] / 1024 / 1024:.1f} MB, {stats['hits']} hits, {stats['misses']} misses")
+
+
+if __name__ == "__main__":
+    run()
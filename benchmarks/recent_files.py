@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from utils.RecentFiles import RecentFiles
+
+ENTRIES = 100_000
+LEGACY_SAMPLES = 20
+
+
+def legacySave(configFile, filePath, sizeKb):
+    #*The old saveFilePath: parse everything, scan, rewrite everything
+    with open(configFile, "r") as file:
+        data = json.load(file)
+    for item in data:
+        if item["path"] == filePath:
+            item["size_kb"] = sizeKb
+            break
+    else:
+        data.append({"path": filePath, "size_kb": sizeKb})
+    with open(configFile, "w") as file:
+        json.dump(data, file, indent=4)
+
+
+def run():
+    with tempfile.TemporaryDirectory() as directory:
+        store = RecentFiles(os.path.join(directory, "files.db"), None, limit=ENTRIES)
+        start = time.perf_counter()
+        for i in range(ENTRIES):
+            store.upsert(f"/notes/note{i}.ntp", i / 1024)
+        fillSeconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(0, ENTRIES, ENTRIES // 1000):
+            store.upsert(f"/notes/note{i}.ntp", 1.0)
+        updateUs = (time.perf_counter() - start) / 1000 * 1e6
+
+        start = time.perf_counter()
+        for i in range(1000):
+            store.upsert(f"/notes/extra{i}.ntp", 1.0)
+        evictUs = (time.perf_counter() - start) / 1000 * 1e6
+
+        start = time.perf_counter()
+        recent = store.entries(20)
+        topMs = (time.perf_counter() - start) * 1000
+        store.close()
+
+        configFile = os.path.join(directory, "files.json")
+        with open(configFile, "w") as file:
+            json.dump([{"path": f"/notes/note{i}.ntp", "size_kb": i / 1024} for i in range(ENTRIES)], file, indent=4)
+        start = time.perf_counter()
+        for i in range(LEGACY_SAMPLES):
+            legacySave(configFile, f"/notes/note{i * 997}.ntp", 1.0)
+        legacyUs = (time.perf_counter() - start) / LEGACY_SAMPLES * 1e6
+
+    print(f"entries:               {ENTRIES}")
+    print(f"fill (one txn each):   {fillSeconds:.2f} s")
+    print(f"upsert existing:       {updateUs:.1f} us")
+    print(f"upsert with eviction:  {evictUs:.1f} us")
+    print(f"top 20 query:          {topMs:.2f} ms ({len(recent)} rows)")
+    print(f"legacy json save:      {legacyUs:.1f} us")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,100 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from utils.NtpFormat import encodeNtp
+from utils.SearchIndex import SearchIndex
+
+TARGET_QUERY_MS = 50
+QUERIES = ["lorem", "quantum ledger", "zebra", "report 2024", "migr", "velvet harbor", "alpha beta gamma", "nothingmatches"]
+VOCABULARY_SIZE = 50_000
+PARAGRAPH_POOL = 20_000
+
+
+def buildVocabulary(rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = [word for query in QUERIES for word in query.split()]
+    while len(words) < VOCABULARY_SIZE:
+        words.append("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return words
+
+
+def writeCorpus(directory, files, fileKb, rng):
+    vocabulary = buildVocabulary(rng)
+    #*Zipf-like weights so a few words are everywhere and most are rare, like real prose
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    pool = [" ".join(rng.choices(vocabulary, weights, k=60)) for _ in range(PARAGRAPH_POOL)]
+    paragraphsPerFile = max(1, fileKb * 1024 // (len(pool[0]) + 1))
+    paths = []
+    for i in range(files):
+        paragraphs = rng.choices(pool, k=paragraphsPerFile)
+        if i % 3 == 0:
+            path = os.path.join(directory, f"note{i}.txt")
+            with open(path, "w") as file:
+                file.write("\n".join(paragraphs))
+        else:
+            path = os.path.join(directory, f"note{i}.ntp")
+            with open(path, "wb") as file:
+                file.write(encodeNtp([f"<p>{paragraph}</p>" for paragraph in paragraphs]))
+        paths.append(path)
+    return paths
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--file-kb", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        paths = writeCorpus(directory, args.files, args.file_kb, rng)
+        corpusSeconds = time.perf_counter() - start
+
+        index = SearchIndex(os.path.join(directory, "search.db"))
+        start = time.perf_counter()
+        indexed = index.updateMany(paths, args.workers)
+        buildSeconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        unchanged = index.updateMany(paths, args.workers)
+        rescanSeconds = time.perf_counter() - start
+
+        with open(paths[0], "a") as file:
+            file.write(" freshly appended words")
+        start = time.perf_counter()
+        index.update(paths[0])
+        updateMs = (time.perf_counter() - start) * 1000
+
+        print(f"corpus:            {args.files} files x {args.file_kb} kB ({corpusSeconds:.1f} s to write)")
+        print(f"initial build:     {buildSeconds:.1f} s ({indexed} files)")
+        print(f"unchanged rescan:  {rescanSeconds:.2f} s ({unchanged} reindexed)")
+        print(f"single update:     {updateMs:.1f} ms")
+        print(f"{'query':>20} {'hits':>6} {'p50 ms':>8} {'max ms':>8}")
+        worstMs = 0
+        for query in QUERIES:
+            samples = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                results = index.search(query)
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            worstMs = max(worstMs, samples[-1])
+            print(f"{query:>20} {len(results):>6} {samples[len(samples) // 2]:>8.2f} {samples[-1]:>8.2f}")
+        index.close()
+
+    print(f"worst query: {worstMs:.2f} ms (target {TARGET_QUERY_MS} ms)")
+    if worstMs > TARGET_QUERY_MS:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
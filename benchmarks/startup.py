@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFERRED_MODULES = ["PySide6.QtWebEngineWidgets", "PySide6.QtWebChannel", "BlurWindow", "sqlite3", "components.BodyArea"]
+#*Loaded before QApplication on purpose, custom url schemes can't be registered any later
+EARLY_MODULES = ["PySide6.QtWebEngineCore"]
+
+
+def importProfile():
+    result = subprocess.run(
+        #*Same path as running main.py, the application is created so the scheme registration is measured too
+        [sys.executable, "-X", "importtime", "-c", "import main; main.createApplication()"],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        selfUs, cumulativeUs, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        modules.append({"module": name, "self_us": int(selfUs), "cumulative_us": int(cumulativeUs)})
+    topLevel = [module for module in modules if not module["module"].startswith(" ")]
+    return {
+        "total_ms": sum(module["cumulative_us"] for module in topLevel) / 1000,
+        "slowest": sorted(topLevel, key=lambda module: module["cumulative_us"], reverse=True)[:10],
+        "eager_heavy_imports": [name for name in DEFERRED_MODULES if any(module["module"].strip() == name for module in modules)],
+        "early_imports_ms": {module["module"].strip(): module["cumulative_us"] / 1000 for module in modules if module["module"].strip() in EARLY_MODULES},
+    }
+
+
+def firstFrameChild():
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import main
+    from PySide6.QtCore import QEventLoop
+
+    app = main.createApplication()
+    window = main.MainWindow()
+    window.show()
+    deadline = time.perf_counter() + 30
+    while "ready" not in window.startupTimes and time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 5)
+    print(json.dumps(window.startupTimes))
+
+
+def firstFrame(rounds):
+    samples = []
+    for _ in range(rounds):
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {stage: min(sample.get(stage, float("inf")) for sample in samples) for stage in ("chrome", "firstFrame", "ready")}
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Measure import time and time to first frame")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-first-frame-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.child:
+        firstFrameChild()
+        return
+
+    report = {"imports": importProfile(), "startup_ms": firstFrame(args.rounds)}
+    print(json.dumps(report, indent=4))
+
+    failures = []
+    if report["imports"]["eager_heavy_imports"]:
+        failures.append(f"imported before first paint: {', '.join(report['imports']['eager_heavy_imports'])}")
+    if args.max_first_frame_ms is not None and report["startup_ms"]["firstFrame"] > args.max_first_frame_ms:
+        failures.append(f"first frame after {report['startup_ms']['firstFrame']:.1f} ms")
+    if failures:
+        print("\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES_KB = [1, 100, 1024, 10240, 51200]
+METRICS = ["open_first_blocks_ms", "open_ms", "keystroke_ms", "save_ms", "peak_rss_mb"]
+PARAGRAPH = '<p><span style="font-size: 12pt;">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>\n'
+TIMEOUT_S = 300
+
+
+def buildHtml(sizeKb):
+    parts = ['<html contenteditable="true"><body>']
+    size = 0
+    i = 0
+    while size < sizeKb * 1024:
+        paragraph = PARAGRAPH.format(i)
+        parts.append(paragraph)
+        size += len(paragraph)
+        i += 1
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def statusKb(pid, field):
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def descendants(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                parent = int(file.read().rsplit(")", 1)[1].split()[1])
+        except OSError:
+            continue
+        if parent == pid:
+            children.append(int(entry))
+            children.extend(descendants(int(entry)))
+    return children
+
+
+def peakRssMb():
+    #*VmHWM is the high-water mark, the web engine renderer is a child process and counts too
+    pid = os.getpid()
+    return sum(statusKb(p, "VmHWM") for p in [pid] + descendants(pid)) / 1024
+
+
+def waitUntil(app, predicate, timeout=TIMEOUT_S):
+    from PySide6.QtCore import QEventLoop
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark step did not finish")
+        app.processEvents(QEventLoop.AllEvents, 5)
+
+
+def measureChild(sizeKb):
+    sys.path.insert(0, ROOT)
+    #*Run in a scratch directory so configs/ (recent files, recovery journals) of the real install are left alone
+    workDir = tempfile.mkdtemp(prefix="notepad-bench-")
+    os.chdir(workDir)
+
+    import main
+    from PySide6.QtCore import Qt, QCoreApplication
+    from PySide6.QtWidgets import QApplication
+
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+    window = main.MainWindow()
+    window.show()
+    waitUntil(app, lambda: "ready" in window.startupTimes)
+
+    path = os.path.join(workDir, f"bench{sizeKb}.ntp")
+    with open(path, "w") as file:
+        file.write(buildHtml(sizeKb))
+
+    nav = window.navWidget
+    bodyArea = window.bodyWidget
+    result = {}
+
+    start = time.perf_counter()
+    nav.openPath(path)
+    waitUntil(app, lambda: nav.loadDocument is not None or nav.loadToken is None)
+    result["open_first_blocks_ms"] = (time.perf_counter() - start) * 1000
+    waitUntil(app, lambda: nav.loadToken is None and bodyArea.editor is not None and bodyArea.editor.editorIsReady)
+    #*runJavaScript calls run in order, so this answers once every appended block is in the page
+    done = []
+    bodyArea.editor.runJavaScript("document.body.childNodes.length", done.append)
+    waitUntil(app, lambda: done)
+    result["open_ms"] = (time.perf_counter() - start) * 1000
+    result["blocks"] = len(bodyArea.document)
+
+    from components.RichTextEditor import PATCH_DEBOUNCE_MS
+    samples = []
+    for i in range(5):
+        version = bodyArea.document.version
+        start = time.perf_counter()
+        bodyArea.editor.runJavaScript(f"document.body.lastChild.appendChild(document.createTextNode('typed {i}'))")
+        waitUntil(app, lambda: bodyArea.document.version != version)
+        samples.append((time.perf_counter() - start) * 1000)
+    result["keystroke_ms"] = min(samples)
+    result["keystroke_debounce_ms"] = PATCH_DEBOUNCE_MS
+
+    saved = []
+    bodyArea.saveEngine.saved.connect(lambda savedPath, sequence: saved.append(savedPath))
+    start = time.perf_counter()
+    bodyArea.saveFile()
+    waitUntil(app, lambda: path in saved)
+    result["save_ms"] = (time.perf_counter() - start) * 1000
+
+    result["peak_rss_mb"] = peakRssMb()
+    print(json.dumps(result))
+
+
+def measure(sizeKb):
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", str(sizeKb)],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        return {"error": (completed.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(lines[-1])
+
+
+def compare(report, baseline, tolerance):
+    regressions = []
+    for size, metrics in report["results"].items():
+        previous = baseline.get("results", {}).get(size)
+        if not previous or "error" in metrics or "error" in previous:
+            continue
+        for metric in METRICS:
+            if metric not in metrics or not previous.get(metric):
+                continue
+            ratio = metrics[metric] / previous[metric]
+            marker = "  REGRESSION" if ratio > 1 + tolerance else ""
+            print(f"{size:>8} {metric:<22} {previous[metric]:>10.1f} -> {metrics[metric]:>10.1f} ({ratio:>5.2f}x){marker}", file=sys.stderr)
+            if marker:
+                regressions.append(f"{size} {metric}")
+    return regressions
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Measure open, keystroke and save latency of MainWindow across document sizes")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES_KB, help="document sizes in kB")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="compare against a report written by an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a metric counts as a regression")
+    args = parser.parse_args()
+
+    if args.child is not None:
+        measureChild(args.child)
+        return
+
+    report = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": {},
+    }
+    for sizeKb in args.sizes:
+        #*Every size runs in its own process so peak RSS belongs to that document alone
+        report["results"][f"{sizeKb}kB"] = measure(sizeKb)
+
+    output = json.dumps(report, indent=4)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"regressed: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, ".")
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt, QCoreApplication, QEventLoop
+
+from components.BodyArea import ComponentBodyArea, MAX_LIVE_VIEWS
+
+TABS = 50
+DOCUMENT_KB = 200
+REPORT_EVERY = 5
+PARAGRAPH = "<p>" + "lorem ipsum dolor sit amet " * 3 + "</p>"
+
+
+def rssKb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def childPids(pid):
+    #*QtWebEngine renders in child processes, their memory counts towards the tabs too
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as file:
+                fields = file.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            pids.append(int(entry))
+            pids.extend(childPids(int(entry)))
+    return pids
+
+
+def totalRssMb():
+    pid = os.getpid()
+    return sum(rssKb(p) for p in [pid] + childPids(pid)) / 1024
+
+
+def settle(app, seconds=0.3):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 5)
+
+
+def run():
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication.instance() or QApplication(sys.argv)
+    bodyArea = ComponentBodyArea()
+    bodyArea.resize(1000, 700)
+    bodyArea.show()
+    settle(app)
+
+    blocks = [PARAGRAPH] * (DOCUMENT_KB * 1024 // len(PARAGRAPH))
+    print(f"live views: {MAX_LIVE_VIEWS}, document: {DOCUMENT_KB} kB")
+    print(f"{'tabs':>6} {'RSS MB':>10} {'switch ms':>10}")
+    print(f"{0:>6} {totalRssMb():>10.1f} {'-':>10}")
+    for tab in range(1, TABS + 1):
+        bodyArea.openDocument([f"<p>document {tab}</p>"] + blocks, f"/tmp/tab{tab}.ntp")
+        settle(app, 0.05)
+        if tab % REPORT_EVERY == 0:
+            #*Switching to the oldest tab restores it from its parked container
+            start = time.perf_counter()
+            bodyArea.activateDocument(0)
+            switchMs = (time.perf_counter() - start) * 1000
+            settle(app)
+            print(f"{tab:>6} {totalRssMb():>10.1f} {switchMs:>10.2f}")
+            bodyArea.activateDocument(len(bodyArea.documents) - 1)
+
+    bodyArea.shutdownAutosave()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARAGRAPHS = 100_000
+PARAGRAPH = '<p><span style="font-size: 12pt;">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>'
+SCROLL_SECONDS = 5
+SCROLL_PX_PER_FRAME = 400
+TIMEOUT_S = 120
+
+#*Scrolls a fixed distance every animation frame and reports how often frames actually came
+SCROLL_SCRIPT = """
+(function() {
+    window.scrollResult = null;
+    var frames = [];
+    var start = performance.now();
+    var last = start;
+    function step(now) {
+        frames.push(now - last);
+        last = now;
+        window.scrollBy(0, %(step)d);
+        if (now - start < %(seconds)d * 1000) {
+            requestAnimationFrame(step);
+            return;
+        }
+        frames.sort(function(a, b) { return a - b; });
+        window.scrollResult = {
+            fps: frames.length / ((now - start) / 1000),
+            p95_frame_ms: frames[Math.floor(frames.length * 0.95)],
+            worst_frame_ms: frames[frames.length - 1],
+            scrolled_px: window.scrollY
+        };
+    }
+    requestAnimationFrame(step);
+})();
+"""
+
+PAGE_STATS = """
+JSON.stringify({
+    dom_nodes: document.getElementsByTagName("*").length,
+    js_heap_mb: performance.memory ? performance.memory.usedJSHeapSize / 1048576 : null
+})
+"""
+
+
+def statusKb(pid, field):
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def rendererRssMb():
+    #*Chromium renders in QtWebEngineProcess children, their memory is where the DOM lives
+    total = 0
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/cmdline", "rb") as file:
+                command = file.read()
+        except OSError:
+            continue
+        if b"QtWebEngineProcess" in command and b"--type=renderer" in command:
+            total += statusKb(name, "VmRSS")
+    return total / 1024
+
+
+def evaluate(app, view, script, QEventLoop):
+    results = []
+    view.webView.page().runJavaScript(script, 0, results.append)
+    deadline = time.perf_counter() + TIMEOUT_S
+    while not results and time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 5)
+    return results[0] if results else None
+
+
+def waitFor(app, view, script, QEventLoop):
+    deadline = time.perf_counter() + TIMEOUT_S
+    while time.perf_counter() < deadline:
+        result = evaluate(app, view, script, QEventLoop)
+        if result:
+            return result
+        app.processEvents(QEventLoop.AllEvents, 50)
+    raise RuntimeError(f"timed out waiting for {script.strip()}")
+
+
+def measureChild(mode):
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from PySide6.QtCore import QCoreApplication, QEventLoop, Qt
+    from PySide6.QtWidgets import QApplication
+    import components.RichTextEditor as RichTextEditor
+    from utils.DocumentBlocks import DocumentBlocks
+
+    if mode == "full":
+        RichTextEditor.VIRTUAL_MIN_BLOCKS = PARAGRAPHS + 1
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+    document = DocumentBlocks(PARAGRAPH.format(i) for i in range(PARAGRAPHS))
+    view = RichTextEditor.ComponentRichTextEditor(document)
+    view.resize(1000, 800)
+    view.show()
+
+    start = time.perf_counter()
+    waitFor(app, view, "document.body && document.body.childElementCount > 0", QEventLoop)
+    results = {"mode": mode, "virtual": view.virtual, "first_render_ms": (time.perf_counter() - start) * 1000}
+    #*Reading offsetHeight forces the layout of everything that was inserted, the stats are taken after it
+    evaluate(app, view, "document.body.offsetHeight", QEventLoop)
+    results["first_layout_ms"] = (time.perf_counter() - start) * 1000
+    results.update(json.loads(evaluate(app, view, PAGE_STATS, QEventLoop)))
+    results["renderer_rss_mb"] = rendererRssMb()
+
+    evaluate(app, view, SCROLL_SCRIPT % {"step": SCROLL_PX_PER_FRAME, "seconds": SCROLL_SECONDS}, QEventLoop)
+    results.update(waitFor(app, view, "window.scrollResult", QEventLoop))
+    results["dom_nodes_after_scroll"] = json.loads(evaluate(app, view, PAGE_STATS, QEventLoop))["dom_nodes"]
+    results["renderer_rss_after_scroll_mb"] = rendererRssMb()
+
+    #*An edit in whatever is on screen now has to land in the right block of the Python model
+    evaluate(app, view, """
+        (function() {
+            var node = document.elementFromPoint(200, 200);
+            while (node && node.parentNode !== document.body) { node = node.parentNode; }
+            var range = document.createRange();
+            range.selectNodeContents(node);
+            range.collapse(true);
+            window.getSelection().removeAllRanges();
+            window.getSelection().addRange(range);
+            document.execCommand("insertText", false, "EDITED ");
+        })();
+    """, QEventLoop)
+    flushed = []
+    view.flushEdits(lambda: flushed.append(True))
+    deadline = time.perf_counter() + TIMEOUT_S
+    while not flushed and time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 5)
+    edited = [i for i, block in enumerate(document.blocks) if "EDITED " in block]
+    results["round_trip_ok"] = len(document) == PARAGRAPHS and len(edited) == 1 and f"notes {edited[0]}:" in document.blocks[edited[0]]
+    results["peak_rss_mb"] = statusKb(os.getpid(), "VmHWM") / 1024
+    print(json.dumps(results))
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Scroll FPS and memory of the web editor with and without virtualization")
+    parser.add_argument("--child", choices=["full", "virtual"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        measureChild(args.child)
+        return
+
+    for mode in ("full", "virtual"):
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode],
+            cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+        )
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            print(f"{mode}: " + (completed.stderr.strip().splitlines() or ["no output"])[-1], file=sys.stderr)
+            continue
+        results = json.loads(lines[-1])
+        print(f"{PARAGRAPHS} paragraphs, {mode}")
+        for metric, value in results.items():
+            if metric != "mode":
+                print(f"    {metric:<30} {value:>10.1f}" if isinstance(value, float) else f"    {metric:<30} {value!s:>10}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLLING_HZ = 1000
+DRAG_SECONDS = 2.0
+
+
+class EventCounter:
+    def __init__(self, QObject):
+        counter = self
+
+        class Filter(QObject):
+            def eventFilter(self, watched, event):
+                key = (watched.objectName(), event.type())
+                counter.counts[key] = counter.counts.get(key, 0) + 1
+                return False
+
+        self.counts = {}
+        self.filter = Filter()
+
+    def watch(self, widget, name):
+        widget.setObjectName(name)
+        widget.installEventFilter(self.filter)
+
+    def count(self, name, eventType):
+        return self.counts.get((name, eventType), 0)
+
+
+def drag(app, titleBar, startLocal, step, QMouseEvent, QEvent, QPointF, Qt):
+    #*Synthetic mouse events at the polling rate of a gaming mouse, the event loop runs between them like it would for real input
+    globalStart = titleBar.mapToGlobal(startLocal.toPoint())
+    app.sendEvent(titleBar, QMouseEvent(QEvent.MouseButtonPress, startLocal, QPointF(globalStart), Qt.LeftButton, Qt.LeftButton, Qt.NoModifier))
+    sent = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DRAG_SECONDS:
+        sent += 1
+        offset = QPointF(step[0] * sent, step[1] * sent)
+        app.sendEvent(titleBar, QMouseEvent(QEvent.MouseMove, startLocal + offset, QPointF(globalStart) + offset, Qt.NoButton, Qt.LeftButton, Qt.NoModifier))
+        app.processEvents()
+        nextEvent = start + sent / POLLING_HZ
+        while time.perf_counter() < nextEvent:
+            app.processEvents()
+    app.sendEvent(titleBar, QMouseEvent(QEvent.MouseButtonRelease, startLocal, QPointF(globalStart), Qt.LeftButton, Qt.NoButton, Qt.NoModifier))
+    app.processEvents()
+    return sent, time.perf_counter() - start
+
+
+def measureChild():
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    import main
+    from PySide6.QtCore import Qt, QCoreApplication, QEvent, QEventLoop, QObject, QPointF
+    from PySide6.QtGui import QMouseEvent
+    from PySide6.QtWidgets import QApplication
+
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv)
+    window = main.MainWindow()
+    window.resize(1300, 800)
+    window.show()
+    deadline = time.perf_counter() + 30
+    while "ready" not in window.startupTimes and time.perf_counter() < deadline:
+        app.processEvents(QEventLoop.AllEvents, 5)
+
+    counter = EventCounter(QObject)
+    counter.watch(window, "window")
+    counter.watch(window.centralWidget(), "central")
+    counter.watch(window.bodyWidget, "body")
+    counter.watch(window.navWidget, "nav")
+    titleBar = window.titleBar
+    results = {}
+
+    #*A move from the middle of the title bar, then a resize from its right edge across the 1200 and 1500 breakpoints
+    for name, startLocal, step in (
+        ("move", QPointF(titleBar.width() / 2, titleBar.height() / 2), (1, 0)),
+        ("resize", QPointF(titleBar.width() - 2, titleBar.height() / 2), (0.25, 0)),
+    ):
+        counter.counts.clear()
+        updates = titleBar.geometryUpdates
+        sent, seconds = drag(app, titleBar, startLocal, step, QMouseEvent, QEvent, QPointF, Qt)
+        results[name] = {
+            "mouse_events_per_s": sent / seconds,
+            "geometry_updates_per_s": (titleBar.geometryUpdates - updates) / seconds,
+            "window_moves_per_s": counter.count("window", QEvent.Move) / seconds,
+            "window_resizes_per_s": counter.count("window", QEvent.Resize) / seconds,
+            "body_resizes_per_s": counter.count("body", QEvent.Resize) / seconds,
+            "relayouts_per_s": counter.count("central", QEvent.LayoutRequest) / seconds,
+            "nav_width_changes": counter.count("nav", QEvent.Resize),
+        }
+    print(json.dumps(results))
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Count geometry updates and relayouts per second while dragging the window")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        measureChild()
+        return
+
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        print((completed.stderr.strip().splitlines() or ["no output"])[-1], file=sys.stderr)
+        sys.exit(1)
+    for name, metrics in json.loads(lines[-1]).items():
+        print(name)
+        for metric, value in metrics.items():
+            print(f"    {metric:<24} {value:>8.1f}")
+
+
+if __name__ == "__main__":
+    run()
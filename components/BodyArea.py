@@ -1,169 +1,593 @@
-import json
 import os
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QMessageBox, QFileDialog, QProgressBar
-from PySide6.QtWebEngineWidgets import QWebEngineView
-from PySide6.QtCore import QObject, Signal, Slot, QThread
-from PySide6.QtWebChannel import QWebChannel
+from collections import OrderedDict, deque
+from PySide6.QtWidgets import QApplication, QWidget, QStackedLayout, QMessageBox, QFileDialog, QProgressBar
+from PySide6.QtCore import Signal, Slot, QTimer
 
-CONFIG_FILE = "configs/files.json"
+from components.PlainTextEditor import ComponentPlainTextEditor
+from utils.Autosave import AutosaveWriter, AUTOSAVE_INTERVAL_MS
+from utils.BlobStore import blobDirectory, registerDirectory
+from utils.FileWatcher import FileWatcher
+from utils.HtmlBlocks import splitBlocks, textToBlocks
+from utils.HtmlNormalizer import normalizeBlock
+from utils.MemoryMonitor import MemoryMonitor
+from utils.NtpFormat import encodeNtp
+from utils.OpenDocument import OpenDocument
+from utils.PreloadCache import PreloadCache, PRELOAD_FILES
+from utils.Preloader import Preloader
+from utils.RecentFiles import RecentFiles
+from utils.SaveEngine import SaveEngine
+from utils.SearchIndexer import SearchIndexer
+from utils.Tracing import traced
 
-class Worker(QObject):
-    htmlChanged = Signal(str)
+SIZE_SAMPLES = 120
+MAX_LIVE_VIEWS = 4
+REFIND_DELAY_MS = 300
 
-    def execute(self, html):
-        self.htmlChanged.emit(html)
+def isRichPath(filePath):
+    return filePath is not None and filePath.endswith(".ntp")
 
 class ComponentBodyArea(QWidget):
-    contentChanged = Signal(str)
     fileSizeUpdated = Signal(float)
+    documentOpened = Signal(int, str)
+    documentClosed = Signal(int)
+    documentActivated = Signal(int)
+    documentRenamed = Signal(int, str)
+    findResultsChanged = Signal(int, int)
+    findFailed = Signal(str)
+    replacedAll = Signal(int)
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.totalFileSizes = deque(maxlen=SIZE_SAMPLES)
+        self.documents = []
+        self.current = None
+        self.views = OrderedDict()
+        self.pendingSaves = {}
+        self.finder = None
+        self.findQuery = None
+        self.findToken = None
+        self.findIndex = None
+        self.findMatches = []
+        self.findCurrent = -1
+        self.replaceRequest = None
         self.initUi()
-        self.currentFilePath = None
-        self.currentContent = "<p>Click here and start typing...</p>"
-        self.totalFileSizes = []
 
     def initUi(self):
-        self.layout = QVBoxLayout(self)
+        self.layout = QStackedLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
 
-        self.webView = QWebEngineView()
-        self.webView.setHtml("""
-            <html>
-            <head>
-                <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
-                <script>
-                    document.addEventListener("DOMContentLoaded", function() {
-                        new QWebChannel(qt.webChannelTransport, function(channel) {
-                            window.qtbridge = channel.objects.qtbridge;
-                            document.body.addEventListener('input', function() {
-                                window.qtbridge.contentChanged(document.body.innerHTML);
-                            });
-                        });
-                    });
-                </script>
-            </head>
-            <body contenteditable="true">
-                <p>Start - Click here and start typing...</p>
-            </body>
-            </html>
-        """)
-
-        self.layout.addWidget(self.webView)
-
-        self.worker = Worker()
-        self.workerThread = QThread()
-        self.worker.moveToThread(self.workerThread)
-        self.workerThread.start()
-
-        self.worker.htmlChanged.connect(self.updateHtml)
-
-        self.webChannel = QWebChannel()
-        self.webChannel.registerObject("qtbridge", self)
-        self.webView.page().setWebChannel(self.webChannel)
+        self.autosaveWriter = AutosaveWriter()
+        self.autosaveTimer = QTimer(self)
+        self.autosaveTimer.setInterval(AUTOSAVE_INTERVAL_MS)
+        self.autosaveTimer.timeout.connect(self.tickAutosave)
+        self.autosaveTimer.start()
+        QApplication.instance().aboutToQuit.connect(self.shutdownAutosave)
+
+        self.saveEngine = SaveEngine()
+        self.saveEngine.saved.connect(self.onFileSaved)
+        self.saveEngine.failed.connect(self.onSaveFailed)
+        self.saveEngine.blobsExtracted.connect(self.onBlobsExtracted)
+        QApplication.instance().aboutToQuit.connect(self.saveEngine.shutdown)
+
+        self.fileWatcher = FileWatcher(self)
+        self.fileWatcher.changed.connect(self.onFileChangedOnDisk)
+        self.fileWatcher.removed.connect(self.onFileRemovedOnDisk)
+        self.fileWatcher.reloaded.connect(self.onFileReloaded)
+        QApplication.instance().aboutToQuit.connect(self.fileWatcher.shutdown)
+        self.configPaths = set()
+
+        #*Plain text is the default engine, the web engine is only built for the first .ntp document
+        self.openDocument([""], None, rich=False)
 
         self.loadFilePaths()
 
+        self.preloadCache = PreloadCache()
+        self.preloader = Preloader(self.preloadCache)
+        QApplication.instance().aboutToQuit.connect(self.preloader.shutdown)
+        QTimer.singleShot(0, self.preloadRecentFiles)
+
+        self.searchIndexer = SearchIndexer()
+        QApplication.instance().aboutToQuit.connect(self.searchIndexer.shutdown)
+        #*Files saved or changed since the last run are picked up once the window is up
+        QTimer.singleShot(0, self.rebuildSearchIndex)
+
+        self.memoryMonitor = MemoryMonitor()
+        self.memoryMonitor.memoryPressure.connect(self.trimMemory)
+        QApplication.instance().aboutToQuit.connect(self.memoryMonitor.shutdown)
+
+        self.refindTimer = QTimer(self)
+        self.refindTimer.setSingleShot(True)
+        self.refindTimer.setInterval(REFIND_DELAY_MS)
+        self.refindTimer.timeout.connect(self.refind)
+
+    @property
+    def document(self):
+        return self.current.document
+
+    @property
+    def editor(self):
+        return self.views.get(self.current)
+
+    @property
+    def currentFilePath(self):
+        return self.current.filePath
+
+    @currentFilePath.setter
+    def currentFilePath(self, filePath):
+        self.current.filePath = filePath
+        self.documentRenamed.emit(self.documents.index(self.current), self.current.title)
+
+    @property
+    def currentContent(self):
+        if self.current.rawContent is not None:
+            return self.current.rawContent
+        return self.document.serialize()
+
+    @currentContent.setter
+    def currentContent(self, content):
+        self.current.rawContent = content
+
+    def findDocument(self, filePath):
+        for index, openDocument in enumerate(self.documents):
+            if openDocument.filePath == filePath:
+                return index
+        return -1
+
+    @traced()
+    def openDocument(self, blocks, filePath=None, rich=None, loading=False):
+        if rich is None:
+            rich = isRichPath(filePath)
+        if not rich and not blocks:
+            blocks = [""]
+
+        openDocument = OpenDocument(blocks, filePath, rich, self.autosaveWriter)
+        openDocument.loading = loading
+        if filePath is not None:
+            self.fileWatcher.watch(filePath)
+            registerDirectory(blobDirectory(filePath))
+        if self.current is not None and self.current.isPristine and not self.current.loading:
+            #*An untouched untitled tab is replaced instead of piling up next to the new one
+            index = self.documents.index(self.current)
+            self.dropView(self.current)
+            self.current.close()
+            self.documents[index] = openDocument
+            self.documentRenamed.emit(index, openDocument.title)
+        else:
+            self.documents.append(openDocument)
+            self.documentOpened.emit(len(self.documents) - 1, openDocument.title)
+
+        self.activateDocument(self.documents.index(openDocument))
+        return openDocument
+
+    def activateDocument(self, index):
+        if index < 0 or index >= len(self.documents):
+            return
+        openDocument = self.documents[index]
+        if openDocument is self.current and openDocument in self.views:
+            return
+
+        self.current = openDocument
+        view = self.viewFor(openDocument)
+        self.layout.setCurrentWidget(view)
+        self.calculateTotalSize()
+        self.documentActivated.emit(index)
+        if self.findQuery is not None:
+            self.refind()
+
+    def viewFor(self, openDocument):
+        if openDocument in self.views:
+            self.views.move_to_end(openDocument)
+            return self.views[openDocument]
+
+        document = openDocument.restore()
+        if openDocument.rich:
+            from components.RichTextEditor import ComponentRichTextEditor
+            view = ComponentRichTextEditor(document)
+        else:
+            view = ComponentPlainTextEditor(document)
+        view.edited.connect(lambda openDocument=openDocument: self.onEdited(openDocument))
+        view.setBlocks(document.blocks)
+        view.setLoading(openDocument.loading)
+        self.layout.addWidget(view)
+        self.views[openDocument] = view
+
+        #*Only the most recently used documents keep a live editor, the rest are parked
+        for candidate in list(self.views):
+            if len(self.views) <= MAX_LIVE_VIEWS:
+                break
+            if candidate is not self.current and not candidate.loading:
+                self.dropView(candidate)
+                candidate.park()
+        return view
+
+    @traced()
+    def trimMemory(self, sample):
+        #*Each live web view holds a renderer, parking the background tabs frees the most
+        for candidate in list(self.views):
+            if candidate is not self.current and not candidate.loading:
+                self.dropView(candidate)
+                candidate.park()
+        self.preloader.cancel()
+        self.preloadCache.trim(0)
+        normalizeBlock.cache_clear()
+
+    def dropView(self, openDocument):
+        view = self.views.pop(openDocument, None)
+        if view is not None:
+            self.layout.removeWidget(view)
+            view.deleteLater()
+
+    def closeDocument(self, index):
+        if index < 0 or index >= len(self.documents):
+            return
+        openDocument = self.documents[index]
+        if openDocument.journal.dirty:
+            answer = QMessageBox.question(self, "Close file", f"Discard unsaved changes in {openDocument.title}?")
+            if answer != QMessageBox.Yes:
+                return
+
+        self.dropView(openDocument)
+        openDocument.close()
+        self.documents.pop(index)
+        self.documentClosed.emit(index)
+        if openDocument.filePath is not None and self.findDocument(openDocument.filePath) < 0:
+            self.fileWatcher.unwatch(openDocument.filePath)
+
+        if openDocument is self.current:
+            self.current = None
+            if self.documents:
+                self.activateDocument(min(index, len(self.documents) - 1))
+            else:
+                self.openDocument([""], None, rich=False)
+
     @Slot(str)
+    @traced()
     def updateHtml(self, content):
-        self.currentContent = content
-        if '<body contenteditable="true">' not in content:
-            content = content.replace("<body", '<body contenteditable="true"')
-        self.webView.setHtml(content)
+        self.setDocument(splitBlocks(content), rich=True)
+
+    def setDocument(self, blocks, rich=True):
+        if rich != self.current.rich:
+            self.dropView(self.current)
+            self.current.rich = rich
+        self.document.reset(blocks)
+        self.current.rawContent = None
+        self.calculateTotalSize()
+        view = self.viewFor(self.current)
+        view.setBlocks(blocks)
+        self.layout.setCurrentWidget(view)
+
+    def beginDocument(self, blocks, filePath=None, loading=False):
+        return self.openDocument(blocks, filePath, loading=loading)
+
+    @traced()
+    def appendBlocks(self, blocks, openDocument=None):
+        openDocument = openDocument or self.current
+        if openDocument not in self.documents:
+            return
+        openDocument.restore().splice(len(openDocument.document), 0, blocks)
+        if openDocument in self.views:
+            self.views[openDocument].appendBlocks(blocks)
+        if openDocument is self.current:
+            self.calculateTotalSize()
+
+    def finishDocument(self, openDocument=None):
+        openDocument = openDocument or self.current
+        openDocument.loading = False
+        if openDocument in self.views:
+            self.views[openDocument].setLoading(False)
+
+    def restoreJournal(self, journal):
+        openDocument = self.openDocument(journal["blocks"], journal["path"])
+        openDocument.journal.markDirty()
+        os.remove(journal["journal"])
+
+    def tickAutosave(self):
+        for openDocument in self.documents:
+            openDocument.tick()
+
+    def shutdownAutosave(self):
+        self.autosaveTimer.stop()
+        self.tickAutosave()
+        self.autosaveWriter.shutdown()
+
+    def onEdited(self, openDocument):
+        openDocument.rawContent = None
+        openDocument.journal.markDirty()
+        if openDocument is self.current:
+            self.calculateTotalSize()
+            if self.findQuery is not None:
+                self.refindTimer.start()
+
+    def ensureFinder(self):
+        if self.finder is None:
+            from utils.FindWorker import FindWorker
+            self.finder = FindWorker()
+            self.finder.found.connect(self.onFound)
+            self.finder.replaced.connect(self.onReplaced)
+            self.finder.failed.connect(self.onFindFailed)
+            QApplication.instance().aboutToQuit.connect(self.finder.shutdown)
+        return self.finder
+
+    def findText(self, pattern, regex=False, caseSensitive=False):
+        if not pattern:
+            self.findQuery = None
+            self.findToken = None
+            self.findMatches = []
+            self.findCurrent = -1
+            if self.finder is not None:
+                self.finder.cancel()
+            self.findResultsChanged.emit(-1, 0)
+            return
+        self.findQuery = (pattern, regex, caseSensitive)
+        self.refind()
+
+    def refind(self):
+        #*The worker searches a snapshot of the block list, the text index is rebuilt only for changed blocks
+        self.refindTimer.stop()
+        document = self.current.restore()
+        self.findToken = self.ensureFinder().find(document.blocks, document.version, self.current.rich, *self.findQuery)
+
+    def onFound(self, token, index, matches):
+        if token != self.findToken:
+            return
+        self.findIndex = index
+        self.findMatches = matches
+        self.findCurrent = 0 if matches else -1
+        self.findResultsChanged.emit(self.findCurrent, len(matches))
+        self.selectMatch()
+
+    def onFindFailed(self, token, error):
+        if token == self.findToken:
+            self.findFailed.emit(error)
+
+    def findNext(self, step=1):
+        if not self.findMatches:
+            return
+        self.findCurrent = (self.findCurrent + step) % len(self.findMatches)
+        self.findResultsChanged.emit(self.findCurrent, len(self.findMatches))
+        self.selectMatch()
+
+    def selectMatch(self):
+        if self.findCurrent < 0 or self.editor is None:
+            return
+        start, end = self.findMatches[self.findCurrent]
+        self.editor.selectRange(self.findIndex.locate(start), self.findIndex.locate(end, end=True))
+
+    def replaceAll(self, replacement):
+        if self.findQuery is None:
+            return
+        openDocument = self.current
+        #*Edits still sitting in the page are pulled into the model first so the replace sees them
+        self.editor.flushEdits(lambda: self.requestReplace(openDocument, replacement))
+
+    def requestReplace(self, openDocument, replacement):
+        if openDocument is not self.current or self.findQuery is None:
+            return
+        document = openDocument.document
+        self.replaceRequest = (openDocument, document, replacement)
+        self.findToken = self.ensureFinder().replaceAll(document.blocks, document.version, openDocument.rich, *self.findQuery, replacement)
+
+    def onReplaced(self, token, version, ops, count):
+        if token != self.findToken:
+            return
+        openDocument, document, replacement = self.replaceRequest
+        if openDocument is not self.current:
+            return
+        if document is not openDocument.document or version != document.version:
+            #*The document changed or was parked while the worker was busy, replace again on the newer blocks
+            self.requestReplace(openDocument, replacement)
+            return
+
+        for op in reversed(ops):
+            document.splice(op["start"], op["deleteCount"], op["blocks"])
+        if ops:
+            self.editor.spliceBlocks(ops)
+            self.onEdited(openDocument)
+        self.replacedAll.emit(count)
+        self.refind()
 
     def saveFile(self):
-        self.toHtml(save=True)
+        openDocument = self.current
+        view = self.views.get(openDocument)
+        if openDocument.rich and view is not None:
+            #*Patches keep the block model current, only the edits still in the debounce are flushed before saving it
+            view.flushEdits(lambda: self.saveFileContent(openDocument))
+        else:
+            self.saveFileContent()
+
+    def contentFor(self, openDocument, filePath):
+        if openDocument.rawContent is not None:
+            return openDocument.rawContent
+        if not openDocument.rich and isRichPath(filePath):
+            return textToBlocks(openDocument.document.serialize())
+        #*The rope is a snapshot, the save thread streams it to disk while editing goes on
+        return openDocument.document.blocks
 
-    def saveFileContent(self):
-        if self.currentFilePath is not None:
-            with open(self.currentFilePath, "w") as file:
-                file.write(self.currentContent)
-            self.saveFilePath(self.currentFilePath)
+    @traced()
+    def saveFileContent(self, openDocument=None):
+        openDocument = openDocument or self.current
+        if openDocument.filePath is not None:
+            self.enqueueSave(openDocument, openDocument.filePath)
         else:
             options = QFileDialog.Options()
             documents_dir = os.path.join(os.path.expanduser("~"), "Documents")
             fileName, _ = QFileDialog.getSaveFileName(self, "Save file", documents_dir, "Notepad Plus Files (*.ntp);;Notepad default Files (*.txt);;All Files (*)", options=options)
             if fileName:
-                if not fileName.endswith(".ntp"):
+                if not fileName.endswith((".ntp", ".txt")):
                     fileName += ".ntp"
-                try:
-                    with open(fileName, "w") as file:
-                        file.write(self.currentContent)
-                    self.currentFilePath = fileName
-                    self.saveFilePath(self.currentFilePath)
-                except Exception as e:
-                    QMessageBox.warning(self, "Error", f"An error occurred while trying to create the file {fileName}")
+                openDocument.filePath = fileName
+                if openDocument in self.documents:
+                    self.documentRenamed.emit(self.documents.index(openDocument), openDocument.title)
+                self.fileWatcher.watch(fileName)
+                self.enqueueSave(openDocument, fileName)
 
-    @Slot(str)
-    def contentChanged(self, content):
-        self.currentContent = content
-        self.calculateTotalSize(content)
+    def enqueueSave(self, openDocument, filePath):
+        #*The journal stays until the write is done, a failed or interrupted save can still be recovered
+        openDocument.journal.tick(filePath)
+        self.fileWatcher.expectWrite(filePath)
+        sequence = self.saveEngine.enqueue(filePath, self.contentFor(openDocument, filePath), normalize=openDocument.rich)
+        self.pendingSaves[filePath] = (openDocument, openDocument.version, sequence)
+
+    def onFileSaved(self, filePath, sequence):
+        pending = self.pendingSaves.get(filePath)
+        if pending is None or pending[2] != sequence:
+            #*A newer save of the path is still queued or writing, its own signal settles the document and the watch
+            return
+        openDocument, version, _ = self.pendingSaves.pop(filePath)
+        self.fileWatcher.acknowledge(filePath)
+        #*Edits made while the write was running are not on disk, those keep the document dirty
+        if openDocument in self.documents and openDocument.version == version and openDocument.filePath == filePath:
+            openDocument.journal.markSaved(filePath)
+        self.preloadCache.discard(filePath)
+        self.saveFilePath(filePath)
+
+    def onBlobsExtracted(self, filePath, sequence, changes):
+        registerDirectory(blobDirectory(filePath))
+        for openDocument in self.documentsAt(os.path.abspath(filePath)):
+            if openDocument.isParked:
+                continue
+            #*Indices are from the saved snapshot, a block edited or moved since keeps its inline image until the next save
+            document = openDocument.document
+            ops = [
+                {"start": index, "deleteCount": 1, "blocks": [new]}
+                for index, old, new in changes
+                if index < len(document) and document.blocks[index] == old
+            ]
+            if not ops:
+                continue
+            pending = self.pendingSaves.get(filePath)
+            for op in reversed(ops):
+                document.splice(op["start"], op["deleteCount"], op["blocks"])
+            if pending is not None and pending[0] is openDocument and pending[1] == document.version - len(ops) and pending[2] == sequence:
+                #*The swapped references are what was written, they do not count as edits after the save
+                self.pendingSaves[filePath] = (openDocument, document.version, sequence)
+            if openDocument.rich and openDocument in self.views:
+                self.views[openDocument].swapBlobSources(ops)
+            if openDocument is self.current:
+                self.calculateTotalSize()
+
+    def onSaveFailed(self, filePath, sequence, error):
+        openDocument = None
+        pending = self.pendingSaves.get(filePath)
+        if pending is not None:
+            openDocument = pending[0]
+            if pending[2] == sequence:
+                del self.pendingSaves[filePath]
+                self.fileWatcher.acknowledge(filePath)
+        if openDocument in self.documents:
+            openDocument.journal.markDirty()
+        print(f"Error saving file {filePath}: {error}")
+        QMessageBox.warning(self, "Error", f"An error occurred while trying to save the file {filePath}")
 
-    def calculateTotalSize(self, content):
-        file_size_kb = len(content.encode('utf-8')) / 1024
+    def calculateTotalSize(self):
+        file_size_kb = self.document.byteSize / 1024
         self.totalFileSizes.append(file_size_kb)
-        # total_size_kb = sum(self.totalFileSizes)
         self.fileSizeUpdated.emit(file_size_kb)
 
-    def callbackFunc(self, html):
-        self.currentContent = html
-        self.saveFileContent()
-
+    @traced()
     def toHtml(self, save=False):
         if save:
-            self.webView.page().runJavaScript(
-                "document.getElementsByTagName('html')[0].innerHTML", 0, self.callbackFunc
-            )
-        else:
-            self.webView.page().runJavaScript(
-                "document.getElementsByTagName('html')[0].innerHTML", 0, self.updateHtml
-            )
+            self.saveFile()
+        elif self.current.rich:
+            self.editor.flushEdits(self.calculateTotalSize)
 
+    @traced()
     def loadNtpContent(self, content, filePath=None):
         try:
-            self.worker.execute(content)
-            self.currentFilePath = filePath
+            self.openDocument(splitBlocks(content), filePath, rich=True)
         except Exception as e:
             print(e)
 
+    @traced()
     def saveFilePath(self, filePath):
+        #*Our own write to files.db and its WAL is not an outside change, it would only refresh and preload again
+        for path in self.configPaths:
+            self.fileWatcher.expectWrite(path)
         try:
-            os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, "r") as file:
-                    try:
-                        data = json.load(file)
-                    except json.JSONDecodeError:
-                        data = []
-            else:
-                data = []
-
-            file_size_kb = os.path.getsize(filePath) / 1024
-            file_info = {"path": filePath, "size_kb": file_size_kb}
+            self.recentFiles.upsert(filePath, os.path.getsize(filePath) / 1024)
+            self.searchIndexer.updateRequested.emit(filePath)
+        except Exception as e:
+            print(f"Error saving file path: {e}")
+        finally:
+            for path in self.configPaths:
+                self.fileWatcher.acknowledge(path)
 
-            for item in data:
-                if item["path"] == filePath:
-                    item["size_kb"] = file_size_kb
-                    break
-            else:
-                data.append(file_info)
+    def rebuildSearchIndex(self):
+        try:
+            self.searchIndexer.rebuildRequested.emit([item["path"] for item in self.recentFiles.entries()])
+        except Exception as e:
+            print(f"Error rebuilding search index: {e}")
 
-            with open(CONFIG_FILE, "w") as file:
-                json.dump(data, file, indent=4)
+    def preloadRecentFiles(self):
+        try:
+            #*Files that already have a tab are in memory anyway
+            paths = [item["path"] for item in self.recentFiles.entries(PRELOAD_FILES) if self.findDocument(item["path"]) < 0]
+            self.preloader.request(paths)
         except Exception as e:
-            print(f"Error saving file path: {e}")
+            print(f"Error preloading recent files: {e}")
+
+    def documentsAt(self, path):
+        return [openDocument for openDocument in self.documents if openDocument.filePath is not None and os.path.abspath(openDocument.filePath) == path]
+
+    def onFileChangedOnDisk(self, path):
+        if path in self.configPaths:
+            #*Another instance changed the recent files, the counters and the preloaded files follow it
+            self.recentFiles.refresh()
+            self.preloadRecentFiles()
+            return
+        for openDocument in self.documentsAt(path):
+            if openDocument.loading:
+                continue
+            if openDocument.journal.dirty:
+                answer = QMessageBox.question(self, "File changed", f"{openDocument.title} was changed by another program. Reload it and discard your unsaved changes?")
+                if answer != QMessageBox.Yes:
+                    continue
+            self.requestReload(openDocument)
+
+    def onFileRemovedOnDisk(self, path):
+        for openDocument in self.documentsAt(path):
+            #*The open tab is now the only copy, closing it has to ask first
+            print(f"File removed by another program: {path}")
+            openDocument.journal.markDirty()
+
+    def requestReload(self, openDocument):
+        #*The rope is a snapshot, the worker diffs it against the file while editing goes on
+        if openDocument.isParked:
+            self.fileWatcher.reload(openDocument.filePath, None, 0, openDocument.rich)
+        else:
+            self.fileWatcher.reload(openDocument.filePath, openDocument.document.blocks, openDocument.document.version, openDocument.rich)
+
+    @traced()
+    def onFileReloaded(self, path, version, ops, blocks):
+        for openDocument in self.documentsAt(path):
+            if openDocument.isParked:
+                openDocument.parked = encodeNtp(blocks)
+                openDocument.journal.markSaved(openDocument.filePath)
+                continue
+            document = openDocument.document
+            if ops is None or document.version != version:
+                self.requestReload(openDocument)
+                continue
+
+            #*Only the regions that differ are spliced, the editor keeps its scroll position and undo history
+            for op in reversed(ops):
+                document.splice(op["start"], op["deleteCount"], op["blocks"])
+            if ops and openDocument in self.views:
+                self.views[openDocument].spliceBlocks(ops)
+            openDocument.rawContent = None
+            openDocument.journal.markSaved(openDocument.filePath)
+            if openDocument is self.current:
+                self.calculateTotalSize()
+                if self.findQuery is not None:
+                    self.refind()
 
     def loadFilePaths(self):
         try:
-            if os.path.exists(CONFIG_FILE):
-                with open(CONFIG_FILE, "r") as file:
-                    try:
-                        data = json.load(file)
-                        for item in data:
-                            print(f"Previously saved file: {item['path']} ({item['size_kb']} kB)")
-                            self.totalFileSizes.append(item['size_kb'])
-                    except json.JSONDecodeError:
-                        print("Error loading file paths: JSONDecodeError - the file is empty or corrupted.")
+            self.recentFiles = RecentFiles()
+            self.configPaths = {os.path.abspath(self.recentFiles.path), os.path.abspath(self.recentFiles.path + "-wal")}
+            for path in self.configPaths:
+                self.fileWatcher.watch(path)
+            for item in self.recentFiles.entries():
+                print(f"Previously saved file: {item['path']} ({item['size_kb']} kB)")
         except Exception as e:
             print(f"Error loading file paths: {e}")
@@ -1,7 +1,15 @@
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QGraphicsBlurEffect, QDialog, QGridLayout
+import math
+import time
+
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QDialog, QGridLayout
 from PySide6.QtGui import QIcon, QPalette, QColor, QPixmap, QCursor, QBrush, QLinearGradient
 from PySide6.QtCore import Qt, QSize, QRect, QTimer, QPoint
 
+from utils.Backgrounds import BackgroundPainter
+
+FALLBACK_FRAME_MS = 16
+TITLE_BAR_STOPS = ((0, (255, 200, 225, 100)), (1, (255, 200, 225, 100)))
+
 class ComponentCustomTitleBar(QWidget):
     def __init__(self, mainWindow):
         super().__init__(mainWindow)
@@ -78,6 +86,43 @@ class ComponentCustomTitleBar(QWidget):
         self.timer.setInterval(500) 
         self.timer.timeout.connect(self.resetClickCount)
 
+        self.pendingGeometry = None
+        self.lastGeometryTime = 0
+        self.geometryUpdates = 0
+        self.frameTimer = QTimer(self)
+        self.frameTimer.setSingleShot(True)
+        self.frameTimer.setTimerType(Qt.PreciseTimer)
+        self.frameTimer.timeout.connect(self.applyPendingGeometry)
+
+    def frameInterval(self):
+        screen = self.screen()
+        refreshRate = screen.refreshRate() if screen is not None else 0
+        return 1000 / refreshRate if refreshRate > 0 else FALLBACK_FRAME_MS
+
+    def queueGeometry(self, geometry):
+        #*High polling rate mice send several moves per frame, only the latest position is applied once per frame
+        self.pendingGeometry = geometry
+        if self.frameTimer.isActive():
+            return
+        waitMs = self.lastGeometryTime + self.frameInterval() - time.perf_counter() * 1000
+        if waitMs <= 0:
+            self.applyPendingGeometry()
+        else:
+            self.frameTimer.start(math.ceil(waitMs))
+
+    def applyPendingGeometry(self):
+        self.frameTimer.stop()
+        geometry = self.pendingGeometry
+        if geometry is None:
+            return
+        self.pendingGeometry = None
+        self.lastGeometryTime = time.perf_counter() * 1000
+        self.geometryUpdates += 1
+        if isinstance(geometry, QPoint):
+            self.window().move(geometry)
+        else:
+            self.window().setGeometry(geometry)
+
     def resetClickCount(self):
         self.click_count = 0
         self.timer.stop()
@@ -95,17 +140,7 @@ class ComponentCustomTitleBar(QWidget):
             self.window().showMaximized()
 
     def setCustomTitleBarBackground(self):
-        gradient = QLinearGradient(0, 0, 0, self.height())
-        gradient.setColorAt(0, QColor(255, 200, 225, 100))
-        gradient.setColorAt(1, QColor(255, 200, 225, 100))
-
-        blurEffect = QGraphicsBlurEffect()
-        blurEffect.setBlurRadius(200)
-
-        palette = self.palette()
-        palette.setBrush(QPalette.Window, QBrush(gradient))
-        self.setPalette(palette)
-        self.setGraphicsEffect(blurEffect)
+        self.background = BackgroundPainter(self, "titleBar", TITLE_BAR_STOPS, blurRadius=200)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -172,7 +207,7 @@ class ComponentCustomTitleBar(QWidget):
         if self.moving:
             delta = event.globalPos() - self.startPos
             new_pos = self.startGeometry.topLeft() + delta
-            self.window().move(new_pos)
+            self.queueGeometry(new_pos)
 
         if self.resizing:
             delta = event.globalPos() - self.startPos
@@ -187,7 +222,7 @@ class ComponentCustomTitleBar(QWidget):
             elif self.resizeDir == "bottom":
                 rect.setBottom(rect.bottom() + delta.y())
 
-            self.window().setGeometry(rect)
+            self.queueGeometry(rect)
 
         else:
             margins = 5
@@ -206,6 +241,8 @@ class ComponentCustomTitleBar(QWidget):
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
+            #*The final position is applied right away instead of waiting for the next frame
+            self.applyPendingGeometry()
             self.moving = False
             self.resizing = False
             self.setCursor(Qt.ArrowCursor)
\ No newline at end of file
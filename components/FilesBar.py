@@ -1,12 +1,77 @@
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QGraphicsBlurEffect
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QGraphicsBlurEffect, QTabBar
 from PySide6.QtGui import QIcon, QPalette, QColor, QPixmap, QCursor, QBrush, QLinearGradient
 from PySide6.QtCore import Qt, QSize, QRect, QTimer
 
 class ComponentFilesBar(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.mainWindow = parent
         self.setFixedHeight(32)
         self.setAutoFillBackground(True)
         palette = self.palette()
         palette.setColor(QPalette.Window, QColor(244, 249, 254, 175))
-        self.setPalette(palette)
\ No newline at end of file
+        self.setPalette(palette)
+
+        self.bodyArea = None
+        self.syncing = False
+        self.initUi()
+
+    def initUi(self):
+        self.layout = QHBoxLayout(self)
+        self.layout.setContentsMargins(8, 0, 8, 0)
+
+        self.tabBar = QTabBar(self)
+        self.tabBar.setTabsClosable(True)
+        self.tabBar.setMovable(False)
+        self.tabBar.setExpanding(False)
+        self.tabBar.setUsesScrollButtons(True)
+        self.tabBar.setElideMode(Qt.ElideMiddle)
+        self.tabBar.setDocumentMode(True)
+        self.tabBar.currentChanged.connect(self.onTabChanged)
+        self.tabBar.tabCloseRequested.connect(self.onTabCloseRequested)
+        self.layout.addWidget(self.tabBar)
+        self.layout.addStretch()
+
+    def attachBodyArea(self, bodyArea):
+        self.bodyArea = bodyArea
+        self.bodyArea.documentOpened.connect(self.onDocumentOpened)
+        self.bodyArea.documentClosed.connect(self.onDocumentClosed)
+        self.bodyArea.documentActivated.connect(self.onDocumentActivated)
+        self.bodyArea.documentRenamed.connect(self.onDocumentRenamed)
+
+        #*Documents opened before the bar was attached still need their tabs
+        self.syncing = True
+        for openDocument in self.bodyArea.documents:
+            self.tabBar.addTab(openDocument.title)
+        self.tabBar.setCurrentIndex(self.bodyArea.documents.index(self.bodyArea.current))
+        self.syncing = False
+
+    def onDocumentOpened(self, index, title):
+        self.syncing = True
+        self.tabBar.insertTab(index, title)
+        self.syncing = False
+
+    def onDocumentClosed(self, index):
+        self.syncing = True
+        self.tabBar.removeTab(index)
+        self.syncing = False
+
+    def onDocumentActivated(self, index):
+        self.syncing = True
+        self.tabBar.setCurrentIndex(index)
+        self.syncing = False
+        self.mainWindow.titleBar.fileNameTitle.setText(self.tabBar.tabText(index))
+
+    def onDocumentRenamed(self, index, title):
+        self.tabBar.setTabText(index, title)
+        self.tabBar.setTabToolTip(index, self.bodyArea.documents[index].filePath or title)
+        if index == self.tabBar.currentIndex():
+            self.mainWindow.titleBar.fileNameTitle.setText(title)
+
+    def onTabChanged(self, index):
+        if not self.syncing and self.bodyArea is not None:
+            self.bodyArea.activateDocument(index)
+
+    def onTabCloseRequested(self, index):
+        if self.bodyArea is not None:
+            self.bodyArea.closeDocument(index)
@@ -0,0 +1,42 @@
+from collections import deque
+
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PySide6.QtCore import Qt, QPointF
+
+SPARKLINE_SAMPLES = 120
+LINE_COLOR = QColor("#05B8CC")
+BUDGET_COLOR = QColor("#FF4500")
+
+class ComponentMemorySparkline(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(24)
+        self.history = deque(maxlen=SPARKLINE_SAMPLES)
+        self.budgetKb = 0
+
+    def addSample(self, totalKb, budgetKb):
+        self.history.append(totalKb)
+        self.budgetKb = budgetKb
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.history:
+            return
+        width = self.width() - 1
+        height = self.height() - 2
+        #*Scaled to the budget, or to the peak when it is over, so the budget line stays on screen
+        top = max(self.budgetKb, max(self.history)) or 1
+        step = width / (SPARKLINE_SAMPLES - 1)
+        offset = width - step * (len(self.history) - 1)
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        if self.budgetKb:
+            budgetY = 1 + height * (1 - self.budgetKb / top)
+            painter.setPen(QPen(BUDGET_COLOR, 1, Qt.DashLine))
+            painter.drawLine(QPointF(0, budgetY), QPointF(width, budgetY))
+        points = QPolygonF([QPointF(offset + i * step, 1 + height * (1 - value / top)) for i, value in enumerate(self.history)])
+        painter.setPen(QPen(LINE_COLOR, 1.5))
+        painter.drawPolyline(points)
+        painter.end()
@@ -1,7 +1,22 @@
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QGraphicsBlurEffect
-from PySide6.QtGui import QIcon, QPalette, QColor, QPixmap, QCursor, QBrush, QLinearGradient
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QGraphicsBlurEffect, QLineEdit, QCheckBox
+from PySide6.QtGui import QIcon, QPalette, QColor, QPixmap, QCursor, QBrush, QLinearGradient, QKeySequence, QShortcut
 from PySide6.QtCore import Qt, QSize, QRect, QTimer
 
+from utils import Tracing
+
+FIND_DEBOUNCE_MS = 100
+BUTTON_STYLE = """
+    QPushButton {
+        background-color: transparent;
+        border: none;
+        font-size: 10pt;
+        padding: 0 6px;
+    }
+    QPushButton:hover {
+        background-color: #e0e0e0;
+    }
+"""
+
 class ComponentMenuBar(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -9,4 +24,109 @@ class ComponentMenuBar(QWidget):
         self.setAutoFillBackground(True)
         palette = self.palette()
         palette.setColor(QPalette.Window, QColor(255, 255, 255))
-        self.setPalette(palette)
\ No newline at end of file
+        self.setPalette(palette)
+
+        self.bodyArea = None
+        self.initUi()
+
+    def initUi(self):
+        self.layout = QHBoxLayout(self)
+        self.layout.setContentsMargins(8, 2, 8, 2)
+        self.layout.setSpacing(6)
+
+        self.traceButton = QPushButton("Start trace", self)
+        self.traceButton.setStyleSheet(BUTTON_STYLE)
+        self.traceButton.setToolTip("Record spans and event loop stalls, click again to export a Chrome trace")
+        self.traceButton.clicked.connect(self.toggleTracing)
+        self.layout.addWidget(self.traceButton)
+        self.layout.addStretch()
+
+        self.findBox = QLineEdit(self)
+        self.findBox.setPlaceholderText("Find")
+        self.findBox.setClearButtonEnabled(True)
+        self.findBox.setFixedWidth(220)
+        self.findBox.textChanged.connect(self.queueFind)
+        self.findBox.returnPressed.connect(lambda: self.findNext(1))
+        self.layout.addWidget(self.findBox)
+
+        self.caseBox = QCheckBox("Aa", self)
+        self.caseBox.setToolTip("Match case")
+        self.caseBox.toggled.connect(self.queueFind)
+        self.layout.addWidget(self.caseBox)
+
+        self.regexBox = QCheckBox(".*", self)
+        self.regexBox.setToolTip("Regular expression")
+        self.regexBox.toggled.connect(self.queueFind)
+        self.layout.addWidget(self.regexBox)
+
+        self.matchLabel = QLabel("", self)
+        self.matchLabel.setFixedWidth(110)
+        self.matchLabel.setStyleSheet("font-size: 10pt; color: #555555;")
+        self.layout.addWidget(self.matchLabel)
+
+        for text, step in (("Previous", -1), ("Next", 1)):
+            button = QPushButton(text, self)
+            button.setStyleSheet(BUTTON_STYLE)
+            button.clicked.connect(lambda checked=False, step=step: self.findNext(step))
+            self.layout.addWidget(button)
+
+        self.replaceBox = QLineEdit(self)
+        self.replaceBox.setPlaceholderText("Replace with")
+        self.replaceBox.setFixedWidth(180)
+        self.layout.addWidget(self.replaceBox)
+
+        self.replaceAllButton = QPushButton("Replace all", self)
+        self.replaceAllButton.setStyleSheet(BUTTON_STYLE)
+        self.replaceAllButton.clicked.connect(self.replaceAll)
+        self.layout.addWidget(self.replaceAllButton)
+
+        self.findTimer = QTimer(self)
+        self.findTimer.setSingleShot(True)
+        self.findTimer.setInterval(FIND_DEBOUNCE_MS)
+        self.findTimer.timeout.connect(self.runFind)
+
+        shortcut = QShortcut(QKeySequence.Find, self.window())
+        shortcut.activated.connect(self.focusFind)
+
+    def toggleTracing(self):
+        self.window().toggleTracing()
+        self.traceButton.setText("Export trace" if Tracing.isEnabled() else "Start trace")
+
+    def attachBodyArea(self, bodyArea):
+        self.bodyArea = bodyArea
+        self.bodyArea.findResultsChanged.connect(self.showMatches)
+        self.bodyArea.findFailed.connect(self.showFindError)
+        self.bodyArea.replacedAll.connect(self.showReplaced)
+
+    def focusFind(self):
+        self.findBox.setFocus()
+        self.findBox.selectAll()
+
+    def queueFind(self, *args):
+        self.findTimer.start()
+
+    def runFind(self):
+        if self.bodyArea is not None:
+            self.bodyArea.findText(self.findBox.text(), self.regexBox.isChecked(), self.caseBox.isChecked())
+
+    def findNext(self, step):
+        if self.bodyArea is not None:
+            self.bodyArea.findNext(step)
+
+    def replaceAll(self):
+        if self.bodyArea is not None and self.findBox.text():
+            self.matchLabel.setText("Replacing...")
+            self.bodyArea.replaceAll(self.replaceBox.text())
+
+    def showMatches(self, current, total):
+        if current < 0:
+            self.matchLabel.setText("No results" if self.findBox.text() else "")
+        else:
+            self.matchLabel.setText(f"{current + 1} of {total}")
+
+    def showFindError(self, error):
+        self.matchLabel.setText("Invalid pattern")
+        self.matchLabel.setToolTip(error)
+
+    def showReplaced(self, count):
+        self.matchLabel.setToolTip(f"Replaced {count} matches")
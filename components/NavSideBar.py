@@ -1,18 +1,44 @@
 from datetime import datetime
 
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QGraphicsBlurEffect, QVBoxLayout, QFileDialog, QMessageBox, QProgressBar
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QFileDialog, QMessageBox, QProgressBar, QLineEdit, QListWidget, QListWidgetItem
 from PySide6.QtGui import QIcon, QPalette, QColor, QPixmap, QCursor, QBrush, QLinearGradient
 from PySide6.QtCore import Qt, QSize, QRect, QTimer, Signal
-from PySide6.QtWebEngineWidgets import QWebEngineView
 
-from components.BodyArea import ComponentBodyArea
+from components.MemorySparkline import ComponentMemorySparkline
+from utils.Backgrounds import BackgroundPainter, clearBackgrounds
+from utils.Tracing import traced
+
+
+SIZE_UPDATE_INTERVAL_MS = 250
+SEARCH_DEBOUNCE_MS = 150
+PROGRESS_STYLE = """
+    QProgressBar {
+        border: 1px solid grey;
+        border-radius: 5px;
+        text-align: center;
+    }
+    QProgressBar::chunk {
+        background-color: %s;
+        width: 20px;
+    }
+"""
+NAV_STOPS = ((0, (255, 200, 225, 100)), (1, (255, 175, 200, 159)))
+NAV_BOTTOM_STOPS = ((0, (244, 249, 254, 60)), (1, (244, 249, 254, 60)))
+PROGRESS_STYLES = {
+    "low": PROGRESS_STYLE % "#05B8CC",
+    "mid": PROGRESS_STYLE % "#FFD700",
+    "high": PROGRESS_STYLE % "#FF4500",
+}
+
+def navGradientLine(width, height):
+    return (0, height + 200, 0, 400)
 
 class ComponentNavSideBar(QWidget):
     fileSizeUpdated = Signal(float)
 
     def __init__(self, mainWindow):
         super().__init__(mainWindow)
-        self.bodyArea = mainWindow.bodyWidget
+        self.bodyArea = None
         self.titleBar = mainWindow.titleBar
 
         self.setAutoFillBackground(True)
@@ -57,68 +83,185 @@ class ComponentNavSideBar(QWidget):
             btn.setLayoutDirection(Qt.LeftToRight)
             btn.clicked.connect(callback)
             navContentLayout.addWidget(btn)
+
+        self.searchLabel = QLabel("Search")
+        self.searchLabel.setStyleSheet("font-size: 12pt; font-weight: semibold;")
+        navContentLayout.addWidget(self.searchLabel)
+
+        self.searchBox = QLineEdit()
+        self.searchBox.setPlaceholderText("Search in recent files")
+        self.searchBox.setClearButtonEnabled(True)
+        self.searchBox.setStyleSheet("font-size: 11pt; padding: 4px;")
+        self.searchBox.textChanged.connect(self.queueSearch)
+        navContentLayout.addWidget(self.searchBox)
+
+        self.searchResults = QListWidget()
+        self.searchResults.setWordWrap(True)
+        self.searchResults.setStyleSheet("background-color: transparent; font-size: 10pt;")
+        self.searchResults.itemActivated.connect(self.openSearchResult)
+        self.searchResults.hide()
+        navContentLayout.addWidget(self.searchResults, 1)
         navContentLayout.addStretch()
 
         bottomWidget = QWidget()
-        bottomWidget.setFixedHeight(64) 
-        bottomWidget.setAutoFillBackground(True)
-        bottomPalette = bottomWidget.palette()
-        bottomPalette.setColor(QPalette.Window, QColor(244, 249, 254, 60))
-        bottomWidget.setPalette(bottomPalette)
-        bottomWidget.setGraphicsEffect(QGraphicsBlurEffect())
-
-        shadow = QGraphicsBlurEffect()
-        shadow.setBlurRadius(20)
-        bottomWidget.setGraphicsEffect(shadow)
+        bottomWidget.setFixedHeight(96)
+        self.bottomBackground = BackgroundPainter(bottomWidget, "navBottom", NAV_BOTTOM_STOPS, blurRadius=20)
 
         self.progressBar = QProgressBar()
         self.progressBar.setRange(0, 100)
         self.progressBar.setTextVisible(True)
-        self.progressBar.setStyleSheet("""
-            QProgressBar {
-                border: 1px solid grey;
-                border-radius: 5px;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #05B8CC;
-                width: 20px;
-            }
-        """)
+        self.progressBar.setStyleSheet(PROGRESS_STYLES["low"])
+        self.progressLevel = "low"
 
         bottomLayout = QVBoxLayout(bottomWidget)
-        self.sizeLabel = QLabel("Memory used: 0 Kb")
+        self.sizeLabel = QLabel("Memory used: -")
         bottomLayout.addWidget(self.sizeLabel)
+        self.sparkline = ComponentMemorySparkline()
+        bottomLayout.addWidget(self.sparkline)
         bottomLayout.addWidget(self.progressBar)
 
         navMainLayout.addLayout(navContentLayout)
         navMainLayout.addWidget(bottomWidget)
 
-        self.fileSizeUpdated.connect(self.updateProgressBar)
-
-    def updateProgressBar(self, totalSizeKB):
-        
-        return
-        
-        print("total size", totalSizeKB)
-        self.sizeLabel.setText(f"Memory used: {totalSizeKB:.2f} Kb")
-        progress = min(totalSizeKB, 100)
-        self.progressBar.setValue(progress)
-
-        if totalSizeKB < 50:
-            color = "#05B8CC"
-        elif totalSizeKB < 80:
-            color = "#FFD700"
+        self.fileSizeUpdated.connect(self.updateDocumentSize)
+
+        self.memorySample = None
+        self.documentSizeKB = 0
+        self.pendingSizeKB = None
+        self.sizeTimer = QTimer(self)
+        self.sizeTimer.setInterval(SIZE_UPDATE_INTERVAL_MS)
+        self.sizeTimer.timeout.connect(self.flushSizeUpdate)
+
+        self.fileLoader = None
+        self.loadToken = None
+        self.loadStarted = False
+        self.loadPath = None
+        self.loadDocument = None
+        self.pendingActions = []
+
+        self.searchToken = None
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.searchTimer.timeout.connect(self.runSearch)
+
+    def attachBodyArea(self, bodyArea):
+        self.bodyArea = bodyArea
+        self.bodyArea.fileSizeUpdated.connect(self.queueSizeUpdate)
+        self.bodyArea.searchIndexer.results.connect(self.showSearchResults)
+        self.bodyArea.memoryMonitor.sampled.connect(self.onMemorySampled)
+        self.bodyArea.memoryMonitor.memoryPressure.connect(self.onMemoryPressure)
+
+        actions, self.pendingActions = self.pendingActions, []
+        for action in actions:
+            action()
+
+    def runWhenAttached(self, action):
+        #*The body area is only built after the first paint, a file picked before that is handled once it is attached
+        if self.bodyArea is None:
+            self.pendingActions.append(action)
+        else:
+            action()
+
+    def ensureFileLoader(self):
+        if self.fileLoader is None:
+            from utils.FileLoader import FileLoader
+            self.fileLoader = FileLoader(self.bodyArea.preloadCache)
+            self.fileLoader.blocksReady.connect(self.onBlocksLoaded)
+            self.fileLoader.progress.connect(self.onLoadProgress)
+            self.fileLoader.finished.connect(self.onLoadFinished)
+            self.fileLoader.failed.connect(self.onLoadFailed)
+        return self.fileLoader
+
+    def queueSearch(self, text):
+        self.searchTimer.start()
+
+    def runSearch(self):
+        text = self.searchBox.text().strip()
+        if not text or self.bodyArea is None:
+            self.searchToken = None
+            self.searchResults.clear()
+            self.searchResults.hide()
+            return
+        self.searchToken = self.bodyArea.searchIndexer.search(text)
+
+    def showSearchResults(self, token, results):
+        if token != self.searchToken:
+            return
+        self.searchResults.clear()
+        for result in results:
+            snippet = " ".join(result["snippet"].split())
+            item = QListWidgetItem(f"{result['path'].split('/')[-1]}\n{snippet}")
+            item.setToolTip(result["path"])
+            item.setData(Qt.UserRole, result["path"])
+            self.searchResults.addItem(item)
+        if not results:
+            self.searchResults.addItem("No matches")
+        self.searchResults.show()
+
+    def openSearchResult(self, item):
+        path = item.data(Qt.UserRole)
+        if path:
+            self.openPath(path)
+
+    def queueSizeUpdate(self, totalSizeKB):
+        self.pendingSizeKB = totalSizeKB
+        if not self.sizeTimer.isActive():
+            self.sizeTimer.start()
+
+    def flushSizeUpdate(self):
+        if self.pendingSizeKB is None:
+            self.sizeTimer.stop()
+            return
+        totalSizeKB = self.pendingSizeKB
+        self.pendingSizeKB = None
+        self.fileSizeUpdated.emit(totalSizeKB)
+
+    def updateDocumentSize(self, totalSizeKB):
+        self.documentSizeKB = totalSizeKB
+        self.updateMemoryUsage()
+
+    def onMemorySampled(self, sample):
+        self.memorySample = sample
+        self.sparkline.addSample(sample["total_pss_kb"], sample["budget_kb"])
+        self.updateMemoryUsage()
+
+    def onMemoryPressure(self, sample):
+        clearBackgrounds()
+
+    def updateMemoryUsage(self):
+        sample = self.memorySample
+        if sample is None:
+            return
+        totalMB = sample["total_pss_kb"] / 1024
+        budgetMB = sample["budget_kb"] / 1024
+        self.sizeLabel.setText(f"Memory used: {totalMB:.0f} of {budgetMB:.0f} MB")
+        self.sizeLabel.setToolTip(
+            f"App: {sample['app_pss_kb'] / 1024:.1f} MB PSS, {sample['app_rss_kb'] / 1024:.1f} MB RSS\n"
+            f"Web engine: {sample['web_pss_kb'] / 1024:.1f} MB PSS in {sample['web_processes']} processes\n"
+            f"Workers: {sample['other_pss_kb'] / 1024:.1f} MB PSS\n"
+            f"Document: {self.documentSizeKB:.2f} Kb"
+        )
+        self.sparkline.setToolTip(self.sizeLabel.toolTip())
+
+        #*The bar shows load progress while a file is still streaming in
+        if self.loadToken is not None:
+            return
+        percent = totalMB / budgetMB * 100 if budgetMB else 0
+        self.progressBar.setValue(int(min(percent, 100)))
+
+        if percent < 50:
+            level = "low"
+        elif percent < 80:
+            level = "mid"
         else:
-            color = "#FF4500"
+            level = "high"
 
-        self.progressBar.setStyleSheet(f"""
-            QProgressBar::chunk {{
-                background-color: {color};
-                width: 20px;
-            }}
-        """)
+        if level != self.progressLevel:
+            self.progressLevel = level
+            self.progressBar.setStyleSheet(PROGRESS_STYLES[level])
 
+    @traced()
     def newFile(self):
         options = QFileDialog.Options()
         fileName, _ = QFileDialog.getSaveFileName(self, "Create new file", "", "Notepad Plus Files (*.ntp);;Notepad default Files (*.txt);;All Files (*)", options=options)
@@ -127,6 +270,7 @@ class ComponentNavSideBar(QWidget):
                 fileName += ".ntp"
             sFileName = fileName.split("/")[-1]
             self.titleBar.fileNameTitle.setText(f"{sFileName}")
+            self.abandonLoad()
             content = """
             <html contenteditable="true">
             <body>
@@ -138,7 +282,7 @@ class ComponentNavSideBar(QWidget):
                 with open(fileName, "w") as file:
                     file.write(content)
                 
-                self.bodyArea.loadNtpContent(content, sFileName)
+                self.runWhenAttached(lambda: self.bodyArea.loadNtpContent(content, fileName))
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"An error ocurred while trying to create the file {fileName}")
 
@@ -146,31 +290,77 @@ class ComponentNavSideBar(QWidget):
     def openFile(self):
         options = QFileDialog.Options()
         fileName, _ = QFileDialog.getOpenFileName(self, "Open file", "", "Notepad Plus Files (*.ntp);;Notepad default Files (*.txt);;All Files (*)", options=options)
+        if fileName:
+            self.openPath(fileName)
+
+    @traced()
+    def openPath(self, fileName):
+        if self.bodyArea is None:
+            self.runWhenAttached(lambda: self.openPath(fileName))
+            return
+        openIndex = self.bodyArea.findDocument(fileName)
+        if openIndex >= 0:
+            #*The file already has a tab, so switch to it instead of loading a second copy
+            self.bodyArea.activateDocument(openIndex)
+            return
         sFileName = fileName.split("/")[-1]
         self.titleBar.fileNameTitle.setText(f"{sFileName}")
-        if fileName:
-            try:
-                with open(fileName, "r") as file:
-                    content = file.read()
-                    print("przekazuje ", content)
-                    QTimer.singleShot(0, lambda: self.bodyArea.loadNtpContent(content, fileName))
-            except Exception as e:
-                QMessageBox.information(self, "File opened", f"File {sFileName} opened")
+        self.abandonLoad()
+        self.loadPath = fileName
+        self.loadStarted = False
+        self.progressBar.setValue(0)
+        self.loadToken = self.ensureFileLoader().open(fileName)
+
+    def abandonLoad(self):
+        #*A superseded load leaves its partial tab editable instead of stuck read-only
+        if self.fileLoader is not None:
+            self.fileLoader.cancel()
+        self.loadToken = None
+        if self.loadDocument is not None:
+            self.bodyArea.finishDocument(self.loadDocument)
+            self.loadDocument = None
+
+    @traced()
+    def onBlocksLoaded(self, token, blocks):
+        if token != self.loadToken:
+            return
+        if self.loadStarted:
+            self.bodyArea.appendBlocks(blocks, self.loadDocument)
+        else:
+            self.loadStarted = True
+            self.loadDocument = self.bodyArea.beginDocument(blocks, self.loadPath, loading=True)
+
+    def onLoadProgress(self, token, percent):
+        if token == self.loadToken:
+            self.progressBar.setValue(percent)
+
+    @traced()
+    def onLoadFinished(self, token):
+        if token != self.loadToken:
+            return
+        if not self.loadStarted:
+            self.loadDocument = self.bodyArea.beginDocument([], self.loadPath)
+        self.bodyArea.finishDocument(self.loadDocument)
+        self.loadToken = None
+        self.loadDocument = None
+        self.bodyArea.saveFilePath(self.loadPath)
+        self.bodyArea.calculateTotalSize()
+
+    def onLoadFailed(self, token, error):
+        if token != self.loadToken:
+            return
+        self.loadToken = None
+        if self.loadDocument is not None:
+            self.bodyArea.finishDocument(self.loadDocument)
+            self.loadDocument = None
+        sFileName = self.loadPath.split("/")[-1]
+        QMessageBox.warning(self, "Error", f"An error occurred while trying to open the file {sFileName}")
 
     def saveFile(self):
-        self.bodyArea.saveFile()
+        #*Nothing can have been edited before the body area exists
+        if self.bodyArea is not None:
+            self.bodyArea.saveFile()
 
 
     def setNavBackground(self):
-        startPosY = self.height() + 200
-        gradient = QLinearGradient(0, startPosY, 0, 400)
-        gradient.setColorAt(0, QColor(255, 200, 225, 100))
-        gradient.setColorAt(1, QColor(255, 175, 200, 159))
-
-        blurEffect = QGraphicsBlurEffect()
-        blurEffect.setBlurRadius(200)
-
-        palette = self.palette()
-        palette.setBrush(QPalette.Window, QBrush(gradient))
-        self.setPalette(palette)
-        self.setGraphicsEffect(blurEffect)
+        self.background = BackgroundPainter(self, "nav", NAV_STOPS, blurRadius=200, gradientLine=navGradientLine)
@@ -0,0 +1,93 @@
+from PySide6.QtWidgets import QPlainTextEdit, QFrame
+from PySide6.QtGui import QTextCursor, QFontDatabase
+from PySide6.QtCore import Signal
+
+SPLICE_LIMIT = 2000
+
+class ComponentPlainTextEditor(QPlainTextEdit):
+    edited = Signal()
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        #*QPlainTextEdit already has document(), the blocks live in model
+        self.model = model
+        self.loading = False
+        self.lineCount = 1
+
+        self.setFrameShape(QFrame.NoFrame)
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.setPlaceholderText("Start - Click here and start typing...")
+        self.setStyleSheet("QPlainTextEdit { background-color: #FFFFFF; padding: 8px; }")
+
+        self.document().contentsChange.connect(self.onContentsChange)
+
+    def setBlocks(self, blocks):
+        self.loading = True
+        self.setPlainText("".join(blocks))
+        self.lineCount = self.document().blockCount()
+        self.loading = False
+
+    def appendBlocks(self, blocks):
+        self.loading = True
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText("".join(blocks))
+        self.lineCount = self.document().blockCount()
+        self.loading = False
+
+    def setLoading(self, loading):
+        self.setReadOnly(loading)
+
+    def spliceBlocks(self, ops):
+        #*The model is already updated, the whole batch becomes a single undo step
+        self.loading = True
+        document = self.document()
+        cursor = QTextCursor(document)
+        cursor.beginEditBlock()
+        if len(ops) > SPLICE_LIMIT:
+            cursor.select(QTextCursor.Document)
+            cursor.insertText(self.model.serialize())
+        else:
+            for op in reversed(ops):
+                cursor.setPosition(document.findBlockByNumber(op["start"]).position())
+                end = document.findBlockByNumber(op["start"] + op["deleteCount"])
+                if end.isValid():
+                    cursor.setPosition(end.position(), QTextCursor.KeepAnchor)
+                else:
+                    cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+                cursor.insertText("".join(op["blocks"]))
+        cursor.endEditBlock()
+        self.lineCount = document.blockCount()
+        self.loading = False
+
+    def selectRange(self, start, end):
+        document = self.document()
+        cursor = QTextCursor(document)
+        cursor.setPosition(document.findBlockByNumber(start[0]).position() + start[2])
+        cursor.setPosition(document.findBlockByNumber(end[0]).position() + end[2], QTextCursor.KeepAnchor)
+        self.setTextCursor(cursor)
+        self.centerCursor()
+
+    def flushEdits(self, callback):
+        callback()
+
+    def onContentsChange(self, position, charsRemoved, charsAdded):
+        if self.loading:
+            return
+
+        document = self.document()
+        count = document.blockCount()
+        first = document.findBlock(position).blockNumber()
+        lastBlock = document.findBlock(position + charsAdded)
+        last = lastBlock.blockNumber() if lastBlock.isValid() else count - 1
+        deleteCount = (last - first + 1) - (count - self.lineCount)
+        self.lineCount = count
+
+        lines = []
+        block = document.findBlockByNumber(first)
+        while block.isValid() and block.blockNumber() <= last:
+            lines.append(block.text() + ("\n" if block.blockNumber() < count - 1 else ""))
+            block = block.next()
+
+        self.model.splice(first, deleteCount, lines)
+        self.edited.emit()
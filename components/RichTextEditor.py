@@ -0,0 +1,692 @@
+import json
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+from PySide6.QtWebEngineWidgets import QWebEngineView
+from PySide6.QtCore import Signal, Slot
+from PySide6.QtWebChannel import QWebChannel
+
+from utils.BlobSchemeHandler import installBlobScheme
+from utils.HtmlBlocks import splitBlocks
+from utils.Tracing import traced, span, beginAsync
+
+PATCH_DEBOUNCE_MS = 150
+#*Above this many blocks only a window around the viewport is kept in the DOM, the rest stays in the Python model
+VIRTUAL_MIN_BLOCKS = 5000
+WINDOW_BLOCKS = 400
+WINDOW_MARGIN_BLOCKS = 60
+ESTIMATED_BLOCK_PX = 24
+
+EDITOR_PAGE = """
+    <html>
+    <head>
+        <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
+        <script>
+            var sent = [];
+            var dirty = new Set();
+            var flushTimer = null;
+            var observer = null;
+            var sources = new WeakMap();
+            var virtual = false;
+            var windowStart = 0;
+            var total = 0;
+            var blockHeight = %(blockHeight)d;
+            var topSpacer = null;
+            var bottomSpacer = null;
+            var windowRequested = false;
+            var pendingAnchor = null;
+            var pendingSelect = null;
+            var scrollScheduled = false;
+            var WINDOW_BLOCKS = %(windowBlocks)d;
+            var WINDOW_MARGIN_BLOCKS = %(windowMargin)d;
+
+            function blockHtml(node) {
+                if (node.nodeType === Node.ELEMENT_NODE) {
+                    return node.outerHTML;
+                }
+                if (node.nodeType === Node.TEXT_NODE) {
+                    var holder = document.createElement("div");
+                    holder.textContent = node.textContent;
+                    return holder.innerHTML;
+                }
+                return "";
+            }
+
+            function sourceHtml(node) {
+                var html = blockHtml(node);
+                sources.set(node, html);
+                return html;
+            }
+
+            function isSpacer(node) {
+                return node !== null && (node === topSpacer || node === bottomSpacer);
+            }
+
+            function bodyBlocks() {
+                var nodes = Array.prototype.slice.call(document.body.childNodes);
+                return virtual ? nodes.filter(function(node) { return !isSpacer(node); }) : nodes;
+            }
+
+            function topLevel(node) {
+                while (node && node.parentNode !== document.body) {
+                    node = node.parentNode;
+                }
+                return node;
+            }
+
+            function markDirty(records) {
+                records.forEach(function(record) {
+                    var node = topLevel(record.target);
+                    if (node && !isSpacer(node)) {
+                        dirty.add(node);
+                    }
+                });
+            }
+
+            function sendReset(deleteCount) {
+                sent = bodyBlocks();
+                dirty.clear();
+                if (virtual) {
+                    //*Only the window is in the DOM, so it replaces the blocks it was built from instead of the document
+                    window.qtbridge.contentChanged(JSON.stringify({ops: [{start: windowStart, deleteCount: deleteCount, blocks: sent.map(sourceHtml)}]}));
+                    total += sent.length - deleteCount;
+                } else {
+                    window.qtbridge.contentChanged(JSON.stringify({reset: true, blocks: sent.map(blockHtml)}));
+                }
+            }
+
+            function collectOps() {
+                var current = bodyBlocks();
+                var head = 0;
+                while (head < current.length && head < sent.length && current[head] === sent[head] && !dirty.has(current[head])) {
+                    head++;
+                }
+                var tail = 0;
+                while (tail < current.length - head && tail < sent.length - head
+                       && current[current.length - 1 - tail] === sent[sent.length - 1 - tail]
+                       && !dirty.has(current[current.length - 1 - tail])) {
+                    tail++;
+                }
+
+                var ops = [];
+                var currentEnd = current.length - tail;
+                var sentEnd = sent.length - tail;
+                var sameShape = currentEnd - head === sentEnd - head;
+                for (var i = head; sameShape && i < currentEnd; i++) {
+                    sameShape = current[i] === sent[i];
+                }
+                if (sameShape) {
+                    for (var j = head; j < currentEnd; j++) {
+                        if (dirty.has(current[j])) {
+                            ops.push({start: windowStart + j, deleteCount: 1, blocks: [sourceHtml(current[j])]});
+                        }
+                    }
+                } else {
+                    ops.push({start: windowStart + head, deleteCount: sentEnd - head, blocks: current.slice(head, currentEnd).map(sourceHtml)});
+                }
+
+                dirty.clear();
+                var changed = current.length - sent.length;
+                sent = current;
+                if (virtual) {
+                    total += changed;
+                    ops = ops.concat(spacerOps());
+                }
+                return ops;
+            }
+
+            function spacerOps() {
+                //*A selection across a spacer deletes it, which deletes the blocks it stands for
+                var ops = [];
+                if (!bottomSpacer.isConnected) {
+                    var after = total - windowStart - sent.length;
+                    if (after > 0) {
+                        ops.push({start: windowStart + sent.length, deleteCount: after, blocks: []});
+                        total -= after;
+                    }
+                }
+                if (!topSpacer.isConnected && windowStart > 0) {
+                    ops.push({start: 0, deleteCount: windowStart, blocks: []});
+                    total -= windowStart;
+                    windowStart = 0;
+                }
+                if (ops.length || !topSpacer.isConnected || !bottomSpacer.isConnected) {
+                    ensureSpacers();
+                    updateSpacers();
+                    observer.takeRecords();
+                }
+                return ops;
+            }
+
+            function flushNow() {
+                if (flushTimer !== null) {
+                    clearTimeout(flushTimer);
+                    flushTimer = null;
+                }
+                markDirty(observer.takeRecords());
+                var ops = collectOps();
+                if (ops.length) {
+                    window.qtbridge.contentChanged(JSON.stringify({ops: ops}));
+                }
+                return ops.length;
+            }
+
+            function flush() {
+                flushTimer = null;
+                var ops = collectOps();
+                if (ops.length) {
+                    window.qtbridge.contentChanged(JSON.stringify({ops: ops}));
+                }
+            }
+
+            function editorFlush() {
+                if (flushTimer !== null) {
+                    clearTimeout(flushTimer);
+                    flushTimer = null;
+                }
+                markDirty(observer.takeRecords());
+                var ops = collectOps();
+                return ops.length ? JSON.stringify({ops: ops}) : "";
+            }
+
+            function editorSplice(ops) {
+                markDirty(observer.takeRecords());
+                var holder = document.createElement("template");
+                var aligned = true;
+                for (var i = ops.length - 1; i >= 0; i--) {
+                    var op = ops[i];
+                    holder.innerHTML = op.blocks.join("");
+                    var nodes = Array.prototype.slice.call(holder.content.childNodes);
+                    aligned = aligned && nodes.length === op.blocks.length;
+                    if (nodes.length === op.blocks.length) {
+                        nodes.forEach(function(node, k) {
+                            sources.set(node, op.blocks[k]);
+                        });
+                    }
+                    var old = sent.slice(op.start, op.start + op.deleteCount);
+                    var anchor = sent[op.start + op.deleteCount] || null;
+                    if (anchor && anchor.parentNode !== document.body) {
+                        anchor = null;
+                    }
+                    nodes.forEach(function(node) {
+                        document.body.insertBefore(node, anchor);
+                    });
+                    old.forEach(function(node) {
+                        dirty.delete(node);
+                        if (node.parentNode === document.body) {
+                            document.body.removeChild(node);
+                        }
+                    });
+                    Array.prototype.splice.apply(sent, [op.start, op.deleteCount].concat(nodes));
+                }
+                observer.takeRecords();
+                if (!aligned) {
+                    sendReset();
+                }
+            }
+
+            function editorSwapSources(ops) {
+                //*Saving moved inline images to the blob store, only the img attributes change so the caret stays put
+                markDirty(observer.takeRecords());
+                var holder = document.createElement("template");
+                var current = bodyBlocks();
+                ops.forEach(function(op) {
+                    var node = sent[op.start - windowStart];
+                    if (!node || node !== current[op.start - windowStart] || node.nodeType !== Node.ELEMENT_NODE || dirty.has(node)) {
+                        return;
+                    }
+                    holder.innerHTML = op.blocks[0];
+                    var images = node.tagName === "IMG" ? [node] : Array.prototype.slice.call(node.getElementsByTagName("img"));
+                    var saved = holder.content.querySelectorAll("img");
+                    if (images.length !== saved.length) {
+                        return;
+                    }
+                    images.forEach(function(image, k) {
+                        var src = image.getAttribute("src") || "";
+                        if (src !== saved[k].getAttribute("src") && src.indexOf("data:") === 0) {
+                            image.setAttribute("loading", saved[k].getAttribute("loading") || "lazy");
+                            image.setAttribute("src", saved[k].getAttribute("src"));
+                        }
+                    });
+                    sources.set(node, op.blocks[0]);
+                });
+                observer.takeRecords();
+            }
+
+            function textNodeAt(position) {
+                var root = sent[position[0] - windowStart];
+                if (!root || root.nodeType === Node.TEXT_NODE) {
+                    return root;
+                }
+                var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+                var node = walker.nextNode();
+                for (var i = 0; node && i < position[1]; i++) {
+                    node = walker.nextNode();
+                }
+                return node;
+            }
+
+            function editorSelect(start, end) {
+                if (virtual && (start[0] < windowStart || end[0] >= windowStart + sent.length)) {
+                    //*The match is outside the window, it is selected once the blocks around it arrive
+                    pendingSelect = [start, end];
+                    var first = Math.max(0, Math.min(total - WINDOW_BLOCKS, start[0] - WINDOW_BLOCKS / 2));
+                    requestWindow(first, Math.min(total, first + WINDOW_BLOCKS), null);
+                    return;
+                }
+                selectRange(start, end);
+            }
+
+            function selectRange(start, end) {
+                var startNode = textNodeAt(start);
+                var endNode = textNodeAt(end);
+                if (!startNode || !endNode) {
+                    return;
+                }
+                var range = document.createRange();
+                range.setStart(startNode, Math.min(start[2], startNode.length));
+                range.setEnd(endNode, Math.min(end[2], endNode.length));
+                var selection = window.getSelection();
+                selection.removeAllRanges();
+                selection.addRange(range);
+                startNode.parentElement.scrollIntoView({block: "center"});
+            }
+
+            function insertBlocks(blocks) {
+                var holder = document.createElement("template");
+                var added = [];
+                var aligned = true;
+                blocks.forEach(function(block) {
+                    holder.innerHTML = block;
+                    var nodes = Array.prototype.slice.call(holder.content.childNodes);
+                    aligned = aligned && nodes.length === 1;
+                    if (nodes.length === 1) {
+                        sources.set(nodes[0], block);
+                    }
+                    nodes.forEach(function(node) {
+                        document.body.appendChild(node);
+                        added.push(node);
+                    });
+                });
+                observer.takeRecords();
+                return aligned ? added : null;
+            }
+
+            function editorAppend(blocks) {
+                markDirty(observer.takeRecords());
+                var added = insertBlocks(blocks);
+                if (added) {
+                    sent = sent.concat(added);
+                } else {
+                    sendReset();
+                }
+            }
+
+            function makeSpacer() {
+                var spacer = document.createElement("div");
+                spacer.contentEditable = "false";
+                spacer.style.userSelect = "none";
+                return spacer;
+            }
+
+            function ensureSpacers() {
+                if (topSpacer === null) {
+                    topSpacer = makeSpacer();
+                    bottomSpacer = makeSpacer();
+                }
+                if (document.body.firstChild !== topSpacer) {
+                    document.body.insertBefore(topSpacer, document.body.firstChild);
+                }
+                if (document.body.lastChild !== bottomSpacer) {
+                    document.body.appendChild(bottomSpacer);
+                }
+            }
+
+            function updateSpacers() {
+                //*Blocks outside the window are stood in for at the average height of the ones that are rendered
+                if (sent.length) {
+                    var height = bottomSpacer.getBoundingClientRect().top - topSpacer.getBoundingClientRect().bottom;
+                    if (height > 0) {
+                        blockHeight = height / sent.length;
+                    }
+                }
+                topSpacer.style.height = Math.round(windowStart * blockHeight) + "px";
+                bottomSpacer.style.height = Math.round(Math.max(0, total - windowStart - sent.length) * blockHeight) + "px";
+            }
+
+            function nodeRect(node) {
+                if (node.nodeType === Node.ELEMENT_NODE) {
+                    return node.getBoundingClientRect();
+                }
+                var range = document.createRange();
+                range.selectNode(node);
+                return range.getBoundingClientRect();
+            }
+
+            function visibleBlocks() {
+                var count = Math.ceil(window.innerHeight / blockHeight) + 1;
+                var windowTop = topSpacer.getBoundingClientRect().bottom;
+                var windowBottom = bottomSpacer.getBoundingClientRect().top;
+                if (windowTop > 0 || !sent.length) {
+                    var before = Math.min(windowStart, Math.ceil(windowTop / blockHeight));
+                    return {first: windowStart - before, count: count, top: windowTop - before * blockHeight};
+                }
+                if (windowBottom <= 0) {
+                    var skipped = Math.min(Math.floor(-windowBottom / blockHeight), Math.max(0, total - windowStart - sent.length - 1));
+                    return {first: windowStart + sent.length + skipped, count: count, top: windowBottom + skipped * blockHeight};
+                }
+                var low = 0;
+                var high = sent.length - 1;
+                while (low < high) {
+                    var middle = (low + high) >> 1;
+                    if (nodeRect(sent[middle]).bottom > 0) {
+                        high = middle;
+                    } else {
+                        low = middle + 1;
+                    }
+                }
+                return {first: windowStart + low, count: count, top: nodeRect(sent[low]).top};
+            }
+
+            function requestWindow(start, end, anchor) {
+                //*Edits are sent first so the blocks that come back already contain them
+                flushNow();
+                windowRequested = true;
+                pendingAnchor = anchor;
+                window.qtbridge.requestWindow(start, end);
+            }
+
+            function checkWindow() {
+                if (!virtual || windowRequested || !window.qtbridge) {
+                    return;
+                }
+                var visible = visibleBlocks();
+                var windowEnd = windowStart + sent.length;
+                var wantStart = Math.max(0, visible.first - WINDOW_MARGIN_BLOCKS);
+                var wantEnd = Math.min(total, visible.first + visible.count + WINDOW_MARGIN_BLOCKS);
+                if (wantStart >= windowStart && wantEnd <= windowEnd) {
+                    return;
+                }
+                var start = Math.max(0, Math.min(total - WINDOW_BLOCKS, visible.first - Math.floor((WINDOW_BLOCKS - visible.count) / 2)));
+                requestWindow(start, Math.min(total, start + WINDOW_BLOCKS), {index: visible.first, top: visible.top});
+            }
+
+            function applyWindow(start, blocks, anchor) {
+                //*Nodes that are still in the window and still match their block are kept, so the caret and layout survive
+                var kept = new Map();
+                sent.forEach(function(node, i) {
+                    kept.set(windowStart + i, node);
+                });
+                var holder = document.createElement("template");
+                var nodes = [];
+                var aligned = true;
+                blocks.forEach(function(block, i) {
+                    var node = kept.get(start + i);
+                    if (node && sources.get(node) === block) {
+                        kept.delete(start + i);
+                        nodes.push(node);
+                        return;
+                    }
+                    holder.innerHTML = block;
+                    var parsed = Array.prototype.slice.call(holder.content.childNodes);
+                    aligned = aligned && parsed.length === 1;
+                    parsed.forEach(function(parsedNode) {
+                        sources.set(parsedNode, block);
+                        nodes.push(parsedNode);
+                    });
+                });
+                kept.forEach(function(node) {
+                    if (node.parentNode === document.body) {
+                        document.body.removeChild(node);
+                    }
+                });
+                var cursor = topSpacer.nextSibling;
+                nodes.forEach(function(node) {
+                    if (node === cursor) {
+                        cursor = cursor.nextSibling;
+                    } else {
+                        document.body.insertBefore(node, cursor);
+                    }
+                });
+
+                windowStart = start;
+                sent = nodes;
+                dirty.clear();
+                observer.takeRecords();
+                if (!aligned) {
+                    sendReset(blocks.length);
+                }
+                updateSpacers();
+                if (anchor && anchor.index >= windowStart && anchor.index < windowStart + sent.length) {
+                    window.scrollBy(0, nodeRect(sent[anchor.index - windowStart]).top - anchor.top);
+                }
+                observer.takeRecords();
+            }
+
+            function editorWindow(start, count, blocks) {
+                windowRequested = false;
+                if (!virtual) {
+                    return;
+                }
+                if (flushNow()) {
+                    //*The answer was read before these edits reached Python, ask again for blocks that include them
+                    pendingAnchor = null;
+                    if (pendingSelect !== null) {
+                        editorSelect(pendingSelect[0], pendingSelect[1]);
+                    } else {
+                        checkWindow();
+                    }
+                    return;
+                }
+                total = count;
+                var anchor = pendingAnchor;
+                pendingAnchor = null;
+                applyWindow(start, blocks, anchor);
+                var selection = pendingSelect;
+                pendingSelect = null;
+                if (selection !== null && selection[0][0] >= windowStart && selection[0][0] < windowStart + sent.length) {
+                    selectRange(selection[0], selection[1]);
+                }
+                checkWindow();
+            }
+
+            function editorSetVirtual(count, blocks) {
+                if (flushTimer !== null) {
+                    clearTimeout(flushTimer);
+                    flushTimer = null;
+                }
+                dirty.clear();
+                document.body.replaceChildren();
+                virtual = true;
+                windowStart = 0;
+                total = count;
+                sent = [];
+                windowRequested = false;
+                pendingSelect = null;
+                ensureSpacers();
+                observer.takeRecords();
+                window.scrollTo(0, 0);
+                applyWindow(0, blocks, null);
+            }
+
+            function editorGrow(count) {
+                //*Blocks appended while loading stay in Python, the DOM that is already there becomes the first window
+                markDirty(observer.takeRecords());
+                if (!virtual) {
+                    virtual = true;
+                    windowStart = 0;
+                    ensureSpacers();
+                }
+                total = count;
+                updateSpacers();
+                observer.takeRecords();
+                checkWindow();
+            }
+
+            function editorRefresh(count) {
+                //*Python changed blocks itself, the window is fetched again and only the blocks that differ are rebuilt
+                total = count;
+                windowStart = Math.min(windowStart, Math.max(0, total - sent.length));
+                var end = Math.min(total, windowStart + Math.max(sent.length, WINDOW_BLOCKS));
+                requestWindow(windowStart, end, null);
+            }
+
+            function editorSetBlocks(blocks) {
+                if (flushTimer !== null) {
+                    clearTimeout(flushTimer);
+                    flushTimer = null;
+                }
+                dirty.clear();
+                document.body.replaceChildren();
+                virtual = false;
+                windowStart = 0;
+                var added = insertBlocks(blocks);
+                if (added) {
+                    sent = added;
+                } else {
+                    sendReset();
+                }
+                window.scrollTo(0, 0);
+            }
+
+            document.addEventListener("DOMContentLoaded", function() {
+                observer = new MutationObserver(function(records) {
+                    markDirty(records);
+                    if (flushTimer === null && window.qtbridge) {
+                        flushTimer = setTimeout(flush, %(debounce)d);
+                    }
+                });
+                observer.observe(document.body, {childList: true, subtree: true, characterData: true, attributes: true});
+                document.documentElement.style.overflowAnchor = "none";
+                window.addEventListener("scroll", function() {
+                    if (virtual && !scrollScheduled) {
+                        scrollScheduled = true;
+                        requestAnimationFrame(function() {
+                            scrollScheduled = false;
+                            checkWindow();
+                        });
+                    }
+                }, {passive: true});
+
+                new QWebChannel(qt.webChannelTransport, function(channel) {
+                    window.qtbridge = channel.objects.qtbridge;
+                    window.qtbridge.editorReady();
+                });
+            });
+        </script>
+    </head>
+    <body contenteditable="true"></body>
+    </html>
+"""
+
+def editorPage():
+    return EDITOR_PAGE % {
+        "debounce": PATCH_DEBOUNCE_MS,
+        "blockHeight": ESTIMATED_BLOCK_PX,
+        "windowBlocks": WINDOW_BLOCKS,
+        "windowMargin": WINDOW_MARGIN_BLOCKS,
+    }
+
+class ComponentRichTextEditor(QWidget):
+    edited = Signal()
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self.document = document
+        self.editorIsReady = False
+        self.virtual = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        installBlobScheme()
+        #*The editor page is loaded once, documents are swapped through the bridge
+        self.webView = QWebEngineView()
+        with span("setHtml", "web"):
+            self.webView.setHtml(editorPage())
+        layout.addWidget(self.webView)
+
+        self.webChannel = QWebChannel()
+        self.webChannel.registerObject("qtbridge", self)
+        self.webView.page().setWebChannel(self.webChannel)
+
+    def runJavaScript(self, script, callback=None):
+        if callback is None:
+            self.webView.page().runJavaScript(script)
+        else:
+            #*The async span covers the round trip until the page answers
+            finish = beginAsync("runJavaScript", "web")
+
+            def onResult(result):
+                finish()
+                with span("runJavaScript callback", "web"):
+                    callback(result)
+            self.webView.page().runJavaScript(script, 0, onResult)
+
+    @traced(category="web")
+    def setBlocks(self, blocks):
+        if self.editorIsReady:
+            self.virtual = len(blocks) >= VIRTUAL_MIN_BLOCKS
+            if self.virtual:
+                self.runJavaScript(f"editorSetVirtual({len(blocks)}, {json.dumps(list(blocks[:WINDOW_BLOCKS]))})")
+            else:
+                self.runJavaScript(f"editorSetBlocks({json.dumps(list(blocks))})")
+
+    @traced(category="web")
+    def appendBlocks(self, blocks):
+        if self.editorIsReady:
+            #*The document already holds the appended blocks, a virtual page only needs the new count
+            if self.virtual or len(self.document) >= VIRTUAL_MIN_BLOCKS:
+                self.virtual = True
+                self.runJavaScript(f"editorGrow({len(self.document)})")
+            else:
+                self.runJavaScript(f"editorAppend({json.dumps(blocks)})")
+
+    def setLoading(self, loading):
+        pass
+
+    def flushEdits(self, callback):
+        #*Pending DOM edits are returned straight to the callback so nothing is left in flight on the bridge
+        def onFlushed(result):
+            if result:
+                self.contentChanged(result)
+            callback()
+        self.runJavaScript("editorFlush()", onFlushed)
+
+    def spliceBlocks(self, ops):
+        if self.virtual:
+            self.runJavaScript(f"editorRefresh({len(self.document)})")
+        else:
+            self.runJavaScript(f"editorSplice({json.dumps(ops)})")
+
+    def swapBlobSources(self, ops):
+        self.runJavaScript(f"editorSwapSources({json.dumps(ops)})")
+
+    def selectRange(self, start, end):
+        self.runJavaScript(f"editorSelect({json.dumps(start)}, {json.dumps(end)})")
+
+    @Slot()
+    def editorReady(self):
+        self.editorIsReady = True
+        self.setBlocks(self.document.blocks)
+
+    @Slot(int, int)
+    @traced(category="bridge")
+    def requestWindow(self, start, end):
+        start = max(0, min(start, len(self.document)))
+        blocks = self.document.blocks[start:end]
+        self.runJavaScript(f"editorWindow({start}, {len(self.document)}, {json.dumps(blocks)})")
+
+    @Slot(str)
+    @traced(category="bridge")
+    def contentChanged(self, content):
+        try:
+            patch = json.loads(content)
+        except ValueError:
+            patch = None
+
+        if isinstance(patch, dict):
+            self.document.applyPatch(patch)
+        else:
+            #*Legacy pages still send their whole innerHTML, it replaces the blocks like a reset patch
+            self.document.reset(splitBlocks(content))
+        self.edited.emit()
@@ -1,16 +1,32 @@
 import os
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QGraphicsBlurEffect
-from PySide6.QtGui import QIcon, QPalette, QColor, QPixmap, QCursor, QBrush, QLinearGradient
-from PySide6.QtCore import Qt, QSize, QRect, QTimer
+import time
+
+STARTUP_TIME = time.perf_counter()
 
-from BlurWindow.blurWindow import blur
+if __name__ == "__main__" and sys.argv[1:2] and sys.argv[1] in ("convert", "export", "stat"):
+    #*Batch commands run before anything from Qt is imported
+    from utils.Cli import run
+    sys.exit(run(sys.argv[1:]))
+
+from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QGraphicsBlurEffect, QMessageBox, QFileDialog
+from PySide6.QtGui import QIcon, QPalette, QColor, QPixmap, QCursor, QBrush, QLinearGradient
+from PySide6.QtCore import Qt, QSize, QRect, QTimer, QCoreApplication
 
-from components.BodyArea import ComponentBodyArea
 from components.CustomTitleBar import ComponentCustomTitleBar
 from components.FilesBar import ComponentFilesBar
 from components.MenuBar import ComponentMenuBar
 from components.NavSideBar import ComponentNavSideBar
+from utils import Tracing
+
+#*(window width above which it applies, nav side bar width), widest first
+NAV_BREAKPOINTS = ((1500, 350), (1200, 300), (0, 250))
+
+def navWidthFor(width):
+    for breakpoint, navWidth in NAV_BREAKPOINTS:
+        if width > breakpoint:
+            return navWidth
+    return NAV_BREAKPOINTS[-1][1]
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -23,6 +39,10 @@ class MainWindow(QMainWindow):
         
         # self.setStyleSheet("background-color: rgba(0, 0, 0, 255)")
 
+        self.startupTimes = {}
+        self.painted = False
+        self.stallDetector = None
+        self.navWidth = None
         self.buildUI()
         
         self.setMouseTracking(True)
@@ -57,34 +77,95 @@ class MainWindow(QMainWindow):
         contentLayout.setContentsMargins(0, 0, 0, 0)
         contentLayout.setSpacing(0)
 
-        #*Body area
-        self.bodyWidget = ComponentBodyArea(self)
+        #*Body area, built in finishStartup once the chrome has been painted
+        self.bodyWidget = QWidget(self)
         
         #*Nav side bar
         self.navWidget = ComponentNavSideBar(self)
 
         contentLayout.addWidget(self.navWidget, 1)
         contentLayout.addWidget(self.bodyWidget, 3)
+        self.contentLayout = contentLayout
 
         mainLayout.addLayout(contentLayout)
+        self.markStartup("chrome")
 
-    def resizeEvent(self, event):
-        size = event.size()
-        width = self.width()
-        height = self.height()
-
-        if width > 1500:
-            self.navWidget.setFixedWidth(350)
-            self.bodyWidget.setFixedWidth(width - 350)
-        elif width > 1200:
-            self.navWidget.setFixedWidth(300)
-            self.bodyWidget.setFixedWidth(width - 300)
-        else:
-            self.navWidget.setFixedWidth(250)
-            self.bodyWidget.setFixedWidth(width - 250)
+    def markStartup(self, stage):
+        self.startupTimes[stage] = (time.perf_counter() - STARTUP_TIME) * 1000
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.markStartup("firstFrame")
+            QTimer.singleShot(0, self.finishStartup)
+
+    def finishStartup(self):
+        #*BlurWindow handles the platform differences itself, only its import is kept off the first frame
+        from BlurWindow.blurWindow import blur
+        blur(self.winId())
+
+        from components.BodyArea import ComponentBodyArea
+        placeholder = self.bodyWidget
+        self.bodyWidget = ComponentBodyArea(self)
+        self.contentLayout.replaceWidget(placeholder, self.bodyWidget)
+        placeholder.deleteLater()
+        self.navWidget.attachBodyArea(self.bodyWidget)
+        self.filesBar.attachBodyArea(self.bodyWidget)
+        self.menuBar.attachBodyArea(self.bodyWidget)
+        self.updateContentWidths()
+        self.markStartup("ready")
+        if Tracing.isEnabled():
+            self.startStallDetector()
+
+        QTimer.singleShot(0, self.offerRecovery)
+
+    def startStallDetector(self):
+        if self.stallDetector is not None:
+            return
+        self.stallDetector = Tracing.StallDetector()
+        self.heartbeatTimer = QTimer(self)
+        self.heartbeatTimer.setInterval(Tracing.HEARTBEAT_MS)
+        self.heartbeatTimer.timeout.connect(self.stallDetector.beat)
+        self.heartbeatTimer.start()
+        self.stallDetector.start()
+
+    def toggleTracing(self):
+        #*First use starts recording, later uses export what the ring buffer holds
+        if not Tracing.isEnabled():
+            Tracing.enable()
+            self.startStallDetector()
+            return
+        fileName, _ = QFileDialog.getSaveFileName(self, "Export trace", "notepad-trace.json", "Chrome trace (*.json)")
+        if fileName:
+            try:
+                Tracing.exportChromeTrace(fileName)
+            except Exception as e:
+                print(f"Error exporting trace: {e}")
+                QMessageBox.warning(self, "Error", f"An error occurred while trying to export the trace to {fileName}")
+
+    def offerRecovery(self):
+        from utils.Autosave import findRecoveryJournals
+        for journal in findRecoveryJournals():
+            sFileName = (journal["path"] or "untitled").split("/")[-1]
+            answer = QMessageBox.question(self, "Restore unsaved changes", f"Notepad was closed with unsaved changes in {sFileName}. Restore them?")
+            if answer == QMessageBox.Yes:
+                #*Every restored journal gets its own tab
+                self.bodyWidget.restoreJournal(journal)
+            else:
+                os.remove(journal["journal"])
+
+    def resizeEvent(self, event):
+        self.updateContentWidths()
         super().resizeEvent(event)
 
+    def updateContentWidths(self):
+        #*Constraints only change when the width crosses a breakpoint, the layout gives the body whatever is left
+        navWidth = navWidthFor(self.width())
+        if navWidth != self.navWidth:
+            self.navWidth = navWidth
+            self.navWidget.setFixedWidth(navWidth)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             if self.resizeDir:
@@ -100,10 +181,16 @@ class MainWindow(QMainWindow):
         self.moving = False
         self.setCursor(Qt.ArrowCursor)
 
+def createApplication():
+    #*QtWebEngine is imported lazily, so the shared GL context and the ntpblob: scheme have to be set up front.
+    #*Registering the scheme loads QtWebEngineCore before the first paint, benchmarks/startup.py reports that cost
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    from utils.BlobScheme import registerBlobScheme
+    registerBlobScheme()
+    return QApplication(sys.argv)
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    app = createApplication()
     window = MainWindow()
-    hWnd = window.winId()
-    blur(hWnd)
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,31 @@
+import builtins
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class OpenCounter:
+    #*Counts every file opened while the test runs
+    def __init__(self, monkeypatch):
+        self.count = 0
+        builtinOpen = builtins.open
+        osOpen = os.open
+
+        def countedOpen(*args, **kwargs):
+            self.count += 1
+            return builtinOpen(*args, **kwargs)
+
+        def countedOsOpen(*args, **kwargs):
+            self.count += 1
+            return osOpen(*args, **kwargs)
+
+        monkeypatch.setattr(builtins, "open", countedOpen)
+        monkeypatch.setattr(os, "open", countedOsOpen)
+
+
+@pytest.fixture
+def openCounter(monkeypatch):
+    return OpenCounter(monkeypatch)
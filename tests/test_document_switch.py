@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from utils.HtmlBlocks import splitBlocks
+
+
+@pytest.fixture(scope="module")
+def application():
+    pytest.importorskip("PySide6.QtWebEngineWidgets")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import Qt, QCoreApplication
+    from PySide6.QtWidgets import QApplication
+
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def bodyArea(application, tmp_path, monkeypatch):
+    #*configs/ and the recovery journals are relative paths, they land in the temporary directory
+    monkeypatch.chdir(tmp_path)
+    from components.BodyArea import ComponentBodyArea
+
+    bodyArea = ComponentBodyArea()
+    yield bodyArea
+    bodyArea.shutdownAutosave()
+    bodyArea.saveEngine.shutdown()
+    bodyArea.fileWatcher.shutdown()
+    bodyArea.preloader.shutdown()
+    bodyArea.searchIndexer.shutdown()
+    bodyArea.memoryMonitor.shutdown()
+
+
+def test_swap_reuses_the_view_and_the_model(bodyArea, monkeypatch):
+    bodyArea.setDocument(["<p>first</p>"], rich=True)
+    view = bodyArea.editor
+    document = bodyArea.document
+    widgets = bodyArea.layout.count()
+    version = document.version
+    document.takeChanges()
+    sent = []
+    monkeypatch.setattr(view, "setBlocks", sent.append)
+
+    bodyArea.updateHtml("<html><head><title>note</title></head><body><p>one</p><p>two</p></body></html>")
+
+    assert bodyArea.editor is view
+    assert bodyArea.document is document
+    assert bodyArea.layout.count() == widgets
+    assert bodyArea.layout.currentWidget() is view
+    assert document.version == version + 1
+    #*The page gets one reset with the new blocks, there is no navigation
+    assert document.takeChanges() == [{"op": "reset", "blocks": ["<p>one</p>", "<p>two</p>"]}]
+    assert sent == [["<p>one</p>", "<p>two</p>"]]
+
+
+def test_incoming_html_drops_head():
+    html = '<html><head><title>note</title><style>p { color: red; }</style></head><body><p>one</p><p>two</p></body></html>'
+
+    assert splitBlocks(html) == ["<p>one</p>", "<p>two</p>"]
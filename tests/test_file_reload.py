@@ -0,0 +1,37 @@
+from utils.BlockDiff import diffReloadedBlocks
+from utils.DocumentBlocks import DocumentBlocks
+from utils.PreloadCache import readBlocks
+
+
+def writeText(path, text):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write(text)
+    return str(path)
+
+
+def reload(document, path, rich):
+    blocks = readBlocks(path)
+    for op in reversed(diffReloadedBlocks(document.blocks, blocks, rich)):
+        document.splice(op["start"], op["deleteCount"], op["blocks"])
+    return blocks
+
+
+def test_plain_reload_keeps_text_as_is(tmp_path):
+    path = writeText(tmp_path / "note.txt", "first\n    indented  twice\nlast\n")
+    document = DocumentBlocks(readBlocks(path))
+    writeText(path, "first\n    indented  twice\nlast changed <b>not markup</b> &amp;\n\n")
+
+    blocks = reload(document, path, rich=False)
+
+    assert list(document.blocks) == blocks
+    assert "".join(document.blocks) == "first\n    indented  twice\nlast changed <b>not markup</b> &amp;\n\n"
+
+
+def test_plain_reload_only_splices_changed_lines(tmp_path):
+    lines = [f"line {i}\n" for i in range(100)]
+    path = writeText(tmp_path / "note.txt", "".join(lines))
+    document = DocumentBlocks(readBlocks(path))
+    lines[50] = "line  <50>\n"
+    writeText(path, "".join(lines))
+
+    assert diffReloadedBlocks(document.blocks, readBlocks(path), rich=False) == [{"start": 50, "deleteCount": 1, "blocks": ["line  <50>\n"]}]
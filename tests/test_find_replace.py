@@ -0,0 +1,33 @@
+from utils.DocumentBlocks import DocumentBlocks
+from utils.FindReplace import FindSession
+
+
+def editedDocument(blocks):
+    document = DocumentBlocks()
+    document.splice(0, 0, blocks)
+    return document
+
+
+def replaceAll(session, document, pattern, replacement):
+    session.updateIndex(document.blocks, document.version, True)
+    session.find(pattern)
+    return session.replaceAll(replacement)
+
+
+def test_switching_documents_at_the_same_version_rebuilds_the_index():
+    first = editedDocument(["<p>alpha beta</p>", "<p>beta</p>"])
+    second = editedDocument(["<p>gamma beta</p>", "<p>delta beta</p>"])
+    assert first.version == second.version
+    session = FindSession()
+
+    assert replaceAll(session, first, "beta", "X") == ([{"start": 0, "deleteCount": 2, "blocks": ["<p>alpha X</p>", "<p>X</p>"]}], 2)
+    assert replaceAll(session, second, "beta", "X") == ([{"start": 0, "deleteCount": 2, "blocks": ["<p>gamma X</p>", "<p>delta X</p>"]}], 2)
+    assert session.index.blocks is second.blocks
+
+
+def test_same_snapshot_keeps_the_index():
+    document = editedDocument(["<p>alpha beta</p>"])
+    session = FindSession()
+    index = session.updateIndex(document.blocks, document.version, True)
+
+    assert session.updateIndex(document.blocks, document.version, True) is index
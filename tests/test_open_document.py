@@ -0,0 +1,48 @@
+import pytest
+
+from utils.Autosave import AutosaveWriter
+from utils.OpenDocument import OpenDocument
+
+PARAGRAPH = "<p>" + "lorem ipsum dolor sit amet " * 3 + "</p>"
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = AutosaveWriter(str(tmp_path / "recovery"))
+    yield writer
+    writer.shutdown()
+
+
+def test_switch_parks_and_restores_without_file_io(writer, openCounter):
+    blocks = ["<p>document 1</p>"] + [PARAGRAPH] * 2000
+    openDocument = OpenDocument(blocks, "/tmp/tab1.ntp", True, writer)
+    openDocument.document.splice(1, 1, ["<p>edited</p>"])
+    version = openDocument.version
+
+    openDocument.park()
+    assert openDocument.isParked
+    assert openDocument.version == version
+    document = openDocument.restore()
+
+    assert list(document.blocks) == ["<p>document 1</p>", "<p>edited</p>"] + [PARAGRAPH] * 1999
+    assert document.version == version
+    assert openCounter.count == 0
+
+
+def test_parked_tab_frees_its_replica(writer):
+    openDocument = OpenDocument([PARAGRAPH] * 100, "/tmp/tab1.ntp", True, writer)
+    openDocument.tick()
+    writer.flush()
+    assert openDocument.journal.journalId in writer.replicas
+
+    openDocument.park()
+    writer.flush()
+    assert openDocument.journal.journalId not in writer.replicas
+    assert openDocument.journal.document is None
+
+    #*Restoring sends a reset, so the replica comes back with the whole document
+    openDocument.restore()
+    openDocument.document.splice(0, 0, ["<p>new</p>"])
+    openDocument.tick()
+    writer.flush()
+    assert list(writer.replicas[openDocument.journal.journalId]["document"].blocks) == ["<p>new</p>"] + [PARAGRAPH] * 100
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from utils.HtmlBlocks import splitBlocks
+from utils.NtpFormat import encodeNtp
+from utils.PreloadCache import MMAP_THRESHOLD, PreloadCache, fileKey, readBlocks
+
+PARAGRAPH = '<p><span style="font-size: 12pt">Meeting notes {0}: agreed to ship the release on friday, {0} items left.</span></p>\n'
+
+
+def buildHtml(size):
+    parts = []
+    total = 0
+    while total < size:
+        parts.append(PARAGRAPH.format(len(parts)))
+        total += len(parts[-1])
+    return "".join(parts)
+
+
+def writeNote(path, data):
+    with open(path, "wb") as file:
+        file.write(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("size", [100 * 1024, 2 * MMAP_THRESHOLD])
+@pytest.mark.parametrize("container", [False, True])
+def test_warm_open_reads_nothing(tmp_path, openCounter, size, container):
+    html = buildHtml(size)
+    data = encodeNtp(splitBlocks(html)) if container else html.encode("utf-8")
+    path = writeNote(tmp_path / "note.ntp", data)
+    cache = PreloadCache()
+    blocks = readBlocks(path)
+    assert cache.prefetch(path)
+
+    opened = openCounter.count
+    assert cache.get(path) == blocks
+    assert openCounter.count == opened
+    assert cache.stats()["hits"] == 1
+
+
+def test_changed_mtime_misses(tmp_path):
+    path = writeNote(tmp_path / "note.ntp", b"<p>old</p>")
+    cache = PreloadCache()
+    cache.prefetch(path)
+    mtime = fileKey(path)[0] + 1_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+    assert cache.get(path) is None
+    assert len(cache) == 0
+
+
+def test_replaced_file_misses(tmp_path):
+    path = writeNote(tmp_path / "note.ntp", b"<p>old</p>")
+    cache = PreloadCache()
+    cache.prefetch(path)
+    os.replace(writeNote(tmp_path / "note.ntp.new", b"<p>replaced</p>"), path)
+
+    assert cache.get(path) is None
+    assert cache.prefetch(path)
+    assert cache.get(path) == ["<p>replaced</p>"]
+
+
+def test_oldest_entries_are_evicted_first(tmp_path):
+    html = buildHtml(10 * 1024).encode("utf-8")
+    paths = [writeNote(tmp_path / f"{name}.ntp", html) for name in "abc"]
+    cache = PreloadCache()
+    assert cache.prefetch(paths[0])
+    cache.maxBytes = cache.bytes * 2 + cache.bytes // 2
+    assert cache.prefetch(paths[1])
+    assert cache.get(paths[0]) is not None
+    assert cache.prefetch(paths[2])
+
+    assert list(cache.entries) == [paths[0], paths[2]]
+    assert all(cache.entries[path][0] == fileKey(path) for path in cache.entries)
+    assert cache.bytes <= cache.maxBytes
+
+
+def test_rewritten_file_misses(tmp_path):
+    path = writeNote(tmp_path / "note.ntp", b"<p>old</p>")
+    cache = PreloadCache()
+    cache.prefetch(path)
+    key = fileKey(path)
+    writeNote(path, b"<p>rewritten</p>")
+    mtime = key[0] + 1_000_000
+    os.utime(path, ns=(mtime, mtime))
+    assert fileKey(path)[:2] != key[:2]
+
+    assert cache.get(path) is None
+    assert cache.prefetch(path)
+    assert cache.get(path) == ["<p>rewritten</p>"]
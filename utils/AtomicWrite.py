@@ -0,0 +1,37 @@
+import os
+import stat
+import tempfile
+
+def writeAtomic(path, content, durable=True):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tempPath = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        binary = isinstance(content, bytes)
+        with os.fdopen(fd, "wb" if binary else "w", encoding=None if binary else "utf-8") as file:
+            if isinstance(content, (str, bytes)):
+                file.write(content)
+            else:
+                file.writelines(content)
+            file.flush()
+            if durable:
+                os.fsync(file.fileno())
+
+        if os.path.exists(path):
+            os.chmod(tempPath, stat.S_IMODE(os.stat(path).st_mode))
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tempPath, 0o666 & ~umask)
+        os.replace(tempPath, path)
+    except BaseException:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
+
+    #*Make the rename itself durable, directories cannot be opened on Windows
+    if durable and hasattr(os, "O_DIRECTORY"):
+        dirFd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dirFd)
+        finally:
+            os.close(dirFd)
@@ -0,0 +1,168 @@
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+from utils.AtomicWrite import writeAtomic
+from utils.DocumentBlocks import DocumentBlocks
+
+RECOVERY_DIR = "configs/recovery"
+AUTOSAVE_INTERVAL_MS = 5000
+MAX_JOURNAL_BYTES = 8 * 1024 * 1024
+
+class AutosaveWriter(threading.Thread):
+    def __init__(self, directory=RECOVERY_DIR, maxJournalBytes=MAX_JOURNAL_BYTES):
+        super().__init__(name="AutosaveWriter", daemon=True)
+        self.directory = directory
+        self.maxJournalBytes = maxJournalBytes
+        self.queue = queue.Queue()
+        self.replicas = {}
+        self.start()
+
+    def submit(self, journalId, filePath, changes, persist=True):
+        self.queue.put(("append" if persist else "mirror", journalId, filePath, changes))
+
+    def discard(self, journalId):
+        self.queue.put(("discard", journalId, None, None))
+
+    def forget(self, journalId):
+        self.queue.put(("forget", journalId, None, None))
+
+    def flush(self):
+        self.queue.join()
+
+    def shutdown(self):
+        self.queue.put(None)
+        self.join()
+
+    def journalPath(self, journalId):
+        return os.path.join(self.directory, f"{journalId}.journal")
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                action, journalId, filePath, changes = item
+                if action == "append":
+                    self.append(journalId, filePath, changes)
+                elif action == "mirror":
+                    self.mirror(journalId, changes)
+                elif action == "forget":
+                    self.replicas.pop(journalId, None)
+                else:
+                    self.remove(journalId)
+            except Exception as e:
+                print(f"Error writing recovery journal: {e}")
+            finally:
+                self.queue.task_done()
+
+    def mirror(self, journalId, changes):
+        replica = self.replicas.setdefault(journalId, {"document": DocumentBlocks(), "written": False, "path": None, "snapshotBytes": 0})
+        for change in changes:
+            replica["document"].applyChange(change)
+        return replica
+
+    def append(self, journalId, filePath, changes):
+        replica = self.mirror(journalId, changes)
+        path = self.journalPath(journalId)
+        if not replica["written"] or replica["path"] != filePath:
+            self.compact(journalId, filePath)
+            return
+
+        with open(path, "a", encoding="utf-8") as file:
+            for change in changes:
+                file.write(json.dumps(change) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+        #*A snapshot can be larger than the limit, so compaction only triggers once the log outgrows it
+        if os.path.getsize(path) > max(self.maxJournalBytes, 2 * replica["snapshotBytes"]):
+            self.compact(journalId, filePath)
+
+    def compact(self, journalId, filePath):
+        replica = self.replicas[journalId]
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = json.dumps({"op": "snapshot", "path": filePath, "time": time.time(), "blocks": list(replica["document"].blocks)}) + "\n"
+        writeAtomic(self.journalPath(journalId), snapshot)
+        replica["snapshotBytes"] = len(snapshot)
+        replica["written"] = True
+        replica["path"] = filePath
+
+    def remove(self, journalId):
+        replica = self.replicas.get(journalId)
+        if replica:
+            replica["written"] = False
+        path = self.journalPath(journalId)
+        if os.path.exists(path):
+            os.remove(path)
+
+class DocumentJournal:
+    def __init__(self, document, writer):
+        self.document = document
+        self.writer = writer
+        self.journalId = uuid.uuid4().hex
+        self.dirty = False
+        document.trackChanges()
+
+    def markDirty(self):
+        self.dirty = True
+
+    def tick(self, filePath):
+        if self.document is None:
+            return
+        changes = self.document.takeChanges()
+        if changes:
+            #*Loaded content is already on disk, the writer only mirrors it until the user edits
+            self.writer.submit(self.journalId, filePath, changes, persist=self.dirty)
+
+    def markSaved(self, filePath):
+        self.tick(filePath)
+        self.dirty = False
+        self.writer.discard(self.journalId)
+
+    def detach(self, filePath):
+        #*A parked tab keeps no blocks here or in the writer, attach sends a reset that rebuilds the replica
+        self.tick(filePath)
+        self.document = None
+        self.writer.forget(self.journalId)
+
+    def attach(self, document):
+        self.document = document
+        document.trackChanges()
+
+    def close(self):
+        self.writer.discard(self.journalId)
+        self.writer.forget(self.journalId)
+
+def readJournal(path):
+    document = DocumentBlocks()
+    filePath = None
+    savedAt = os.path.getmtime(path)
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                change = json.loads(line)
+            except ValueError:
+                #*A crash can leave a half written last line
+                break
+            if change["op"] == "snapshot":
+                filePath = change.get("path")
+                document.reset(change["blocks"])
+            else:
+                document.applyChange(change)
+    return {"journal": path, "path": filePath, "time": savedAt, "blocks": list(document.blocks)}
+
+def findRecoveryJournals(directory=RECOVERY_DIR):
+    journals = []
+    for path in glob.glob(os.path.join(directory, "*.journal")):
+        try:
+            journals.append(readJournal(path))
+        except Exception as e:
+            print(f"Error reading recovery journal {path}: {e}")
+    journals.sort(key=lambda journal: journal["time"], reverse=True)
+    return journals
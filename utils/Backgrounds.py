@@ -0,0 +1,125 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QEvent, QRectF, QTimer, Qt
+from PySide6.QtGui import QColor, QImage, QLinearGradient, QPainter, QPixmap
+from PySide6.QtWidgets import QGraphicsBlurEffect, QGraphicsPixmapItem, QGraphicsScene
+
+from utils.Tracing import span
+
+BACKGROUND_CACHE_ENTRIES = 32
+RERENDER_DELAY_MS = 120
+
+pixmaps = OrderedDict()
+
+def verticalLine(width, height):
+    return (0, 0, 0, height)
+
+def blurImage(image, radius):
+    #*QGraphicsBlurEffect only runs inside a scene, so it is rendered once into an image instead of on every repaint
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(image))
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(radius)
+    effect.setBlurHints(QGraphicsBlurEffect.QualityHint)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+
+    blurred = QImage(image.size(), QImage.Format_ARGB32_Premultiplied)
+    blurred.fill(Qt.transparent)
+    painter = QPainter(blurred)
+    bounds = QRectF(0, 0, image.width(), image.height())
+    scene.render(painter, bounds, bounds)
+    painter.end()
+    return blurred
+
+def renderBackground(width, height, dpr, stops, blurRadius, gradientLine):
+    with span("renderBackground", "paint", width=width, height=height):
+        image = QImage(max(1, round(width * dpr)), max(1, round(height * dpr)), QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        x1, y1, x2, y2 = gradientLine(width, height)
+        gradient = QLinearGradient(x1 * dpr, y1 * dpr, x2 * dpr, y2 * dpr)
+        for position, color in stops:
+            gradient.setColorAt(position, QColor(*color))
+        painter = QPainter(image)
+        painter.fillRect(image.rect(), gradient)
+        painter.end()
+        if blurRadius:
+            image = blurImage(image, blurRadius * dpr)
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        return pixmap
+
+def cachedBackground(key, build):
+    pixmap = pixmaps.get(key)
+    if pixmap is None:
+        pixmap = pixmaps[key] = build()
+        while len(pixmaps) > BACKGROUND_CACHE_ENTRIES:
+            pixmaps.popitem(last=False)
+    else:
+        pixmaps.move_to_end(key)
+    return pixmap
+
+def clearBackgrounds():
+    pixmaps.clear()
+
+class BackgroundPainter(QObject):
+    #*Paints a pre-rendered gradient/blur under a widget from its paint events, children are drawn on top unblurred
+    def __init__(self, widget, name, stops, blurRadius=0, gradientLine=verticalLine):
+        super().__init__(widget)
+        self.widget = widget
+        self.name = name
+        self.stops = tuple((position, tuple(color)) for position, color in stops)
+        self.blurRadius = blurRadius
+        self.gradientLine = gradientLine
+        self.pixmap = None
+        self.pixmapKey = None
+
+        self.rerenderTimer = QTimer(self)
+        self.rerenderTimer.setSingleShot(True)
+        self.rerenderTimer.setInterval(RERENDER_DELAY_MS)
+        self.rerenderTimer.timeout.connect(self.rerender)
+
+        widget.setAutoFillBackground(False)
+        widget.installEventFilter(self)
+        widget.update()
+
+    def key(self):
+        return (self.name, self.widget.width(), self.widget.height(), self.widget.devicePixelRatioF(), self.stops, self.blurRadius)
+
+    def render(self):
+        key = self.key()
+        self.pixmap = cachedBackground(key, lambda: renderBackground(key[1], key[2], key[3], self.stops, self.blurRadius, self.gradientLine))
+        self.pixmapKey = key
+
+    def rerender(self):
+        self.render()
+        self.widget.update()
+
+    def setStops(self, stops):
+        #*A theme change gives new colors and with them a new cache key
+        self.stops = tuple((position, tuple(color)) for position, color in stops)
+        self.invalidate()
+
+    def invalidate(self):
+        self.pixmap = None
+        self.pixmapKey = None
+        self.widget.update()
+
+    def eventFilter(self, watched, event):
+        if watched is self.widget:
+            eventType = event.type()
+            if eventType == QEvent.Paint:
+                self.paint()
+            elif eventType == QEvent.Resize and self.pixmap is not None:
+                #*While the window is being resized the last pixmap is stretched, the exact size is rendered once it settles
+                self.rerenderTimer.start()
+        return False
+
+    def paint(self):
+        if self.pixmap is None:
+            self.render()
+        elif self.pixmapKey != self.key() and not self.rerenderTimer.isActive():
+            self.render()
+        painter = QPainter(self.widget)
+        painter.drawPixmap(self.widget.rect(), self.pixmap)
+        painter.end()
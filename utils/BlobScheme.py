@@ -0,0 +1,11 @@
+from PySide6.QtWebEngineCore import QWebEngineUrlScheme
+
+from utils.BlobStore import BLOB_SCHEME
+
+def registerBlobScheme():
+    #*Custom schemes are only accepted before QApplication exists, main.py calls this on the GUI path.
+    #*Only the scheme class is needed here, the handler lives in BlobSchemeHandler and loads with the first editor
+    scheme = QWebEngineUrlScheme(BLOB_SCHEME.encode())
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Path)
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme)
+    QWebEngineUrlScheme.registerScheme(scheme)
@@ -0,0 +1,34 @@
+from PySide6.QtCore import QBuffer, QIODevice
+from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEngineUrlRequestJob, QWebEngineUrlSchemeHandler
+
+from utils.BlobStore import BLOB_SCHEME, blobMime, findBlob
+from utils.Tracing import span
+
+handler = None
+
+class BlobSchemeHandler(QWebEngineUrlSchemeHandler):
+    def requestStarted(self, job):
+        name = job.requestUrl().path()
+        path = findBlob(name)
+        if path is None:
+            job.fail(QWebEngineUrlRequestJob.UrlNotFound)
+            return
+        try:
+            with span("BlobSchemeHandler.read", "io", name=name):
+                with open(path, "rb") as file:
+                    data = file.read()
+        except OSError as e:
+            print(f"Error reading image {name}: {e}")
+            job.fail(QWebEngineUrlRequestJob.RequestFailed)
+            return
+        #*The buffer is owned by the job and freed with it
+        buffer = QBuffer(job)
+        buffer.setData(data)
+        buffer.open(QIODevice.ReadOnly)
+        job.reply(blobMime(name).encode(), buffer)
+
+def installBlobScheme():
+    global handler
+    if handler is None:
+        handler = BlobSchemeHandler()
+        QWebEngineProfile.defaultProfile().installUrlSchemeHandler(BLOB_SCHEME.encode(), handler)
@@ -0,0 +1,144 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+
+from utils.AtomicWrite import writeAtomic
+
+BLOB_SCHEME = "ntpblob"
+BLOB_DIRECTORY = ".ntp-blobs"
+MIME_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/bmp": ".bmp",
+    "image/svg+xml": ".svg",
+    "image/avif": ".avif",
+}
+EXTENSION_MIMES = {extension: mime for mime, extension in MIME_EXTENSIONS.items()}
+IMG_TAG = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+DATA_SRC = re.compile(r"""\bsrc=(["'])data:(image/[\w.+-]+);base64,([^"']*)\1""", re.IGNORECASE)
+BLOB_SRC = re.compile(r"""\bsrc=(["'])%s:([0-9a-f]{64}\.[a-z0-9]+)\1""" % BLOB_SCHEME)
+BLOB_NAME = re.compile(r"[0-9a-f]{64}\.[a-z0-9]+")
+
+#*Blob directories of the open notes, a content address resolves the same in any of them
+directories = {}
+
+def blobDirectory(notePath):
+    #*One store per folder, notes next to each other share the images they have in common
+    return os.path.join(os.path.dirname(os.path.abspath(notePath)), BLOB_DIRECTORY)
+
+def blobMime(name):
+    return EXTENSION_MIMES.get(os.path.splitext(name)[1], "application/octet-stream")
+
+def registerDirectory(directory):
+    directories[directory] = True
+
+def findBlob(name):
+    if not BLOB_NAME.fullmatch(name):
+        return None
+    for directory in reversed(list(directories)):
+        path = os.path.join(directory, name[:2], name)
+        if os.path.exists(path):
+            return path
+    return None
+
+class BlobStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self.written = 0
+
+    def pathFor(self, name):
+        return os.path.join(self.directory, name[:2], name)
+
+    def put(self, data, mime):
+        name = hashlib.sha256(data).hexdigest() + MIME_EXTENSIONS[mime]
+        path = self.pathFor(name)
+        #*Same bytes, same name: an image pasted twice or saved again is not written again
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            writeAtomic(path, data)
+            self.written += 1
+        return name
+
+    def get(self, name):
+        if not BLOB_NAME.fullmatch(name):
+            return None
+        try:
+            with open(self.pathFor(name), "rb") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def adopt(self, name):
+        #*A note saved into another folder takes the images it references along into that folder's store
+        path = self.pathFor(name)
+        if os.path.exists(path):
+            return
+        source = findBlob(name)
+        if source is not None:
+            with open(source, "rb") as file:
+                data = file.read()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            writeAtomic(path, data)
+            self.written += 1
+
+    def extractTag(self, tag):
+        match = DATA_SRC.search(tag)
+        if match is None:
+            reference = BLOB_SRC.search(tag)
+            if reference is not None:
+                self.adopt(reference.group(2))
+            return tag
+        mime = match.group(2).lower()
+        if mime not in MIME_EXTENSIONS:
+            return tag
+        try:
+            data = base64.b64decode(match.group(3))
+        except (binascii.Error, ValueError):
+            return tag
+        name = self.put(data, mime)
+        tag = f'{tag[:match.start()]}src="{BLOB_SCHEME}:{name}"{tag[match.end():]}'
+        if "loading=" not in tag.lower():
+            #*The web view only fetches and decodes the image once it scrolls near the viewport
+            tag = '<img loading="lazy"' + tag[4:]
+        return tag
+
+    def extractHtml(self, html):
+        if "data:" not in html and f"{BLOB_SCHEME}:" not in html:
+            return html
+        return IMG_TAG.sub(lambda match: self.extractTag(match.group(0)), html)
+
+    def inlineTag(self, tag):
+        match = BLOB_SRC.search(tag)
+        if match is None:
+            return tag
+        data = self.get(match.group(2))
+        if data is None:
+            return tag
+        uri = f"data:{blobMime(match.group(2))};base64,{base64.b64encode(data).decode('ascii')}"
+        return f'{tag[:match.start()]}src="{uri}"{tag[match.end():]}'
+
+    def inlineHtml(self, html):
+        if f"{BLOB_SCHEME}:" not in html:
+            return html
+        return IMG_TAG.sub(lambda match: self.inlineTag(match.group(0)), html)
+
+def extractBlobs(source, store, changes=None):
+    #*Blocks come back in order, changes collects (index, old block, new block) for the ones that lost an inline image
+    if isinstance(source, str):
+        return store.extractHtml(source)
+    return extractBlocks(source, store, changes)
+
+def extractBlocks(blocks, store, changes):
+    for index, block in enumerate(blocks):
+        extracted = store.extractHtml(block)
+        if changes is not None and extracted != block:
+            changes.append((index, block, extracted))
+        yield extracted
+
+def inlineBlobs(blocks, store):
+    for block in blocks:
+        yield store.inlineHtml(block)
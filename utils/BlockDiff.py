@@ -0,0 +1,74 @@
+from difflib import SequenceMatcher
+
+from utils.HtmlNormalizer import normalizeBlock
+
+def diffBlocks(oldBlocks, newBlocks):
+    #*Splice ops in the indices of oldBlocks, applied last to first like replace all ops
+    old = list(oldBlocks)
+    new = list(newBlocks)
+    head = 0
+    limit = min(len(old), len(new))
+    while head < limit and old[head] == new[head]:
+        head += 1
+    tail = 0
+    limit -= head
+    while tail < limit and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+
+    oldMiddle = old[head:len(old) - tail]
+    newMiddle = new[head:len(new) - tail]
+    if not oldMiddle or not newMiddle:
+        if not oldMiddle and not newMiddle:
+            return []
+        return [{"start": head, "deleteCount": len(oldMiddle), "blocks": newMiddle}]
+
+    #*An edit somewhere in the file leaves the common ends alone, SequenceMatcher only sees the part in between
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, oldMiddle, newMiddle).get_opcodes():
+        if tag != "equal":
+            ops.append({"start": head + i1, "deleteCount": i2 - i1, "blocks": newMiddle[j1:j2]})
+    return ops
+
+def diffNormalizedBlocks(oldBlocks, newBlocks, newNormalized=False):
+    #*The editor holds Chromium's serialization and the file normalized blocks, so both sides are compared
+    #*normalized and each op is widened to whole editor blocks, one of which can normalize into several
+    old = []
+    owners = []
+    starts = []
+    for index, block in enumerate(oldBlocks):
+        starts.append(len(old))
+        parts = normalizeBlock(block)
+        old.extend(parts)
+        owners.extend([index] * len(parts))
+    starts.append(len(old))
+    new = list(newBlocks) if newNormalized else [part for block in newBlocks for part in normalizeBlock(block)]
+
+    ops = []
+    shift = 0
+    for op in diffBlocks(old, new):
+        i1 = op["start"]
+        i2 = i1 + op["deleteCount"]
+        j1 = i1 + shift
+        j2 = j1 + len(op["blocks"])
+        shift += len(op["blocks"]) - op["deleteCount"]
+
+        first = owners[i1] if i1 < len(old) else len(starts) - 1
+        if i2 > i1:
+            last = owners[i2 - 1] + 1
+        else:
+            last = first if i1 == starts[first] else first + 1
+        newStart = j1 - (i1 - starts[first])
+        newEnd = j2 + (starts[last] - i2)
+        if ops and first < ops[-1]["end"]:
+            merged = ops[-1]
+            merged["end"] = max(merged["end"], last)
+            merged["newEnd"] = newEnd
+            continue
+        ops.append({"first": first, "end": last, "newStart": newStart, "newEnd": newEnd})
+    return [{"start": op["first"], "deleteCount": op["end"] - op["first"], "blocks": new[op["newStart"]:op["newEnd"]]} for op in ops]
+
+def diffReloadedBlocks(oldBlocks, newBlocks, rich, newNormalized=False):
+    #*Plain text lines are compared as they are, normalizing would treat them as html and collapse their whitespace
+    if not rich:
+        return diffBlocks(oldBlocks, newBlocks)
+    return diffNormalizedBlocks(oldBlocks, newBlocks, newNormalized)
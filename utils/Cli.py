@@ -0,0 +1,164 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.AtomicWrite import writeAtomic
+from utils.BlobStore import BlobStore, blobDirectory, extractBlobs, inlineBlobs, registerDirectory
+from utils.Exporters import EXPORT_EXTENSIONS, blockText, exportBlocks, exportTitle, iterBlocks
+from utils.NtpFormat import MAGIC, NtpReader, encodeNtp
+
+COMMANDS = ("convert", "export", "stat")
+NOTE_EXTENSIONS = (".ntp",)
+TASKS_PER_WORKER = 4
+
+def findNotes(inputs, extensions=NOTE_EXTENSIONS):
+    #*Yields (path, root) so outputs can mirror the layout below each input directory
+    for item in inputs:
+        if os.path.isdir(item):
+            pending = [item]
+            while pending:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith(extensions):
+                            yield entry.path, item
+        else:
+            yield item, os.path.dirname(item)
+
+def outputPath(path, root, outputDir, extension):
+    base = os.path.splitext(path)[0] + extension
+    if outputDir is None:
+        return base
+    return os.path.join(outputDir, os.path.relpath(base, root or "."))
+
+def describeFormat(path):
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            return "html" if path.endswith(".ntp") else "text"
+    with NtpReader(path) as reader:
+        return f"ntp2/{reader.header['codec']}"
+
+def countingBlocks(blocks, counts):
+    for block in blocks:
+        counts[0] += 1
+        yield block
+
+def processFile(task):
+    #*Runs in worker processes, returns only a small summary so results don't pile up in the parent
+    command, path, target, options = task
+    result = {"path": path, "bytes_in": 0, "bytes_out": 0, "blocks": 0}
+    try:
+        result["bytes_in"] = os.path.getsize(path)
+        result["format"] = describeFormat(path)
+        if command == "stat":
+            chars = 0
+            for block in iterBlocks(path):
+                result["blocks"] += 1
+                chars += len(blockText(block))
+            result["chars"] = chars
+            return result
+
+        if target != path and os.path.dirname(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+        #*Images live in the blob store next to the note, convert fills the store of the target and exports inline them again
+        registerDirectory(blobDirectory(path))
+        if command == "convert":
+            blocks = list(extractBlobs(iterBlocks(path), BlobStore(blobDirectory(target))))
+            result["blocks"] = len(blocks)
+            writeAtomic(target, encodeNtp(blocks, options["codec"], normalized=True), durable=options["durable"])
+        else:
+            counts = [0]
+            blocks = countingBlocks(inlineBlobs(iterBlocks(path), BlobStore(blobDirectory(path))), counts)
+            writeAtomic(target, exportBlocks(blocks, options["format"], exportTitle(path)), durable=options["durable"])
+            result["blocks"] = counts[0]
+        result["output"] = target
+        result["bytes_out"] = os.path.getsize(target)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def buildTasks(args):
+    options = {"durable": not args.no_sync}
+    if args.command == "export":
+        options["format"] = args.to
+        extension = EXPORT_EXTENSIONS[args.to]
+    elif args.command == "convert":
+        options["codec"] = args.codec
+        extension = ".ntp"
+    for path, root in findNotes(args.inputs):
+        if args.command == "stat":
+            yield (args.command, path, None, options)
+        else:
+            yield (args.command, path, outputPath(path, root, args.output, extension), options)
+
+def workerContext():
+    #*Spawned workers would re-import main.py and with it Qt, forked ones start from this already Qt free process
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+def formatSize(size):
+    return f"{size / 1024:.1f} kB"
+
+def run(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    common.add_argument("--json", action="store_true", help="print one JSON object per file instead of a table")
+    common.add_argument("--no-sync", action="store_true", help="skip fsync on written files, faster for outputs that can be regenerated")
+
+    parser = argparse.ArgumentParser(prog="main.py", description="Convert, export and inspect notes without starting the editor")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", parents=[common], help="rewrite notes as normalized .ntp v2 containers")
+    convert.add_argument("inputs", nargs="+", help="files or directories")
+    convert.add_argument("--output", help="write into this directory instead of replacing the inputs")
+    convert.add_argument("--codec", choices=("zlib", "lzma", "none"), default="zlib")
+
+    export = commands.add_parser("export", parents=[common], help="export notes as plain text, Markdown or HTML")
+    export.add_argument("inputs", nargs="+", help="files or directories")
+    export.add_argument("--to", choices=tuple(EXPORT_EXTENSIONS), default="text")
+    export.add_argument("--output", help="directory for exported files, next to the inputs by default")
+
+    stat = commands.add_parser("stat", parents=[common], help="report format, size, block and character counts")
+    stat.add_argument("inputs", nargs="+", help="files or directories")
+
+    args = parser.parse_args(argv)
+    if args.command == "stat":
+        args.output = None
+
+    start = time.perf_counter()
+    totals = {"files": 0, "errors": 0, "bytes_in": 0, "bytes_out": 0, "blocks": 0}
+    tasks = list(buildTasks(args))
+    jobs = max(1, min(args.jobs or 1, len(tasks) or 1))
+    chunksize = max(1, len(tasks) // (jobs * TASKS_PER_WORKER))
+
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=workerContext()) as executor:
+        for result in executor.map(processFile, tasks, chunksize=chunksize):
+            totals["files"] += 1
+            for key in ("bytes_in", "bytes_out", "blocks"):
+                totals[key] += result[key]
+            if "error" in result:
+                totals["errors"] += 1
+                print(f"Error processing {result['path']}: {result['error']}", file=sys.stderr)
+                continue
+            if args.json:
+                print(json.dumps(result))
+            elif args.command == "stat":
+                print(f"{result['path']}  {result['format']}  {formatSize(result['bytes_in'])}  {result['blocks']} blocks  {result['chars']} chars")
+            else:
+                print(f"{result['path']} -> {result['output']}  {formatSize(result['bytes_in'])} -> {formatSize(result['bytes_out'])}")
+
+    seconds = time.perf_counter() - start
+    summary = f"{totals['files']} files, {formatSize(totals['bytes_in'])} read"
+    if args.command != "stat":
+        summary += f", {formatSize(totals['bytes_out'])} written"
+    summary += f", {totals['blocks']} blocks in {seconds:.2f} s ({totals['bytes_in'] / 1024 / 1024 / max(seconds, 1e-9):.1f} MB/s)"
+    if totals["errors"]:
+        summary += f", {totals['errors']} failed"
+    print(summary, file=sys.stderr)
+    return 1 if totals["errors"] else 0
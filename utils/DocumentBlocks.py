@@ -0,0 +1,64 @@
+import json
+
+from utils.Rope import BlockRope
+
+class DocumentBlocks:
+    #*blocks is a persistent rope, holding on to it is a snapshot that later edits do not touch
+    def __init__(self, blocks=None):
+        self.blocks = BlockRope(blocks or ())
+        self.version = 0
+        self.changes = None
+        self._html = None
+
+    def __len__(self):
+        return len(self.blocks)
+
+    @property
+    def byteSize(self):
+        return self.blocks.byteSize
+
+    def trackChanges(self):
+        self.changes = [{"op": "reset", "blocks": list(self.blocks)}]
+
+    def takeChanges(self):
+        changes = self.changes or []
+        if self.changes is not None:
+            self.changes = []
+        return changes
+
+    def reset(self, blocks):
+        self.blocks = BlockRope(blocks)
+        self.version += 1
+        self._html = None
+        if self.changes is not None:
+            self.changes = [{"op": "reset", "blocks": list(self.blocks)}]
+
+    def splice(self, start, deleteCount, blocks):
+        start = max(0, min(start, len(self.blocks)))
+        self.blocks = self.blocks.splice(start, deleteCount, blocks)
+        self.version += 1
+        self._html = None
+        if self.changes is not None:
+            self.changes.append({"op": "splice", "start": start, "deleteCount": deleteCount, "blocks": list(blocks)})
+
+    def applyChange(self, change):
+        if change["op"] == "reset":
+            self.reset(change["blocks"])
+        elif change["op"] == "splice":
+            self.splice(change["start"], change["deleteCount"], change["blocks"])
+
+    def applyPatch(self, patch):
+        if isinstance(patch, str):
+            patch = json.loads(patch)
+        if patch.get("reset"):
+            self.reset(patch.get("blocks", []))
+        for op in patch.get("ops", []):
+            self.splice(op["start"], op["deleteCount"], op["blocks"])
+
+    def serialize(self):
+        if self._html is None:
+            self._html = "".join(self.blocks)
+        return self._html
+
+    def writeTo(self, file):
+        self.blocks.writeTo(file)
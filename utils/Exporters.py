@@ -0,0 +1,182 @@
+import os
+import re
+from html import escape, unescape
+from html.parser import HTMLParser
+
+from utils.HtmlBlocks import CLOSES_PARAGRAPH, TEXTLESS_TAGS, htmlToText, textToBlocks
+from utils.HtmlNormalizer import HtmlNormalizer, streamBlocks
+from utils.NtpFormat import NtpReader, isNtpContainer
+
+READ_CHUNK_SIZE = 1024 * 1024
+MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]])")
+WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+INLINE_MARKS = {"b": "**", "strong": "**", "i": "*", "em": "*", "s": "~~", "strike": "~~", "del": "~~"}
+EXPORT_EXTENSIONS = {"text": ".txt", "markdown": ".md", "html": ".html"}
+HTML_HEADER = '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{0}</title>\n</head>\n<body>\n'
+HTML_FOOTER = "</body>\n</html>\n"
+TAG = re.compile(r"<(/?)([a-z][a-z0-9]*)[^>]*>")
+LINE_START_TAGS = CLOSES_PARAGRAPH | {"br", "li", "td", "th", "tr"}
+
+def iterBlocks(path):
+    #*Yields normalized blocks while reading, only one chunk of the file is held at a time
+    if isNtpContainer(path):
+        with NtpReader(path) as reader:
+            normalized = reader.header.get("normalized", False)
+            for chunk in reader.iterChunks():
+                yield from chunk if normalized else streamBlocks(chunk)
+        return
+
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as file:
+        if not path.endswith(".ntp"):
+            for line in file:
+                yield from textToBlocks(line.removesuffix("\n").removesuffix("\r"))
+            return
+        normalizer = HtmlNormalizer()
+        while True:
+            data = file.read(READ_CHUNK_SIZE)
+            if not data:
+                break
+            yield from normalizer.feed(data)
+        yield from normalizer.close()
+
+class MarkdownWriter(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.lists = []
+        self.links = []
+        self.quoteDepth = 0
+        self.preDepth = 0
+        self.fresh = True
+
+    def write(self, text):
+        self.parts.append(text)
+        self.fresh = False
+
+    def lineBreak(self):
+        self.parts.append("\n" + "> " * self.quoteDepth)
+
+    def blockBreak(self):
+        #*Nested blocks, e.g. a paragraph opening a blockquote, share one blank line
+        if not self.fresh:
+            self.lineBreak()
+            self.lineBreak()
+        self.fresh = True
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self.blockBreak()
+            self.write("#" * int(tag[1]) + " ")
+        elif tag in ("p", "div"):
+            if not self.lists:
+                self.blockBreak()
+        elif tag == "br":
+            if self.preDepth:
+                self.write("\n")
+            else:
+                self.write("  ")
+                self.lineBreak()
+        elif tag in INLINE_MARKS:
+            self.write(INLINE_MARKS[tag])
+        elif tag == "code" and not self.preDepth:
+            self.write("`")
+        elif tag == "pre":
+            self.blockBreak()
+            self.preDepth += 1
+            self.write("```\n")
+        elif tag in ("ul", "ol"):
+            if not self.lists:
+                self.blockBreak()
+            self.lists.append([tag, 0])
+        elif tag == "li" and self.lists:
+            kind = self.lists[-1]
+            kind[1] += 1
+            if self.parts:
+                self.lineBreak()
+            self.write("  " * (len(self.lists) - 1) + ("- " if kind[0] == "ul" else f"{kind[1]}. "))
+        elif tag == "a":
+            self.links.append(attrs.get("href") or "")
+            self.write("[")
+        elif tag == "img":
+            self.write(f"![{attrs.get('alt') or ''}]({attrs.get('src') or ''})")
+        elif tag == "hr":
+            self.blockBreak()
+            self.write("---")
+        elif tag == "blockquote":
+            self.blockBreak()
+            self.quoteDepth += 1
+            self.parts.append("> ")
+
+    def handle_endtag(self, tag):
+        if tag in INLINE_MARKS:
+            self.write(INLINE_MARKS[tag])
+        elif tag == "code" and not self.preDepth:
+            self.write("`")
+        elif tag == "pre" and self.preDepth:
+            self.preDepth -= 1
+            self.write("\n```")
+        elif tag in ("ul", "ol") and self.lists:
+            self.lists.pop()
+        elif tag == "a" and self.links:
+            self.write(f"]({self.links.pop()})")
+        elif tag == "blockquote" and self.quoteDepth:
+            self.quoteDepth -= 1
+
+    def handle_data(self, data):
+        if self.preDepth:
+            self.write(data)
+        elif data.strip():
+            self.write(MARKDOWN_SPECIAL.sub(r"\\\1", WHITESPACE.sub(" ", data)))
+        else:
+            self.parts.append(" ")
+
+    def markdown(self):
+        self.close()
+        return "".join(self.parts).strip()
+
+def blockToMarkdown(block):
+    writer = MarkdownWriter()
+    writer.feed(block)
+    return writer.markdown()
+
+def tagBreak(match):
+    tag = match.group(2)
+    return "\n" if tag in LINE_START_TAGS and (not match.group(1) or tag in CLOSES_PARAGRAPH) else ""
+
+def blockText(block):
+    #*Normalized blocks escape every > in attributes and carry no comments, so a regex finds their tags
+    if "<!--" in block or any(f"<{tag}" in block for tag in TEXTLESS_TAGS):
+        return htmlToText(block).strip("\n")
+    return unescape(TAG.sub(tagBreak, block)).strip("\n")
+
+def exportText(blocks):
+    for block in blocks:
+        yield blockText(block) + "\n"
+
+def exportMarkdown(blocks):
+    first = True
+    for block in blocks:
+        #*Empty paragraphs only exist to hold a caret, Markdown separates blocks with one blank line anyway
+        markdown = blockToMarkdown(block)
+        if markdown:
+            yield markdown + "\n" if first else "\n" + markdown + "\n"
+            first = False
+
+def exportHtml(blocks, title=""):
+    yield HTML_HEADER.format(escape(title))
+    for block in blocks:
+        yield block + "\n"
+    yield HTML_FOOTER
+
+def exportBlocks(blocks, exportFormat, title=""):
+    if exportFormat == "text":
+        return exportText(blocks)
+    if exportFormat == "markdown":
+        return exportMarkdown(blocks)
+    if exportFormat == "html":
+        return exportHtml(blocks, title)
+    raise ValueError(f"unknown export format {exportFormat}")
+
+def exportTitle(path):
+    return os.path.splitext(os.path.basename(path))[0]
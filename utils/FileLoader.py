@@ -0,0 +1,135 @@
+import codecs
+import os
+
+from PySide6.QtCore import QObject, Signal, Slot, QThread
+
+from utils.HtmlBlocks import BlockSplitter
+from utils.NtpFormat import NtpReader, isNtpContainer
+from utils.PreloadCache import fileKey
+from utils.Tracing import traced
+
+FIRST_CHUNK_SIZE = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+FIRST_CACHED_BLOCKS = 200
+CACHED_BATCH_BLOCKS = 5000
+
+class FileLoader(QObject):
+    requested = Signal(int, str)
+    progress = Signal(int, int)
+    blocksReady = Signal(int, object)
+    finished = Signal(int)
+    failed = Signal(int, str)
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.generation = 0
+        self.loaderThread = QThread()
+        self.moveToThread(self.loaderThread)
+        self.requested.connect(self.load)
+        self.loaderThread.start()
+
+    def open(self, path):
+        self.generation += 1
+        self.requested.emit(self.generation, path)
+        return self.generation
+
+    def cancel(self):
+        self.generation += 1
+
+    def isCurrent(self, token):
+        return token == self.generation
+
+    @Slot(int, str)
+    @traced("FileLoader.load", "io")
+    def load(self, token, path):
+        if not self.isCurrent(token):
+            return
+        try:
+            key = None
+            if self.cache is not None:
+                cached = self.cache.get(path)
+                if cached is not None:
+                    self.loadCached(token, cached)
+                    return
+                #*Taken before reading, a write during the read leaves a key the next open won't match
+                key = fileKey(path)
+
+            loaded = []
+            if isNtpContainer(path):
+                self.loadContainer(token, path, loaded)
+            else:
+                self.loadStream(token, path, loaded)
+            if key is not None and self.isCurrent(token):
+                self.cache.put(path, key, loaded)
+        except Exception as e:
+            self.failed.emit(token, str(e))
+
+    def loadCached(self, token, blocks):
+        #*Slices are emitted so the document never shares a list with the cache
+        start = 0
+        batchSize = FIRST_CACHED_BLOCKS
+        while True:
+            if not self.isCurrent(token):
+                return
+            self.blocksReady.emit(token, blocks[start:start + batchSize])
+            start += batchSize
+            self.progress.emit(token, min(100, start * 100 // max(len(blocks), 1)))
+            if start >= len(blocks):
+                break
+            batchSize = CACHED_BATCH_BLOCKS
+        self.finished.emit(token)
+
+    def loadStream(self, token, path, loaded):
+        total = max(os.path.getsize(path), 1)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        plainText = not path.endswith(".ntp")
+        splitter = BlockSplitter()
+        pendingLine = ""
+        done = 0
+        chunkSize = FIRST_CHUNK_SIZE
+
+        with open(path, "rb") as file:
+            while True:
+                if not self.isCurrent(token):
+                    return
+                raw = file.read(chunkSize)
+                chunkSize = CHUNK_SIZE
+                final = not raw
+                text = decoder.decode(raw, final=final)
+                done += len(raw)
+
+                if plainText:
+                    #*Plain text blocks are lines, the last one has no trailing newline
+                    lines = (pendingLine + text).split("\n")
+                    pendingLine = lines.pop()
+                    blocks = [line.removesuffix("\r") + "\n" for line in lines]
+                    if final:
+                        blocks.append(pendingLine)
+                else:
+                    blocks = splitter.feed(text)
+                    if final:
+                        blocks += splitter.close()
+
+                if blocks:
+                    loaded.extend(blocks)
+                    self.blocksReady.emit(token, blocks)
+                self.progress.emit(token, min(100, done * 100 // total))
+                if final:
+                    break
+
+        self.finished.emit(token)
+
+    def loadContainer(self, token, path, loaded):
+        total = max(os.path.getsize(path), 1)
+        with NtpReader(path) as reader:
+            #*Chunk 0 is kept small so the first paint only decompresses a few kB
+            for index in range(reader.chunkCount):
+                if not self.isCurrent(token):
+                    return
+                blocks = reader.readChunk(index)
+                loaded.extend(blocks)
+                self.blocksReady.emit(token, blocks)
+                self.progress.emit(token, min(100, reader.chunkEnd(index) * 100 // total))
+        self.progress.emit(token, 100)
+        self.finished.emit(token)
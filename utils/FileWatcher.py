@@ -0,0 +1,203 @@
+import hashlib
+import os
+from collections import defaultdict
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QThread, QTimer, Signal, Slot
+
+from utils.BlockDiff import diffReloadedBlocks
+from utils.NtpFormat import NtpReader, isNtpContainer
+from utils.PreloadCache import readBlocks
+from utils.Tracing import traced
+
+WATCH_DEBOUNCE_MS = 250
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def fileSignature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def fileDigest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def isNormalizedFile(path):
+    #*Containers written by SaveEngine are normalized already, their blocks are diffed as they are
+    try:
+        if not isNtpContainer(path):
+            return False
+        with NtpReader(path) as reader:
+            return bool(reader.header.get("normalized"))
+    except (OSError, ValueError):
+        return False
+
+class WatchWorker(QObject):
+    checkRequested = Signal(object)
+    reloadRequested = Signal(object)
+    checked = Signal(object)
+    reloaded = Signal(str, int, object, object)
+    reloadFailed = Signal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.workerThread = QThread()
+        self.moveToThread(self.workerThread)
+        self.checkRequested.connect(self.check)
+        self.reloadRequested.connect(self.reload)
+        self.workerThread.start()
+
+    @Slot(object)
+    @traced("WatchWorker.check", "io")
+    def check(self, requests):
+        #*The stat is enough to dismiss most events, the file is only hashed when mtime or size moved
+        results = []
+        for path, known in requests:
+            try:
+                signature = fileSignature(path)
+                if known is not None and signature == known[0]:
+                    continue
+                digest = fileDigest(path)
+            except OSError:
+                results.append((path, None, None))
+                continue
+            results.append((path, signature, digest))
+        self.checked.emit(results)
+
+    @Slot(object)
+    @traced("WatchWorker.reload", "io")
+    def reload(self, request):
+        path, snapshot, version, rich = request
+        try:
+            blocks = readBlocks(path)
+            ops = diffReloadedBlocks(snapshot, blocks, rich, rich and isNormalizedFile(path)) if snapshot is not None else None
+        except Exception as e:
+            self.reloadFailed.emit(path, str(e))
+            return
+        self.reloaded.emit(path, version, ops, blocks)
+
+    def shutdown(self):
+        self.workerThread.quit()
+        self.workerThread.wait()
+
+class FileWatcher(QObject):
+    changed = Signal(str)
+    removed = Signal(str)
+    reloaded = Signal(str, int, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        #*inotify backed on Linux, nothing is polled however many files are open
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.onPathChanged)
+        self.watcher.directoryChanged.connect(self.onDirectoryChanged)
+        self.known = {}
+        self.directories = defaultdict(set)
+        self.writing = set()
+        self.pending = set()
+
+        self.debounceTimer = QTimer(self)
+        self.debounceTimer.setSingleShot(True)
+        self.debounceTimer.setInterval(WATCH_DEBOUNCE_MS)
+        self.debounceTimer.timeout.connect(self.flushPending)
+
+        self.worker = WatchWorker()
+        self.worker.checked.connect(self.onChecked)
+        self.worker.reloaded.connect(self.reloaded)
+        self.worker.reloadFailed.connect(self.onReloadFailed)
+
+    def watch(self, path):
+        path = os.path.abspath(path)
+        if path in self.known:
+            return
+        #*The directory is watched too, editors that save by renaming replace the file and drop its watch
+        self.known[path] = None
+        directory = os.path.dirname(path)
+        self.directories[directory].add(path)
+        if len(self.directories[directory]) == 1 and os.path.isdir(directory):
+            self.watcher.addPath(directory)
+        if os.path.exists(path):
+            self.watcher.addPath(path)
+        self.baseline(path)
+
+    def unwatch(self, path):
+        path = os.path.abspath(path)
+        if path not in self.known:
+            return
+        del self.known[path]
+        self.pending.discard(path)
+        self.writing.discard(path)
+        self.watcher.removePath(path)
+        directory = os.path.dirname(path)
+        self.directories[directory].discard(path)
+        if not self.directories[directory]:
+            del self.directories[directory]
+            self.watcher.removePath(directory)
+
+    def isWatched(self, path):
+        return os.path.abspath(path) in self.known
+
+    def baseline(self, path):
+        self.worker.checkRequested.emit([(path, None)])
+
+    def expectWrite(self, path):
+        #*Our own saves are not external changes, events are held until the save is acknowledged
+        path = os.path.abspath(path)
+        if path in self.known:
+            self.writing.add(path)
+
+    def acknowledge(self, path):
+        path = os.path.abspath(path)
+        self.writing.discard(path)
+        if path in self.known:
+            self.known[path] = None
+            self.pending.discard(path)
+            self.baseline(path)
+
+    def onPathChanged(self, path):
+        if path in self.known:
+            self.pending.add(path)
+            self.debounceTimer.start()
+
+    def onDirectoryChanged(self, directory):
+        paths = self.directories.get(directory)
+        if paths:
+            self.pending.update(paths)
+            self.debounceTimer.start()
+
+    def flushPending(self):
+        #*Editors write in several steps, one check covers everything that happened during the debounce
+        requests = [(path, self.known[path]) for path in self.pending if path in self.known and path not in self.writing]
+        self.pending = {path for path in self.pending if path in self.writing}
+        if requests:
+            self.worker.checkRequested.emit(requests)
+
+    def onChecked(self, results):
+        watched = set(self.watcher.files())
+        for path, signature, digest in results:
+            if path not in self.known or path in self.writing:
+                continue
+            known = self.known[path]
+            if signature is None:
+                #*The last digest is kept, a file that comes back with other content is still reported as changed
+                if known is not None and known[0] is not None:
+                    self.known[path] = (None, known[1])
+                    self.removed.emit(path)
+                continue
+            if path not in watched:
+                self.watcher.addPath(path)
+            self.known[path] = (signature, digest)
+            #*A touch or a rewrite with the same bytes moves mtime but is not a change
+            if known is not None and digest != known[1]:
+                self.changed.emit(path)
+
+    def reload(self, path, snapshot, version, rich):
+        self.worker.reloadRequested.emit((os.path.abspath(path), snapshot, version, rich))
+
+    def onReloadFailed(self, path, error):
+        print(f"Error reloading {path}: {error}")
+
+    def shutdown(self):
+        self.debounceTimer.stop()
+        self.worker.shutdown()
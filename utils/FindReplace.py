@@ -0,0 +1,273 @@
+import re
+from bisect import bisect_right
+from html import escape, unescape
+
+TAG = re.compile(r"<!--.*?-->|<(?:[^>\"']|\"[^\"]*\"|'[^']*')*>", re.DOTALL)
+CANDIDATE_LIMIT = 200_000
+
+def blockText(block):
+    #*The text nodes of one block, as (offset in the block text, raw start, raw end) of each node in the block html
+    parts = []
+    nodes = []
+    length = 0
+    position = 0
+    for tag in TAG.finditer(block):
+        if tag.start() > position:
+            text = unescape(block[position:tag.start()])
+            nodes.append((length, position, tag.start()))
+            parts.append(text)
+            length += len(text)
+        position = tag.end()
+    if position < len(block):
+        text = unescape(block[position:])
+        nodes.append((length, position, len(block)))
+        parts.append(text)
+    return "".join(parts), nodes
+
+def escapeText(text):
+    #*Same escaping Chromium uses when it serializes a text node
+    return escape(text, quote=False).replace("\xa0", "&nbsp;")
+
+def utf16Length(text):
+    return len(text) if text.isascii() else len(text.encode("utf-16-le")) // 2
+
+def compileQuery(pattern, regex=False, caseSensitive=False):
+    flags = re.MULTILINE if caseSensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(pattern if regex else re.escape(pattern), flags)
+
+class TextIndex:
+    def __init__(self, blocks, rich, previous=None):
+        #*Rich blocks are searched as their text content, one block per line so matches don't run across blocks
+        self.blocks = blocks
+        self.rich = rich
+        self.separator = "\n" if rich else ""
+        reuse = previous.cache if previous is not None and previous.rich == rich else {}
+        self.cache = {}
+        texts = []
+        self.starts = []
+        position = 0
+        for block in blocks:
+            if rich:
+                entry = self.cache.get(block) or reuse.get(block) or blockText(block)
+                self.cache[block] = entry
+                text = entry[0]
+            else:
+                text = block
+            self.starts.append(position)
+            texts.append(text)
+            position += len(text) + len(self.separator)
+        self.text = self.separator.join(texts)
+        self._folded = None
+
+    def folded(self):
+        #*Lower-cased copy for case-insensitive literal search, unusable when lowering changes the length
+        if self._folded is None:
+            folded = self.text.lower()
+            self._folded = folded if len(folded) == len(self.text) else False
+        return self._folded
+
+    def blockAt(self, offset):
+        return max(0, bisect_right(self.starts, offset) - 1)
+
+    def blockSlice(self, index):
+        start = self.starts[index]
+        end = self.starts[index + 1] - len(self.separator) if index + 1 < len(self.starts) else len(self.text)
+        return start, end
+
+    def locate(self, offset, end=False):
+        #*Editor coordinates for a text offset: block, text node within the block and UTF-16 offset in that node
+        index = self.blockAt(offset - 1 if end and offset else offset)
+        start, blockEnd = self.blockSlice(index)
+        local = min(offset, blockEnd) - start
+        if not self.rich:
+            return index, 0, utf16Length(self.blocks[index][:local])
+
+        text, nodes = self.cache[self.blocks[index]]
+        if not nodes:
+            return index, 0, 0
+        nodeStarts = [node[0] for node in nodes]
+        node = max(0, bisect_right(nodeStarts, local - 1 if end and local else local) - 1)
+        return index, node, utf16Length(text[nodeStarts[node]:local])
+
+def findCandidates(text, needle):
+    #*Every start of a literal pattern, overlapping ones included, so a longer pattern can be matched by filtering
+    starts = []
+    find = text.find
+    start = find(needle)
+    while start >= 0:
+        if len(starts) == CANDIDATE_LIMIT:
+            return None
+        starts.append(start)
+        start = find(needle, start + 1)
+    return starts
+
+def nonOverlapping(starts, length):
+    matches = []
+    lastEnd = 0
+    for start in starts:
+        if start >= lastEnd:
+            lastEnd = start + length
+            matches.append((start, lastEnd))
+    return matches
+
+def findAll(text, needle):
+    matches = []
+    find = text.find
+    length = len(needle)
+    start = find(needle)
+    while start >= 0:
+        matches.append((start, start + length))
+        start = find(needle, start + length)
+    return matches
+
+class FindSession:
+    def __init__(self):
+        self.index = None
+        self.version = None
+        self.query = None
+        self.candidates = None
+        self.matches = []
+
+    def updateIndex(self, blocks, version, rich):
+        #*Every tab counts its own versions, the blocks snapshot tells the documents apart
+        if self.index is None or self.index.blocks is not blocks or self.version != version or self.index.rich != rich:
+            self.index = TextIndex(blocks, rich, self.index)
+            self.version = version
+            self.query = None
+            self.candidates = None
+        return self.index
+
+    def find(self, pattern, regex=False, caseSensitive=False):
+        if not pattern:
+            self.query = None
+            self.candidates = None
+            self.matches = []
+            return self.matches
+
+        previous = self.query
+        self.query = (pattern, regex, caseSensitive)
+        text = self.index.text if caseSensitive else self.index.folded()
+        if regex or text is False:
+            self.candidates = None
+            compiled = compileQuery(pattern, regex, caseSensitive)
+            self.matches = [match.span() for match in compiled.finditer(self.index.text) if match.end() > match.start()]
+            return self.matches
+
+        needle = pattern if caseSensitive else pattern.lower()
+        if self.candidates is not None and previous and not previous[1] and previous[2] == caseSensitive and pattern.startswith(previous[0]):
+            #*Typing one more character only has to check where the shorter pattern already matched
+            startswith = text.startswith
+            self.candidates = [start for start in self.candidates if startswith(needle, start)]
+        else:
+            self.candidates = findCandidates(text, needle)
+        if self.candidates is None:
+            self.matches = findAll(text, needle)
+        else:
+            self.matches = nonOverlapping(self.candidates, len(needle))
+        return self.matches
+
+    def replaceAll(self, replacement):
+        if self.query is None:
+            return [], 0
+        pattern, regex, caseSensitive = self.query
+        if regex:
+            compiled = compileQuery(pattern, regex, caseSensitive)
+            edits = [(match.start(), match.end(), match.expand(replacement)) for match in compiled.finditer(self.index.text) if match.end() > match.start()]
+        else:
+            edits = [(start, end, replacement) for start, end in self.matches]
+        if self.index.rich:
+            return replaceRich(self.index, edits)
+        return replacePlain(self.index, edits)
+
+def rewriteBlock(block, text, nodes, edits):
+    #*Each match is written into the text node it starts in and cut out of any later node it covers
+    nodeStarts = [node[0] for node in nodes]
+    nodeEdits = {}
+    for start, end, replacement in edits:
+        first = bisect_right(nodeStarts, start) - 1
+        last = bisect_right(nodeStarts, end - 1) - 1
+        for index in range(first, last + 1):
+            nodeEnd = nodeStarts[index + 1] if index + 1 < len(nodes) else len(text)
+            nodeEdits.setdefault(index, []).append((max(start, nodeStarts[index]), min(end, nodeEnd), replacement if index == first else ""))
+
+    pieces = []
+    position = 0
+    for index, (textStart, rawStart, rawEnd) in enumerate(nodes):
+        if index not in nodeEdits:
+            continue
+        nodeEnd = nodeStarts[index + 1] if index + 1 < len(nodes) else len(text)
+        newText = []
+        cursor = textStart
+        for start, end, replacement in nodeEdits[index]:
+            newText.append(text[cursor:start])
+            newText.append(replacement)
+            cursor = end
+        newText.append(text[cursor:nodeEnd])
+        pieces.append(block[position:rawStart])
+        pieces.append(escapeText("".join(newText)))
+        position = rawEnd
+    pieces.append(block[position:])
+    return "".join(pieces)
+
+def replaceRich(index, edits):
+    changed = {}
+    count = 0
+    blockEdits = []
+    current = None
+    for start, end, replacement in edits:
+        block = index.blockAt(start)
+        blockStart, blockEnd = index.blockSlice(block)
+        if end > blockEnd:
+            #*A match that runs across blocks can't be written back as a text node edit
+            continue
+        if block != current:
+            if blockEdits:
+                changed[current] = blockEdits
+            current = block
+            blockEdits = []
+        blockEdits.append((start - blockStart, end - blockStart, replacement))
+        count += 1
+    if blockEdits:
+        changed[current] = blockEdits
+
+    ops = []
+    for block in sorted(changed):
+        text, nodes = index.cache[index.blocks[block]]
+        newBlock = rewriteBlock(index.blocks[block], text, nodes, changed[block])
+        if ops and ops[-1]["start"] + ops[-1]["deleteCount"] == block:
+            ops[-1]["deleteCount"] += 1
+            ops[-1]["blocks"].append(newBlock)
+        else:
+            ops.append({"start": block, "deleteCount": 1, "blocks": [newBlock]})
+    return ops, count
+
+def replacePlain(index, edits):
+    text = index.text
+    lastLine = len(index.blocks) - 1
+    ranges = []
+    for start, end, replacement in edits:
+        first = index.blockAt(start)
+        last = index.blockAt(end) if end < len(text) else lastLine
+        if ranges and first <= ranges[-1][1]:
+            ranges[-1][1] = max(ranges[-1][1], last)
+            ranges[-1][2].append((start, end, replacement))
+        else:
+            ranges.append([first, last, [(start, end, replacement)]])
+
+    ops = []
+    for first, last, rangeEdits in ranges:
+        segmentStart = index.starts[first]
+        segmentEnd = index.starts[last] + len(index.blocks[last])
+        pieces = []
+        cursor = segmentStart
+        for start, end, replacement in rangeEdits:
+            pieces.append(text[cursor:start])
+            pieces.append(replacement)
+            cursor = end
+        pieces.append(text[cursor:segmentEnd])
+        parts = "".join(pieces).split("\n")
+        lines = [part + "\n" for part in parts[:-1]]
+        if last == lastLine:
+            lines.append(parts[-1])
+        ops.append({"start": first, "deleteCount": last - first + 1, "blocks": lines})
+    return ops, len(edits)
@@ -0,0 +1,66 @@
+from PySide6.QtCore import QObject, Signal, Slot, QThread
+
+from utils.FindReplace import FindSession
+
+class FindWorker(QObject):
+    findRequested = Signal(int, object)
+    replaceRequested = Signal(int, object)
+    found = Signal(int, object, object)
+    replaced = Signal(int, int, object, int)
+    failed = Signal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.session = FindSession()
+        self.finderThread = QThread()
+        self.moveToThread(self.finderThread)
+        self.findRequested.connect(self.runFind)
+        self.replaceRequested.connect(self.runReplace)
+        self.finderThread.start()
+
+    def find(self, blocks, version, rich, pattern, regex=False, caseSensitive=False):
+        self.generation += 1
+        self.findRequested.emit(self.generation, (blocks, version, rich, pattern, regex, caseSensitive))
+        return self.generation
+
+    def replaceAll(self, blocks, version, rich, pattern, regex, caseSensitive, replacement):
+        self.generation += 1
+        self.replaceRequested.emit(self.generation, (blocks, version, rich, pattern, regex, caseSensitive, replacement))
+        return self.generation
+
+    def cancel(self):
+        self.generation += 1
+
+    def isCurrent(self, token):
+        return token == self.generation
+
+    @Slot(int, object)
+    def runFind(self, token, request):
+        #*Keystrokes queue up while a search runs, only the newest one is worth doing
+        if not self.isCurrent(token):
+            return
+        blocks, version, rich, pattern, regex, caseSensitive = request
+        try:
+            index = self.session.updateIndex(blocks, version, rich)
+            self.found.emit(token, index, self.session.find(pattern, regex, caseSensitive))
+        except Exception as e:
+            self.failed.emit(token, str(e))
+
+    @Slot(int, object)
+    def runReplace(self, token, request):
+        if not self.isCurrent(token):
+            return
+        blocks, version, rich, pattern, regex, caseSensitive, replacement = request
+        try:
+            self.session.updateIndex(blocks, version, rich)
+            if self.session.query != (pattern, regex, caseSensitive):
+                self.session.find(pattern, regex, caseSensitive)
+            ops, count = self.session.replaceAll(replacement)
+            self.replaced.emit(token, version, ops, count)
+        except Exception as e:
+            self.failed.emit(token, str(e))
+
+    def shutdown(self):
+        self.finderThread.quit()
+        self.finderThread.wait()
@@ -0,0 +1,138 @@
+from html import escape
+from html.parser import HTMLParser
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+CLOSES_PARAGRAPH = {
+    "address", "article", "aside", "blockquote", "div", "dl", "fieldset", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "main", "nav", "ol", "p", "pre",
+    "section", "table", "ul",
+}
+SKIPPED_TAGS = {"html", "body"}
+TEXTLESS_TAGS = {"head", "script", "style", "title"}
+
+class BlockSplitter(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []
+        self.parts = []
+        self.blocks = []
+        self.inHead = False
+
+    def feed(self, data):
+        super().feed(data)
+        return self.takeBlocks()
+
+    def close(self):
+        super().close()
+        self.stack = []
+        self.flushBlock()
+        return self.takeBlocks()
+
+    def takeBlocks(self):
+        blocks = self.blocks
+        self.blocks = []
+        return blocks
+
+    def flushBlock(self):
+        block = "".join(self.parts)
+        self.parts = []
+        if block.strip():
+            self.blocks.append(block)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "head":
+            self.inHead = True
+            return
+        if self.inHead or tag in SKIPPED_TAGS:
+            return
+
+        if tag in CLOSES_PARAGRAPH and self.stack and self.stack[-1] == "p":
+            self.stack.pop()
+            if not self.stack:
+                self.flushBlock()
+        if not self.stack:
+            self.flushBlock()
+
+        self.parts.append(self.get_starttag_text())
+        if tag in VOID_TAGS:
+            if not self.stack:
+                self.flushBlock()
+        else:
+            self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if self.inHead or tag in SKIPPED_TAGS:
+            return
+        if not self.stack:
+            self.flushBlock()
+        self.parts.append(self.get_starttag_text())
+        if not self.stack:
+            self.flushBlock()
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.inHead = False
+            return
+        if self.inHead or tag in SKIPPED_TAGS or tag not in self.stack:
+            return
+
+        self.parts.append(f"</{tag}>")
+        while self.stack.pop() != tag:
+            pass
+        if not self.stack:
+            self.flushBlock()
+
+    def handle_data(self, data):
+        if not self.inHead:
+            self.parts.append(data)
+
+    def handle_entityref(self, name):
+        if not self.inHead:
+            self.parts.append(f"&{name};")
+
+    def handle_charref(self, name):
+        if not self.inHead:
+            self.parts.append(f"&#{name};")
+
+
+def splitBlocks(html):
+    splitter = BlockSplitter()
+    return splitter.feed(html) + splitter.close()
+
+
+def textToBlocks(text):
+    return [f"<p>{escape(line)}</p>" if line else "<p><br></p>" for line in text.split("\n")]
+
+
+class TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skipDepth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in TEXTLESS_TAGS:
+            self.skipDepth += 1
+        elif tag in CLOSES_PARAGRAPH or tag in ("br", "li", "td", "th", "tr"):
+            #*Block boundaries become whitespace so words from adjacent paragraphs don't merge
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in TEXTLESS_TAGS and self.skipDepth:
+            self.skipDepth -= 1
+        elif tag in CLOSES_PARAGRAPH:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skipDepth:
+            self.parts.append(data)
+
+    def text(self):
+        self.close()
+        return "".join(self.parts)
+
+
+def htmlToText(html):
+    extractor = TextExtractor()
+    extractor.feed(html)
+    return extractor.text()
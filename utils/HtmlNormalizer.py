@@ -0,0 +1,264 @@
+import functools
+import re
+from html import escape
+from html.parser import HTMLParser
+
+from utils.HtmlBlocks import CLOSES_PARAGRAPH, VOID_TAGS
+
+DROPPED_TAGS = {"head", "script", "noscript", "template"}
+UNWRAPPED_TAGS = {"html", "body"}
+INLINE_TAGS = {"span", "b", "i", "u", "s", "em", "strong", "font", "sub", "sup", "small", "mark", "code"}
+BLOCK_CONTAINERS = {
+    "div", "ul", "ol", "dl", "table", "thead", "tbody", "tfoot", "tr", "blockquote", "section",
+    "article", "header", "footer", "nav", "aside", "main", "fieldset", "form", "figure",
+}
+BLOCK_TAGS = BLOCK_CONTAINERS | {"p", "h1", "h2", "h3", "h4", "h5", "h6", "li", "td", "th", "dt", "dd", "pre", "hr"}
+PREFORMATTED_TAGS = {"pre", "textarea"}
+DROPPED_ATTRIBUTES = {"contenteditable", "spellcheck"}
+WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+CACHED_BLOCKS = 100_000
+
+def normalizeStyle(style):
+    declarations = []
+    for declaration in style.split(";"):
+        name, _, value = declaration.partition(":")
+        name = name.strip().lower()
+        value = " ".join(value.split())
+        if name and value:
+            declarations.append(f"{name}: {value}")
+    return "; ".join(declarations)
+
+def cleanAttributes(attrs):
+    cleaned = []
+    for name, value in attrs:
+        if name in DROPPED_ATTRIBUTES or name.startswith("on"):
+            continue
+        if name == "style":
+            value = normalizeStyle(value or "")
+            if not value:
+                continue
+        cleaned.append((name, value))
+    return tuple(cleaned)
+
+def startTag(tag, attrs):
+    parts = [tag]
+    for name, value in attrs:
+        parts.append(name if value is None else f'{name}="{escape(value)}"')
+    return "<" + " ".join(parts) + ">"
+
+class HtmlNormalizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.output = []
+        self.blocks = []
+        self.openCount = 0
+        #*Open elements as [tag, attrs, state], state is "emitted", "pending" (no content yet) or "unwrapped"
+        self.stack = []
+        self.pending = []
+        self.heldEnd = None
+        self.dropped = []
+        self.atBlockStart = True
+
+    def feed(self, data):
+        super().feed(data)
+        return self.takeBlocks()
+
+    def close(self):
+        super().close()
+        self.releaseHeldEnd()
+        self.flushBlock()
+        return self.takeBlocks()
+
+    def takeBlocks(self):
+        blocks = self.blocks
+        self.blocks = []
+        return blocks
+
+    def flushBlock(self):
+        #*Splits into top level blocks like BlockSplitter does, so the output needs no second parse
+        block = "".join(self.output)
+        self.output = []
+        if block.strip():
+            self.blocks.append(block)
+
+    def openElement(self, entry):
+        self.stack.append(entry)
+        if entry[2] != "unwrapped":
+            self.openCount += 1
+
+    def releaseHeldEnd(self):
+        if self.heldEnd is not None:
+            self.output.append(f"</{self.heldEnd[0]}>")
+            self.heldEnd = None
+
+    def flushPending(self):
+        #*An inline element is only written once it turns out to have content
+        for entry in self.pending:
+            self.output.append(startTag(entry[0], entry[1]))
+            entry[2] = "emitted"
+        self.pending = []
+
+    def emitContent(self, text):
+        self.releaseHeldEnd()
+        self.flushPending()
+        self.output.append(text)
+        self.atBlockStart = False
+
+    def enclosing(self, skipUnwrapped=True):
+        for entry in reversed(self.stack):
+            if not skipUnwrapped or entry[2] != "unwrapped":
+                return entry
+        return None
+
+    def inPreformatted(self):
+        return any(entry[0] in PREFORMATTED_TAGS for entry in self.stack)
+
+    def handle_starttag(self, tag, attrs):
+        if self.dropped or tag in DROPPED_TAGS:
+            #*The injected head, qwebchannel.js and the bridge bootstrap never reach the saved file
+            if tag not in VOID_TAGS:
+                self.dropped.append(tag)
+            return
+
+        if tag in CLOSES_PARAGRAPH:
+            parent = self.enclosing()
+            if parent is not None and parent[0] == "p":
+                self.handle_endtag("p")
+        if not self.openCount:
+            self.releaseHeldEnd()
+            self.flushBlock()
+
+        cleaned = cleanAttributes(attrs)
+        originalNames = {name for name, _ in attrs}
+        parent = self.enclosing()
+
+        if tag in UNWRAPPED_TAGS or (tag in ("div", "span") and "contenteditable" in originalNames and not cleaned):
+            #*Wrappers left behind by saving the editor's own page are dropped, their children are kept
+            self.openElement([tag, cleaned, "unwrapped"])
+            return
+        if tag == "span" and (not cleaned or (parent is not None and parent[0] == "span" and parent[1] == cleaned)):
+            self.openElement([tag, cleaned, "unwrapped"])
+            return
+
+        if tag in VOID_TAGS:
+            self.emitContent(startTag(tag, cleaned))
+            if tag in BLOCK_TAGS:
+                self.atBlockStart = True
+            if not self.openCount:
+                self.flushBlock()
+            return
+
+        if self.heldEnd is not None and self.heldEnd[0] == tag and self.heldEnd[1] == cleaned:
+            #*<span a>x</span><span a>y</span> becomes <span a>xy</span>
+            self.heldEnd = None
+            self.openElement([tag, cleaned, "emitted"])
+            return
+
+        if tag in INLINE_TAGS:
+            self.releaseHeldEnd()
+            entry = [tag, cleaned, "pending"]
+            self.openElement(entry)
+            self.pending.append(entry)
+            return
+
+        self.emitContent(startTag(tag, cleaned))
+        self.openElement([tag, cleaned, "emitted"])
+        if tag in BLOCK_TAGS:
+            self.atBlockStart = True
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.dropped:
+            if tag in self.dropped:
+                while self.dropped.pop() != tag:
+                    pass
+            return
+        if not any(entry[0] == tag for entry in self.stack):
+            return
+
+        while self.stack:
+            entry = self.stack.pop()
+            tagName, attrs, state = entry
+            if state != "unwrapped":
+                self.openCount -= 1
+            if state == "pending":
+                self.pending.remove(entry)
+            elif state == "emitted":
+                self.releaseHeldEnd()
+                if tagName in INLINE_TAGS:
+                    self.heldEnd = (tagName, attrs)
+                else:
+                    self.output.append(f"</{tagName}>")
+                    if tagName in BLOCK_TAGS:
+                        self.atBlockStart = True
+            if tagName == tag:
+                break
+        if not self.openCount:
+            self.releaseHeldEnd()
+            self.flushBlock()
+
+    def handle_data(self, data):
+        if self.dropped:
+            return
+        if self.inPreformatted():
+            self.emitContent(data)
+            return
+
+        text = WHITESPACE.sub(" ", data)
+        if text == " ":
+            parent = self.enclosing()
+            if self.atBlockStart or parent is None or parent[0] in BLOCK_CONTAINERS:
+                #*Indentation between block elements has no effect on rendering
+                return
+        elif self.atBlockStart:
+            text = text.lstrip(" ")
+        self.emitContent(text)
+
+    def handle_entityref(self, name):
+        if not self.dropped:
+            self.emitContent(f"&{name};")
+
+    def handle_charref(self, name):
+        if not self.dropped:
+            self.emitContent(f"&#{name};")
+
+    def handle_comment(self, data):
+        pass
+
+    def handle_decl(self, decl):
+        pass
+
+    def handle_pi(self, data):
+        pass
+
+
+def normalizeHtml(html):
+    return "".join(streamBlocks([html]))
+
+
+def streamBlocks(chunks):
+    normalizer = HtmlNormalizer()
+    blocks = []
+    for chunk in chunks:
+        blocks.extend(normalizer.feed(chunk))
+    blocks.extend(normalizer.close())
+    return blocks
+
+
+@functools.lru_cache(maxsize=CACHED_BLOCKS)
+def normalizeBlock(block):
+    #*Blocks are top level elements so each one normalizes on its own, unchanged blocks are not parsed again on the next save
+    return tuple(streamBlocks([block]))
+
+
+def normalizeBlocks(source):
+    if isinstance(source, str):
+        return streamBlocks([source])
+    blocks = []
+    for block in source:
+        blocks.extend(normalizeBlock(block))
+    return blocks
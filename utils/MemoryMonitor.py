@@ -0,0 +1,75 @@
+import os
+import time
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot
+
+from utils.ProcessMemory import sampleMemory
+from utils.Tracing import traced
+
+MEMORY_BUDGET_ENV = "NOTEPAD_MEMORY_BUDGET_MB"
+DEFAULT_BUDGET_MB = 1024
+MEMORY_SAMPLE_MS = 1000
+PRESSURE_REPEAT_MS = 10_000
+#*Pressure ends once usage drops this far under the budget, so a process hovering at the line does not flap
+PRESSURE_RELEASE = 0.9
+
+def budgetFromEnvironment():
+    try:
+        return float(os.environ.get(MEMORY_BUDGET_ENV, DEFAULT_BUDGET_MB))
+    except ValueError:
+        print(f"Error reading {MEMORY_BUDGET_ENV}, using {DEFAULT_BUDGET_MB} MB")
+        return DEFAULT_BUDGET_MB
+
+class MemoryMonitor(QObject):
+    startRequested = Signal()
+    sampled = Signal(object)
+    memoryPressure = Signal(object)
+
+    def __init__(self, budgetMb=None, parent=None):
+        super().__init__(parent)
+        self.setBudget(budgetMb if budgetMb is not None else budgetFromEnvironment())
+        self.underPressure = False
+        self.lastPressure = 0.0
+        self.timer = None
+        #*Reading /proc for every renderer takes a few ms, it is done off the GUI thread
+        self.monitorThread = QThread()
+        self.moveToThread(self.monitorThread)
+        self.startRequested.connect(self.start)
+        self.monitorThread.start()
+        self.startRequested.emit()
+
+    def setBudget(self, budgetMb):
+        self.budgetKb = int(budgetMb * 1024)
+
+    @Slot()
+    def start(self):
+        if self.timer is None:
+            self.timer = QTimer(self)
+            self.timer.setInterval(MEMORY_SAMPLE_MS)
+            self.timer.timeout.connect(self.sample)
+        self.timer.start()
+        self.sample()
+
+    @Slot()
+    @traced("MemoryMonitor.sample", "io")
+    def sample(self):
+        sample = sampleMemory()
+        if sample is None:
+            return
+        sample["budget_kb"] = self.budgetKb
+        self.sampled.emit(sample)
+
+        total = sample["total_pss_kb"]
+        if total > self.budgetKb:
+            #*Subscribers trim on the first crossing, after that only again if trimming did not bring usage down
+            now = time.monotonic()
+            if not self.underPressure or now - self.lastPressure >= PRESSURE_REPEAT_MS / 1000:
+                self.underPressure = True
+                self.lastPressure = now
+                self.memoryPressure.emit(sample)
+        elif total < self.budgetKb * PRESSURE_RELEASE:
+            self.underPressure = False
+
+    def shutdown(self):
+        self.monitorThread.quit()
+        self.monitorThread.wait()
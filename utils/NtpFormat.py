@@ -0,0 +1,118 @@
+import io
+import json
+import lzma
+import struct
+import zlib
+
+MAGIC = b"NTPv2\n"
+HEADER_LENGTH = struct.Struct("<I")
+FORMAT_VERSION = 2
+DEFAULT_CODEC = "zlib"
+FIRST_CHUNK_BYTES = 32 * 1024
+CHUNK_BYTES = 256 * 1024
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=6), lzma.decompress),
+    "none": (lambda data: data, lambda data: data),
+}
+
+def groupBlocks(blocks):
+    group = []
+    groupBytes = 0
+    limit = FIRST_CHUNK_BYTES
+    for block in blocks:
+        group.append(block)
+        groupBytes += len(block)
+        if groupBytes >= limit:
+            yield group
+            group = []
+            groupBytes = 0
+            limit = CHUNK_BYTES
+    if group:
+        yield group
+
+def encodeNtp(blocks, codec=DEFAULT_CODEC, normalized=False):
+    compress = CODECS[codec][0]
+    chunks = []
+    index = []
+    offset = 0
+    for group in groupBlocks(blocks):
+        raw = json.dumps(group).encode("utf-8")
+        data = compress(raw)
+        index.append({"offset": offset, "length": len(data), "size": len(raw), "blocks": len(group)})
+        chunks.append(data)
+        offset += len(data)
+
+    header = {
+        "version": FORMAT_VERSION,
+        "codec": codec,
+        "blocks": sum(chunk["blocks"] for chunk in index),
+        "chunks": index,
+    }
+    if normalized:
+        #*Readers that want canonical HTML can skip normalizing these blocks again
+        header["normalized"] = True
+    header = json.dumps(header).encode("utf-8")
+    return b"".join([MAGIC, HEADER_LENGTH.pack(len(header)), header] + chunks)
+
+def isNtpContainer(path):
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+class NtpReader:
+    def __init__(self, path):
+        self.file = open(path, "rb") if isinstance(path, str) else path
+        try:
+            if self.file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an .ntp v2 container")
+            headerLength, = HEADER_LENGTH.unpack(self.file.read(HEADER_LENGTH.size))
+            self.header = json.loads(self.file.read(headerLength).decode("utf-8"))
+        except Exception:
+            self.file.close()
+            raise
+        if self.header.get("version", 0) > FORMAT_VERSION:
+            self.file.close()
+            raise ValueError(f"{path} uses .ntp format version {self.header['version']}")
+        self.dataStart = len(MAGIC) + HEADER_LENGTH.size + headerLength
+        self.decompress = CODECS[self.header["codec"]][1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    @property
+    def chunkCount(self):
+        return len(self.header["chunks"])
+
+    @property
+    def blockCount(self):
+        return self.header["blocks"]
+
+    def chunkEnd(self, index):
+        chunk = self.header["chunks"][index]
+        return self.dataStart + chunk["offset"] + chunk["length"]
+
+    def readChunk(self, index):
+        chunk = self.header["chunks"][index]
+        self.file.seek(self.dataStart + chunk["offset"])
+        return json.loads(self.decompress(self.file.read(chunk["length"])).decode("utf-8"))
+
+    def iterChunks(self, start=0):
+        for index in range(start, self.chunkCount):
+            yield self.readChunk(index)
+
+    def readAll(self):
+        blocks = []
+        for chunk in self.iterChunks():
+            blocks.extend(chunk)
+        return blocks
+
+def decodeNtp(data):
+    with NtpReader(io.BytesIO(data)) as reader:
+        return reader.readAll()
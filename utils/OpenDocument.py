@@ -0,0 +1,55 @@
+from utils.Autosave import DocumentJournal
+from utils.DocumentBlocks import DocumentBlocks
+from utils.NtpFormat import encodeNtp, decodeNtp
+
+class OpenDocument:
+    def __init__(self, blocks, filePath, rich, writer):
+        self.filePath = filePath
+        self.rich = rich
+        self.document = DocumentBlocks(blocks)
+        self.journal = DocumentJournal(self.document, writer)
+        self.rawContent = None
+        self.loading = False
+        self.parked = None
+        self.parkedVersion = 0
+
+    @property
+    def title(self):
+        return (self.filePath or "untitled").split("/")[-1]
+
+    @property
+    def isParked(self):
+        return self.document is None
+
+    @property
+    def version(self):
+        return self.parkedVersion if self.document is None else self.document.version
+
+    @property
+    def isPristine(self):
+        return self.filePath is None and not self.journal.dirty and self.document is not None and not self.document.byteSize
+
+    def park(self):
+        #*Inactive documents are kept as an in-memory .ntp container until their tab is shown again
+        self.journal.detach(self.filePath)
+        self.parked = encodeNtp(self.document.blocks)
+        self.parkedVersion = self.document.version
+        self.document = None
+
+    def restore(self):
+        if self.document is None:
+            self.document = DocumentBlocks(decodeNtp(self.parked))
+            #*A save still in flight compares against the version it was started from
+            self.document.version = self.parkedVersion
+            self.parked = None
+            self.journal.attach(self.document)
+        return self.document
+
+    def tick(self):
+        if self.document is not None:
+            self.journal.tick(self.filePath)
+
+    def close(self):
+        self.journal.close()
+        self.document = None
+        self.parked = None
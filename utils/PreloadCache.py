@@ -0,0 +1,121 @@
+import io
+import mmap
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from utils.HtmlBlocks import splitBlocks
+from utils.NtpFormat import MAGIC, NtpReader
+
+PRELOAD_CACHE_BYTES = 64 * 1024 * 1024
+PRELOAD_FILES = 8
+MMAP_THRESHOLD = 1024 * 1024
+
+def fileKey(path):
+    #*A file counts as unchanged while mtime, size and inode all match what was read
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def blocksSize(blocks):
+    return sys.getsizeof(blocks) + sum(sys.getsizeof(block) for block in blocks)
+
+def textBlocks(text):
+    lines = text.split("\n")
+    last = lines.pop()
+    return [line.removesuffix("\r") + "\n" for line in lines] + [last]
+
+def decodeBuffer(path, data):
+    if data[:len(MAGIC)] == MAGIC:
+        with NtpReader(data if isinstance(data, mmap.mmap) else io.BytesIO(data)) as reader:
+            return reader.readAll()
+    text = str(data, "utf-8", errors="replace")
+    return splitBlocks(text) if path.endswith(".ntp") else textBlocks(text)
+
+def readBlocks(path):
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size < MMAP_THRESHOLD:
+            return decodeBuffer(path, file.read())
+        #*Large files are decoded straight from the page cache instead of being copied into a bytes object first
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decodeBuffer(path, mapped)
+
+class PreloadCache:
+    def __init__(self, maxBytes=PRELOAD_CACHE_BYTES):
+        self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, path):
+        try:
+            key = fileKey(path)
+        except OSError:
+            key = None
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self.dropEntry(path)
+            self.misses += 1
+            return None
+
+    def put(self, path, key, blocks):
+        size = blocksSize(blocks)
+        with self.lock:
+            if path in self.entries:
+                self.dropEntry(path)
+            if size > self.maxBytes:
+                return False
+            self.entries[path] = (key, blocks, size)
+            self.bytes += size
+            while self.bytes > self.maxBytes:
+                self.dropEntry(next(iter(self.entries)))
+            return True
+
+    def prefetch(self, path):
+        try:
+            key = fileKey(path)
+            with self.lock:
+                entry = self.entries.get(path)
+                if entry is not None and entry[0] == key:
+                    return False
+            if key[1] > self.maxBytes:
+                return False
+            return self.put(path, key, readBlocks(path))
+        except Exception as e:
+            print(f"Error preloading {path}: {e}")
+            return False
+
+    def discard(self, path):
+        with self.lock:
+            if path in self.entries:
+                self.dropEntry(path)
+
+    def dropEntry(self, path):
+        key, blocks, size = self.entries.pop(path)
+        self.bytes -= size
+
+    def trim(self, maxBytes):
+        #*Oldest entries go first, the same order put evicts in
+        with self.lock:
+            while self.entries and self.bytes > maxBytes:
+                self.dropEntry(next(iter(self.entries)))
+            return self.bytes
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,41 @@
+from PySide6.QtCore import QObject, Signal, Slot, QThread
+
+from utils.Tracing import traced
+
+class Preloader(QObject):
+    prefetchRequested = Signal(object)
+    preloaded = Signal(int)
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.generation = 0
+        self.preloaderThread = QThread()
+        self.moveToThread(self.preloaderThread)
+        self.prefetchRequested.connect(self.prefetch)
+        self.preloaderThread.start()
+
+    def request(self, paths):
+        #*A newer request replaces the rest of an older one, the recent files order has changed since
+        self.generation += 1
+        self.prefetchRequested.emit((self.generation, list(paths)))
+
+    def cancel(self):
+        self.generation += 1
+
+    @Slot(object)
+    @traced("Preloader.prefetch", "io")
+    def prefetch(self, request):
+        token, paths = request
+        count = 0
+        for path in paths:
+            if token != self.generation:
+                return
+            if self.cache.prefetch(path):
+                count += 1
+        self.preloaded.emit(count)
+
+    def shutdown(self):
+        self.cancel()
+        self.preloaderThread.quit()
+        self.preloaderThread.wait()
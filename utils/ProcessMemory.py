@@ -0,0 +1,88 @@
+import os
+import time
+
+WEB_ENGINE_MARKER = b"QtWebEngineProcess"
+
+def hasProc():
+    return os.path.isdir("/proc/self")
+
+def readMemoryKb(pid):
+    #*PSS splits shared pages between the processes mapping them, so the renderers summed up are not counted twice
+    rss = pss = None
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "rb") as file:
+            for line in file:
+                if line.startswith(b"Rss:"):
+                    rss = int(line.split()[1])
+                elif line.startswith(b"Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    if rss is None:
+        #*Older kernels and other users' processes have no smaps_rollup, VmRSS is the best left
+        rss = 0
+        try:
+            with open(f"/proc/{pid}/status", "rb") as file:
+                for line in file:
+                    if line.startswith(b"VmRSS:"):
+                        rss = int(line.split()[1])
+                        break
+        except OSError:
+            return 0, 0
+    return rss, rss if pss is None else pss
+
+def childPids(pid):
+    children = []
+    try:
+        tasks = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return children
+    for task in tasks:
+        try:
+            with open(f"/proc/{pid}/task/{task}/children", "rb") as file:
+                children.extend(int(child) for child in file.read().split())
+        except OSError:
+            continue
+    return children
+
+def descendantPids(pid):
+    #*The web engine forks a zygote that forks the renderers, so the whole tree is walked and not just the children
+    found = []
+    queue = childPids(pid)
+    while queue:
+        child = queue.pop()
+        found.append(child)
+        queue.extend(childPids(child))
+    return found
+
+def isWebEngine(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as file:
+            return WEB_ENGINE_MARKER in file.read()
+    except OSError:
+        return False
+
+def sampleMemory(pid=None):
+    if not hasProc():
+        return None
+    pid = pid or os.getpid()
+    appRss, appPss = readMemoryKb(pid)
+    sample = {
+        "time": time.time(),
+        "app_rss_kb": appRss,
+        "app_pss_kb": appPss,
+        "web_rss_kb": 0,
+        "web_pss_kb": 0,
+        "web_processes": 0,
+        "other_pss_kb": 0,
+    }
+    for child in descendantPids(pid):
+        rss, pss = readMemoryKb(child)
+        if isWebEngine(child):
+            sample["web_rss_kb"] += rss
+            sample["web_pss_kb"] += pss
+            sample["web_processes"] += 1
+        else:
+            sample["other_pss_kb"] += pss
+    sample["total_pss_kb"] = appPss + sample["web_pss_kb"] + sample["other_pss_kb"]
+    return sample
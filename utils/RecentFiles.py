@@ -0,0 +1,94 @@
+import json
+import os
+import sqlite3
+
+RECENT_FILES_DB = "configs/files.db"
+LEGACY_CONFIG_FILE = "configs/files.json"
+MAX_RECENT_FILES = 1000
+
+class RecentFiles:
+    def __init__(self, path=RECENT_FILES_DB, legacyPath=LEGACY_CONFIG_FILE, limit=MAX_RECENT_FILES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.limit = limit
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size_kb REAL NOT NULL, last_used INTEGER NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        self.refresh()
+        self.migrateLegacy(legacyPath)
+
+    def refresh(self):
+        #*The database can be written by another instance, the cached counters are read again from it
+        self.counter = self.connection.execute("SELECT COALESCE(MAX(last_used), 0) FROM files").fetchone()[0]
+        self.count = self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def __len__(self):
+        return self.count
+
+    def migrateLegacy(self, legacyPath):
+        if not legacyPath or not os.path.exists(legacyPath):
+            return
+        if self.connection.execute("SELECT 1 FROM meta WHERE key = 'legacy_json'").fetchone():
+            return
+
+        try:
+            with open(legacyPath, "r") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error migrating {legacyPath}: {e}")
+            data = []
+
+        with self.connection:
+            for item in data:
+                if isinstance(item, dict) and "path" in item:
+                    self.upsertEntry(item["path"], item.get("size_kb", 0))
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_json', ?)", (legacyPath,))
+            self.evict()
+
+    def upsertEntry(self, path, sizeKb):
+        self.counter += 1
+        exists = self.connection.execute("SELECT 1 FROM files WHERE path = ?", (path,)).fetchone()
+        self.connection.execute(
+            "INSERT INTO files (path, size_kb, last_used) VALUES (?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET size_kb = excluded.size_kb, last_used = excluded.last_used",
+            (path, sizeKb, self.counter),
+        )
+        if not exists:
+            self.count += 1
+
+    def evict(self):
+        overflow = self.count - self.limit
+        if overflow > 0:
+            self.connection.execute(
+                "DELETE FROM files WHERE path IN (SELECT path FROM files ORDER BY last_used LIMIT ?)", (overflow,)
+            )
+            self.count -= overflow
+
+    def upsert(self, path, sizeKb):
+        with self.connection:
+            self.upsertEntry(path, sizeKb)
+            self.evict()
+
+    def remove(self, path):
+        with self.connection:
+            if self.connection.execute("DELETE FROM files WHERE path = ?", (path,)).rowcount:
+                self.count -= 1
+
+    def get(self, path):
+        row = self.connection.execute("SELECT path, size_kb FROM files WHERE path = ?", (path,)).fetchone()
+        return {"path": row[0], "size_kb": row[1]} if row else None
+
+    def entries(self, limit=None):
+        rows = self.connection.execute(
+            "SELECT path, size_kb FROM files ORDER BY last_used DESC LIMIT ?", (limit if limit is not None else -1,)
+        )
+        return [{"path": path, "size_kb": sizeKb} for path, sizeKb in rows]
+
+    def close(self):
+        self.connection.close()
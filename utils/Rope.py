@@ -0,0 +1,371 @@
+import random
+
+LEAF_BLOCKS = 64
+WRITE_BATCH_BLOCKS = 4096
+
+def blockBytes(block):
+    return len(block) if block.isascii() else len(block.encode("utf-8"))
+
+class RopeLeaf:
+    __slots__ = ("blocks", "chars", "bytes", "lines")
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        text = "".join(blocks)
+        self.chars = len(text)
+        self.bytes = blockBytes(text)
+        self.lines = text.count("\n")
+
+class RopeNode:
+    #*Nodes are never changed after construction, an edit copies the path it touches and shares everything else
+    __slots__ = ("leaf", "priority", "left", "right", "count", "chars", "bytes", "lines")
+
+    def __init__(self, leaf, priority, left, right):
+        self.leaf = leaf
+        self.priority = priority
+        self.left = left
+        self.right = right
+        count, chars, size, lines = len(leaf.blocks), leaf.chars, leaf.bytes, leaf.lines
+        if left is not None:
+            count += left.count
+            chars += left.chars
+            size += left.bytes
+            lines += left.lines
+        if right is not None:
+            count += right.count
+            chars += right.chars
+            size += right.bytes
+            lines += right.lines
+        self.count = count
+        self.chars = chars
+        self.bytes = size
+        self.lines = lines
+
+def nodeCount(node):
+    return node.count if node is not None else 0
+
+def chunkLeaves(blocks):
+    #*Evenly sized leaves, so re-chunking after an edit never leaves a run of tiny ones behind
+    blocks = tuple(blocks)
+    if not blocks:
+        return []
+    pieces = -(-len(blocks) // LEAF_BLOCKS)
+    size = -(-len(blocks) // pieces)
+    return [RopeLeaf(blocks[i:i + size]) for i in range(0, len(blocks), size)]
+
+def buildTree(leaves):
+    #*A balanced tree in O(n), priorities are handed out in breadth first order so the heap property holds
+    if not leaves:
+        return None
+    priorities = sorted((random.random() for _ in leaves), reverse=True)
+    assigned = [0.0] * len(leaves)
+    ranges = [(0, len(leaves))]
+    position = 0
+    while position < len(ranges):
+        low, high = ranges[position]
+        middle = (low + high) // 2
+        assigned[middle] = priorities[position]
+        position += 1
+        if low < middle:
+            ranges.append((low, middle))
+        if middle + 1 < high:
+            ranges.append((middle + 1, high))
+
+    def build(low, high):
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        return RopeNode(leaves[middle], assigned[middle], build(low, middle), build(middle + 1, high))
+
+    return build(0, len(leaves))
+
+def merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        return RopeNode(left.leaf, left.priority, left.left, merge(left.right, right))
+    return RopeNode(right.leaf, right.priority, merge(left, right.left), right.right)
+
+def split(node, index):
+    #*Returns the first index blocks and the rest, a leaf that straddles the cut is split in two
+    if node is None:
+        return None, None
+    leftCount = nodeCount(node.left)
+    if index <= leftCount:
+        left, right = split(node.left, index)
+        return left, RopeNode(node.leaf, node.priority, right, node.right)
+    index -= leftCount
+    blocks = node.leaf.blocks
+    if index >= len(blocks):
+        left, right = split(node.right, index - len(blocks))
+        return RopeNode(node.leaf, node.priority, node.left, left), right
+    left = merge(node.left, RopeNode(RopeLeaf(blocks[:index]), random.random(), None, None))
+    right = merge(RopeNode(RopeLeaf(blocks[index:]), random.random(), None, None), node.right)
+    return left, right
+
+def popFirst(node):
+    if node is None:
+        return None, ()
+    if node.left is None:
+        return node.right, node.leaf.blocks
+    left, blocks = popFirst(node.left)
+    return RopeNode(node.leaf, node.priority, left, node.right), blocks
+
+def popLast(node):
+    if node is None:
+        return None, ()
+    if node.right is None:
+        return node.left, node.leaf.blocks
+    right, blocks = popLast(node.right)
+    return RopeNode(node.leaf, node.priority, node.left, right), blocks
+
+def replaceInLeaf(node, start, deleteCount, blocks):
+    #*Typing replaces one block with one or two, that stays inside a leaf and only copies the path down to it
+    if node is None:
+        return None
+    leftCount = nodeCount(node.left)
+    if start < leftCount:
+        if start + deleteCount > leftCount:
+            return None
+        left = replaceInLeaf(node.left, start, deleteCount, blocks)
+        return RopeNode(node.leaf, node.priority, left, node.right) if left is not None else None
+    start -= leftCount
+    current = node.leaf.blocks
+    if start > len(current) or (start == len(current) and node.right is not None):
+        right = replaceInLeaf(node.right, start - len(current), deleteCount, blocks)
+        return RopeNode(node.leaf, node.priority, node.left, right) if right is not None else None
+    if start + deleteCount > len(current):
+        return None
+    replaced = current[:start] + blocks + current[start + deleteCount:]
+    if not replaced or len(replaced) > 2 * LEAF_BLOCKS:
+        return None
+    return RopeNode(RopeLeaf(replaced), node.priority, node.left, node.right)
+
+class BlockRope:
+    #*A persistent rope of blocks: edits return a new rope, so a snapshot for a save or a worker thread is free
+    __slots__ = ("root",)
+
+    def __init__(self, blocks=(), root=None):
+        self.root = root if root is not None else buildTree(chunkLeaves(blocks))
+
+    def __len__(self):
+        return nodeCount(self.root)
+
+    def __bool__(self):
+        return self.root is not None
+
+    @property
+    def charCount(self):
+        return self.root.chars if self.root is not None else 0
+
+    @property
+    def byteSize(self):
+        return self.root.bytes if self.root is not None else 0
+
+    @property
+    def lineCount(self):
+        return (self.root.lines if self.root is not None else 0) + 1
+
+    def splice(self, start, deleteCount, blocks):
+        count = len(self)
+        start = max(0, min(start, count))
+        deleteCount = max(0, min(deleteCount, count - start))
+        blocks = tuple(blocks)
+        if not deleteCount and not blocks:
+            return self
+        if self.root is not None:
+            root = replaceInLeaf(self.root, start, deleteCount, blocks)
+            if root is not None:
+                return BlockRope(root=root)
+
+        left, rest = split(self.root, start)
+        _, right = split(rest, deleteCount)
+        #*The leaves on both sides of the cut are folded into the new blocks, edits do not fragment the tree
+        left, tail = popLast(left)
+        right, head = popFirst(right)
+        middle = buildTree(chunkLeaves(tail + blocks + head))
+        root = merge(merge(left, middle), right)
+        return BlockRope(root=root) if root is not None else BlockRope()
+
+    def insert(self, index, blocks):
+        return self.splice(index, 0, blocks)
+
+    def delete(self, start, deleteCount):
+        return self.splice(start, deleteCount, ())
+
+    def leavesFrom(self, index):
+        #*In-order walk of the leaves starting at the one holding block index, yields (blocks, first index inside the leaf)
+        stack = []
+        node = self.root
+        first = 0
+        while node is not None:
+            leftCount = nodeCount(node.left)
+            if index < leftCount:
+                stack.append(node)
+                node = node.left
+                continue
+            index -= leftCount
+            if index < len(node.leaf.blocks):
+                first = index
+                stack.append(node)
+                break
+            index -= len(node.leaf.blocks)
+            node = node.right
+
+        while stack:
+            node = stack.pop()
+            yield node.leaf.blocks, first
+            first = 0
+            node = node.right
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+    def iterRange(self, start, stop):
+        remaining = stop - start
+        for blocks, first in self.leavesFrom(start):
+            if remaining <= 0:
+                return
+            taken = blocks[first:first + remaining]
+            remaining -= len(taken)
+            yield from taken
+
+    def __iter__(self):
+        for blocks, _ in self.leavesFrom(0):
+            yield from blocks
+
+    def __getitem__(self, index):
+        count = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(count)
+            if step != 1:
+                return list(self)[index]
+            return list(self.iterRange(start, stop)) if start < stop else []
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("rope index out of range")
+        node = self.root
+        while True:
+            leftCount = nodeCount(node.left)
+            if index < leftCount:
+                node = node.left
+                continue
+            index -= leftCount
+            if index < len(node.leaf.blocks):
+                return node.leaf.blocks[index]
+            index -= len(node.leaf.blocks)
+            node = node.right
+
+    def offsetOfBlock(self, index):
+        #*Characters before block index
+        index = max(0, min(index, len(self)))
+        offset = 0
+        node = self.root
+        while node is not None:
+            leftCount = nodeCount(node.left)
+            if index < leftCount:
+                node = node.left
+                continue
+            if node.left is not None:
+                offset += node.left.chars
+            index -= leftCount
+            blocks = node.leaf.blocks
+            if index <= len(blocks):
+                return offset + sum(map(len, blocks[:index]))
+            offset += node.leaf.chars
+            index -= len(blocks)
+            node = node.right
+        return offset
+
+    def blockAtOffset(self, offset):
+        #*Returns (block index, offset inside the block), an offset past the end lands at the end of the last block
+        offset = max(0, min(offset, self.charCount))
+        index = 0
+        node = self.root
+        while node is not None:
+            leftChars = node.left.chars if node.left is not None else 0
+            if offset < leftChars:
+                node = node.left
+                continue
+            offset -= leftChars
+            index += nodeCount(node.left)
+            if offset < node.leaf.chars or node.right is None:
+                for block in node.leaf.blocks:
+                    if offset < len(block):
+                        return index, offset
+                    offset -= len(block)
+                    index += 1
+                return index - 1, offset + len(node.leaf.blocks[-1])
+            offset -= node.leaf.chars
+            index += len(node.leaf.blocks)
+            node = node.right
+        return 0, 0
+
+    def lineOfOffset(self, offset):
+        offset = max(0, min(offset, self.charCount))
+        line = 0
+        node = self.root
+        while node is not None:
+            leftChars = node.left.chars if node.left is not None else 0
+            if offset < leftChars:
+                node = node.left
+                continue
+            offset -= leftChars
+            if node.left is not None:
+                line += node.left.lines
+            if offset <= node.leaf.chars:
+                for block in node.leaf.blocks:
+                    if offset <= len(block):
+                        return line + block.count("\n", 0, offset)
+                    offset -= len(block)
+                    line += block.count("\n")
+                return line
+            offset -= node.leaf.chars
+            line += node.leaf.lines
+            node = node.right
+        return line
+
+    def offsetOfLine(self, line):
+        #*Offset of the first character of line, counting from 0
+        if line <= 0:
+            return 0
+        if line > (self.root.lines if self.root is not None else 0):
+            return self.charCount
+        offset = 0
+        node = self.root
+        while node is not None:
+            leftLines = node.left.lines if node.left is not None else 0
+            if line <= leftLines:
+                node = node.left
+                continue
+            line -= leftLines
+            if node.left is not None:
+                offset += node.left.chars
+            if line <= node.leaf.lines:
+                for block in node.leaf.blocks:
+                    newlines = block.count("\n")
+                    if line <= newlines:
+                        position = -1
+                        for _ in range(line):
+                            position = block.index("\n", position + 1)
+                        return offset + position + 1
+                    line -= newlines
+                    offset += len(block)
+            line -= node.leaf.lines
+            offset += node.leaf.chars
+            node = node.right
+        return offset
+
+    def writeTo(self, file):
+        #*Streams in batches of leaves, the document is never joined into one string
+        batch = []
+        for blocks, _ in self.leavesFrom(0):
+            batch.extend(blocks)
+            if len(batch) >= WRITE_BATCH_BLOCKS:
+                file.write("".join(batch))
+                batch = []
+        if batch:
+            file.write("".join(batch))
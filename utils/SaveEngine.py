@@ -0,0 +1,68 @@
+import threading
+
+from PySide6.QtCore import QThread, Signal
+
+from utils.AtomicWrite import writeAtomic
+from utils.BlobStore import BlobStore, blobDirectory, extractBlobs
+from utils.HtmlNormalizer import normalizeBlocks
+from utils.NtpFormat import encodeNtp
+from utils.Tracing import span
+
+class SaveEngine(QThread):
+    saved = Signal(str, int)
+    blobsExtracted = Signal(str, int, object)
+    failed = Signal(str, int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.condition = threading.Condition()
+        self.pending = {}
+        self.sequences = {}
+        self.running = True
+        self.start()
+
+    def enqueue(self, path, content, normalize=False):
+        with self.condition:
+            #*A newer save of the same path replaces the queued one, the sequence tells the signals of each write apart
+            sequence = self.sequences.get(path, 0) + 1
+            self.sequences[path] = sequence
+            self.pending[path] = (content, normalize, sequence)
+            self.condition.notify()
+        return sequence
+
+    def isIdle(self):
+        with self.condition:
+            return not self.pending
+
+    def shutdown(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                path = next(iter(self.pending))
+                content, normalize, sequence = self.pending.pop(path)
+
+            try:
+                changes = []
+                with span("SaveEngine.write", "io", path=path):
+                    if path.endswith(".ntp"):
+                        #*Inline data: images go to the sidecar store before the blocks are normalized and compressed
+                        content = extractBlobs(content, BlobStore(blobDirectory(path)), changes)
+                        content = encodeNtp(normalizeBlocks(content), normalized=True)
+                    elif normalize:
+                        #*Rich blocks saved under another extension are written as the same canonical HTML
+                        content = normalizeBlocks(content)
+                    writeAtomic(path, content)
+                if changes:
+                    self.blobsExtracted.emit(path, sequence, changes)
+                self.saved.emit(path, sequence)
+            except Exception as e:
+                self.failed.emit(path, sequence, str(e))
@@ -0,0 +1,189 @@
+import multiprocessing
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.HtmlBlocks import htmlToText
+from utils.NtpFormat import NtpReader, isNtpContainer
+
+SEARCH_INDEX_DB = "configs/search.db"
+SEARCH_LIMIT = 20
+RANKED_MATCHES = 500
+SNIPPET_CHARS = 80
+INDEX_BATCH = 64
+QUERY_TERM = re.compile(r"\w+", re.UNICODE)
+
+def fileStamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def extractText(path):
+    #*Runs in worker processes, so it only touches the file and returns plain data
+    try:
+        mtime, size = fileStamp(path)
+        if isNtpContainer(path):
+            with NtpReader(path) as reader:
+                text = htmlToText("".join(reader.readAll()))
+        else:
+            with open(path, "r", encoding="utf-8", errors="replace") as file:
+                text = file.read()
+            if path.endswith(".ntp"):
+                text = htmlToText(text)
+        return path, mtime, size, text
+    except OSError:
+        return path, None, None, None
+
+def workerContext():
+    #*The editor indexes from a QThread, forking a process that already runs threads can deadlock the child.
+    #*Workers start from a fresh interpreter instead, extractText only needs this Qt free module
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+def buildQuery(terms):
+    #*Every term is quoted so FTS5 operators typed by the user are matched literally, the last one as a prefix
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def makeSnippet(text, terms):
+    pattern = re.compile("|".join(r"\b" + re.escape(term) for term in terms), re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - SNIPPET_CHARS // 2) if match else 0
+    end = start + SNIPPET_CHARS
+    snippet = " ".join(text[start:end].split())
+    return ("…" if start else "") + snippet + ("…" if end < len(text) else "")
+
+class SearchIndex:
+    def __init__(self, path=SEARCH_INDEX_DB):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, mtime INTEGER NOT NULL, size INTEGER NOT NULL, indexed INTEGER NOT NULL DEFAULT 0)")
+            #*Indexes built before the column existed get it added, their files sort as oldest until reindexed
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(files)")}
+            if "indexed" not in columns:
+                self.connection.execute("ALTER TABLE files ADD COLUMN indexed INTEGER NOT NULL DEFAULT 0")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS files_indexed ON files (indexed)")
+            self.connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS content USING fts5(body, tokenize='unicode61 remove_diacritics 2')")
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def isCurrent(self, path, mtime, size):
+        row = self.connection.execute("SELECT mtime, size FROM files WHERE path = ?", (path,)).fetchone()
+        return row is not None and row[0] == mtime and row[1] == size
+
+    def stalePaths(self, paths):
+        stale = []
+        for path in paths:
+            try:
+                if not self.isCurrent(path, *fileStamp(path)):
+                    stale.append(path)
+            except OSError:
+                self.remove(path)
+        return stale
+
+    def store(self, path, mtime, size, text):
+        if text is None:
+            self.removeEntry(path)
+            return
+        #*rowids stay the same when a file is reindexed, the indexed time is what orders results by recency
+        indexed = time.time_ns()
+        row = self.connection.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row:
+            self.connection.execute("UPDATE files SET mtime = ?, size = ?, indexed = ? WHERE id = ?", (mtime, size, indexed, row[0]))
+            self.connection.execute("DELETE FROM content WHERE rowid = ?", (row[0],))
+            rowId = row[0]
+        else:
+            rowId = self.connection.execute("INSERT INTO files (path, mtime, size, indexed) VALUES (?, ?, ?, ?)", (path, mtime, size, indexed)).lastrowid
+        self.connection.execute("INSERT INTO content (rowid, body) VALUES (?, ?)", (rowId, text))
+
+    def removeEntry(self, path):
+        row = self.connection.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row:
+            self.connection.execute("DELETE FROM content WHERE rowid = ?", (row[0],))
+            self.connection.execute("DELETE FROM files WHERE id = ?", (row[0],))
+
+    def remove(self, path):
+        with self.connection:
+            self.removeEntry(path)
+
+    def update(self, path):
+        try:
+            if self.isCurrent(path, *fileStamp(path)):
+                return False
+        except OSError:
+            self.remove(path)
+            return False
+        with self.connection:
+            self.store(*extractText(path))
+        return True
+
+    def updateMany(self, paths, workers=None, progress=None):
+        stale = self.stalePaths(paths)
+        if not stale:
+            return 0
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers, mp_context=workerContext()) as executor:
+            results = executor.map(extractText, stale, chunksize=max(1, min(INDEX_BATCH, len(stale) // 32)))
+            #*Extraction is parallel, writes stay on this connection and are committed in batches
+            batch = []
+            for result in results:
+                batch.append(result)
+                if len(batch) >= INDEX_BATCH:
+                    done += self.storeBatch(batch)
+                    batch = []
+                    if progress:
+                        progress(done, len(stale))
+            done += self.storeBatch(batch)
+        if progress:
+            progress(done, len(stale))
+        return done
+
+    def storeBatch(self, batch):
+        with self.connection:
+            for result in batch:
+                self.store(*result)
+        return len(batch)
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        terms = QUERY_TERM.findall(text)
+        if not terms:
+            return []
+        query = buildQuery(terms)
+
+        #*bm25 has to decode every position of every match, and once the terms appear in most files
+        #*its idf is close to zero anyway, so very broad queries fall back to the recently indexed files
+        matches = self.connection.execute(
+            "SELECT COUNT(*) FROM (SELECT rowid FROM content WHERE content MATCH ? LIMIT ?)", (query, RANKED_MATCHES + 1)
+        ).fetchone()[0]
+        if matches > RANKED_MATCHES:
+            rows = self.connection.execute(
+                "SELECT content.rowid, 0 FROM content JOIN files ON files.id = content.rowid WHERE content MATCH ? ORDER BY files.indexed DESC LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        else:
+            rows = self.connection.execute(
+                "SELECT rowid, bm25(content) FROM content WHERE content MATCH ? ORDER BY rank LIMIT ?", (query, limit)
+            ).fetchall()
+
+        #*FTS5's snippet() retokenizes whole documents, a plain text search around the first hit is much cheaper
+        results = []
+        for rowId, score in rows:
+            path = self.connection.execute("SELECT path FROM files WHERE id = ?", (rowId,)).fetchone()[0]
+            body = self.connection.execute("SELECT body FROM content WHERE rowid = ?", (rowId,)).fetchone()[0]
+            results.append({"path": path, "snippet": makeSnippet(body, terms), "score": -score})
+        return results
+
+    def optimize(self):
+        with self.connection:
+            self.connection.execute("INSERT INTO content (content) VALUES ('optimize')")
+
+    def close(self):
+        self.connection.close()
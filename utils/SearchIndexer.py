@@ -0,0 +1,71 @@
+from PySide6.QtCore import QObject, Signal, Slot, QThread
+
+from utils.SearchIndex import SearchIndex, SEARCH_INDEX_DB, SEARCH_LIMIT
+from utils.Tracing import traced
+
+class SearchIndexer(QObject):
+    rebuildRequested = Signal(object)
+    updateRequested = Signal(str)
+    searchRequested = Signal(int, str)
+    progress = Signal(int, int)
+    indexed = Signal(int)
+    results = Signal(int, object)
+    failed = Signal(str)
+
+    def __init__(self, path=SEARCH_INDEX_DB, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.index = None
+        self.generation = 0
+        self.indexerThread = QThread()
+        self.moveToThread(self.indexerThread)
+        self.rebuildRequested.connect(self.rebuild)
+        self.updateRequested.connect(self.update)
+        self.searchRequested.connect(self.runSearch)
+        self.indexerThread.start()
+
+    def search(self, text):
+        self.generation += 1
+        self.searchRequested.emit(self.generation, text)
+        return self.generation
+
+    def isCurrent(self, token):
+        return token == self.generation
+
+    def ensureIndex(self):
+        #*The connection is opened on the indexer thread, sqlite objects stay on the thread that made them
+        if self.index is None:
+            self.index = SearchIndex(self.path)
+        return self.index
+
+    @Slot(object)
+    @traced("SearchIndexer.rebuild", "index")
+    def rebuild(self, paths):
+        try:
+            count = self.ensureIndex().updateMany(list(paths), progress=self.progress.emit)
+            self.indexed.emit(count)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    @Slot(str)
+    @traced("SearchIndexer.update", "index")
+    def update(self, path):
+        try:
+            if self.ensureIndex().update(path):
+                self.indexed.emit(1)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    @Slot(int, str)
+    def runSearch(self, token, text):
+        #*Searches queued behind a newer one are dropped without touching the index
+        if not self.isCurrent(token):
+            return
+        try:
+            self.results.emit(token, self.ensureIndex().search(text, SEARCH_LIMIT))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def shutdown(self):
+        self.indexerThread.quit()
+        self.indexerThread.wait()
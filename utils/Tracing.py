@@ -0,0 +1,184 @@
+import atexit
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from utils.AtomicWrite import writeAtomic
+
+TRACE_ENV = "NOTEPAD_TRACE"
+TRACE_BUFFER_EVENTS = 200_000
+STALL_MS = 50
+HEARTBEAT_MS = 20
+
+events = deque(maxlen=TRACE_BUFFER_EVENTS)
+stacks = {}
+threadNames = {}
+asyncIds = itertools.count(1)
+enabled = False
+local = threading.local()
+
+def isEnabled():
+    return enabled
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def clear():
+    events.clear()
+
+def activeStack(threadId=None):
+    return list(stacks.get(threadId if threadId is not None else threading.get_ident(), ()))
+
+def currentStack():
+    stack = getattr(local, "stack", None)
+    if stack is None:
+        #*Stacks are registered per thread so the stall watchdog can read the GUI thread's one
+        stack = local.stack = []
+        threadId = threading.get_ident()
+        stacks[threadId] = stack
+        threadNames[threadId] = threading.current_thread().name
+    return stack
+
+class Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        currentStack().append(self.name)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, excType, exc, traceback):
+        end = time.perf_counter_ns()
+        local.stack.pop()
+        events.append(("X", self.name, self.category, self.start, end - self.start, threading.get_ident(), self.args))
+        return False
+
+class NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, exc, traceback):
+        return False
+
+NULL_SPAN = NullSpan()
+
+def span(name, category="app", **args):
+    if not enabled:
+        return NULL_SPAN
+    return Span(name, category, args or None)
+
+def traced(name=None, category="app"):
+    def decorate(function):
+        spanName = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with Span(spanName, category, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def beginAsync(name, category="async"):
+    #*For work that finishes in a callback, e.g. runJavaScript, returns the function that closes it
+    if not enabled:
+        return noop
+    spanId = next(asyncIds)
+    threadId = threading.get_ident()
+    events.append(("b", name, category, time.perf_counter_ns(), spanId, threadId, None))
+
+    def finish():
+        events.append(("e", name, category, time.perf_counter_ns(), spanId, threadId, None))
+    return finish
+
+def noop(*args):
+    pass
+
+def instant(name, category="app", **args):
+    if enabled:
+        events.append(("i", name, category, time.perf_counter_ns(), 0, threading.get_ident(), args or None))
+
+def chromeTrace():
+    pid = os.getpid()
+    traceEvents = [
+        {"ph": "M", "name": "thread_name", "pid": pid, "tid": threadId, "args": {"name": threadName}}
+        for threadId, threadName in list(threadNames.items())
+    ]
+    for phase, name, category, start, value, threadId, args in list(events):
+        event = {"ph": phase, "name": name, "cat": category, "ts": start / 1000, "pid": pid, "tid": threadId}
+        if phase == "X":
+            event["dur"] = value / 1000
+        elif phase in ("b", "e"):
+            event["id"] = value
+        elif phase == "i":
+            event["s"] = "t"
+        if args:
+            event["args"] = args
+        traceEvents.append(event)
+    return {"traceEvents": traceEvents, "displayTimeUnit": "ms"}
+
+def exportChromeTrace(path):
+    writeAtomic(path, json.dumps(chromeTrace()))
+    return path
+
+class StallDetector(threading.Thread):
+    def __init__(self, stallMs=STALL_MS):
+        super().__init__(name="StallDetector", daemon=True)
+        self.stallMs = stallMs
+        self.guiThreadId = threading.get_ident()
+        self.lastBeat = time.perf_counter()
+        self.stallStack = None
+        self.stallFrame = None
+        self.running = True
+
+    def beat(self):
+        #*Called from a GUI-thread timer, a late beat means the event loop was blocked in between
+        now = time.perf_counter()
+        blockedMs = (now - self.lastBeat) * 1000 - HEARTBEAT_MS
+        self.lastBeat = now
+        if blockedMs > self.stallMs:
+            stack = " > ".join(self.stallStack or ["<no span>"])
+            print(f"Event loop blocked for {blockedMs:.0f} ms in {stack} ({self.stallFrame or 'unknown'})")
+            if enabled:
+                events.append(("X", "stall", "stall", time.perf_counter_ns() - int(blockedMs * 1e6), int(blockedMs * 1e6), self.guiThreadId, {"stack": self.stallStack, "frame": self.stallFrame}))
+        self.stallStack = None
+        self.stallFrame = None
+
+    def run(self):
+        while self.running:
+            time.sleep(HEARTBEAT_MS / 2000)
+            if self.stallStack is None and (time.perf_counter() - self.lastBeat) * 1000 > self.stallMs + HEARTBEAT_MS:
+                #*Snapshot what the GUI thread is doing while it is still stuck
+                self.stallStack = activeStack(self.guiThreadId)
+                frame = sys._current_frames().get(self.guiThreadId)
+                self.stallFrame = f"{frame.f_code.co_filename}:{frame.f_lineno} {frame.f_code.co_name}" if frame else None
+
+    def stop(self):
+        self.running = False
+
+def enableFromEnvironment():
+    path = os.environ.get(TRACE_ENV)
+    if path:
+        enable()
+        atexit.register(exportChromeTrace, path)
+    return path
+
+enableFromEnvironment()